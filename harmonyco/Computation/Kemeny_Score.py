@@ -1,10 +1,23 @@
-from typing import List, Dict
+from typing import Optional, Sequence, Union
+
 import numpy as np
 
+from . import kernels
+from .KendallTau import batch_inversions, kendall_tau_distances
+from .preference_matrix import RankingsLike, build_preference_matrix, distance_matrix, lower_bound, score_permutation
+from .ranking_multiset import RankingMultiset
+from ..data.permutation_file import DEFAULT_CHUNK_ROWS, iter_permutation_chunks
+
+
 class KemenyScoreCalculator:
     """
-    Module pour le calcul des scores de Kemeny. L'algorithme de calcul du score est de complexité m * n * log(n) où n est le nombre
-    d'éléments et m le nombre de classements. L'algorithme est basé sur le comptage du nombre d'inversions.
+    Module pour le calcul des scores de Kemeny. Le score d'une permutation candidate est la somme de ses distances
+    de Kendall-Tau aux classements ; il se calcule en O(n²) à partir de la matrice de préférence, ou en
+    O(m * n * log(n)) directement à partir des classements par comptage des inversions (arbres de Fenwick
+    vectorisés sur les classements), éventuellement en les lisant par blocs depuis un fichier.
+
+    Les classements peuvent être pondérés (poids = nombre d'occurrences) ou fournis sous forme de RankingMultiset :
+    chaque classement distinct n'est alors traité qu'une fois.
     """
 
     def __init__(self):
@@ -14,104 +27,113 @@ class KemenyScoreCalculator:
         pass
 
     @staticmethod
-    def calculate_kemeny_score(rankings: List[List[int]]) -> int:
+    def calculate_kemeny_score(rankings: Union[RankingsLike, RankingMultiset], median: Sequence[int],
+                               preference_matrix: Optional[np.ndarray] = None,
+                               weights: Optional[Sequence[int]] = None) -> int:
         """
-        Calcule le score de Kemeny pour une liste de classements.
+        Calcule le score de Kemeny d'une permutation candidate pour une liste de classements.
 
-        :param rankings: Une liste de classements, où chaque classement est une permutation.
-        :return: Le score de Kemeny, qui est le nombre total d'inversions.
+        :param rankings: Une liste de classements, où chaque classement est une permutation, ou un RankingMultiset.
+        :param median: La permutation candidate (éléments de 1 à n).
+        :param preference_matrix: La matrice de préférence déjà construite pour ces classements (facultatif).
+        :param weights: Le poids de chaque classement (facultatif, 1 par défaut).
+        :return: La somme (pondérée) des distances de Kendall-Tau entre la permutation et les classements.
         """
-        n = len(rankings[0])
-        m = len(rankings)
-        # Créer une matrice de préférence où préférence[i][j] est le nombre de fois que i est préféré à j
-        preference_matrix = np.zeros((n, n), dtype=int)
+        if preference_matrix is not None:
+            return KemenyScoreCalculator.score_from_matrix(median, preference_matrix)
+        return KemenyScoreCalculator.score_from_rankings(median, rankings, weights=weights)
 
-        for ranking in rankings:
-            for i in range(n):
-                for j in range(i + 1, n):
-                    preference_matrix[ranking[i] - 1][ranking[j] - 1] += 1
+    @staticmethod
+    def calculate_lower_bound(rankings: Union[RankingsLike, RankingMultiset],
+                              preference_matrix: Optional[np.ndarray] = None,
+                              weights: Optional[Sequence[int]] = None) -> int:
+        """
+        Calcule la borne inférieure simple du score de Kemeny : somme sur les paires du minimum des deux
+        préférences. Aucune permutation n'a un score inférieur.
 
-        # Calculer le score de Kemeny en comptant les inversions
-        kemeny_score = 0
+        :param rankings: Une liste de classements, où chaque classement est une permutation, ou un RankingMultiset.
+        :param preference_matrix: La matrice de préférence déjà construite pour ces classements (facultatif).
+        :param weights: Le poids de chaque classement (facultatif, 1 par défaut).
+        :return: La borne inférieure.
+        """
+        if preference_matrix is None:
+            if isinstance(rankings, RankingMultiset):
+                rankings, weights = rankings.rankings, rankings.weights
+            preference_matrix = build_preference_matrix(rankings, weights=weights)
+        return lower_bound(preference_matrix)
 
-        for i in range(n):
-            for j in range(i + 1, n):
-                if preference_matrix[i][j] < preference_matrix[j][i]:
-                    kemeny_score += preference_matrix[i][j]
-                else:
-                    kemeny_score += preference_matrix[j][i]
+    @staticmethod
+    def score_from_matrix(median: Sequence[int], preference_matrix: np.ndarray) -> int:
+        """
+        Score de Kemeny d'une permutation à partir de la matrice de préférence, en O(n²) vectorisé : chaque paire
+        placée i avant j coûte le nombre de classements qui placent j avant i.
 
-        return kemeny_score
+        :param median: La permutation candidate (éléments de 1 à n).
+        :param preference_matrix: La matrice de préférence (n, n).
+        :return: Le score de Kemeny.
+        """
+        return score_permutation(median, distance_matrix(np.asarray(preference_matrix)))
 
     @staticmethod
-    def count_inversions(ranking: List[int]) -> int:
+    def score_from_rankings(median: Sequence[int], rankings: Union[RankingsLike, RankingMultiset],
+                            chunk_size: Optional[int] = None, weights: Optional[Sequence[int]] = None) -> int:
         """
-        Compte le nombre d'inversions dans un classement donné.
+        Score de Kemeny d'une permutation à partir des classements, en O(m * n * log(n)) sans matrice
+        (m étant le nombre de classements distincts si les classements sont pondérés).
+
+        :param median: La permutation candidate (éléments de 1 à n).
+        :param rankings: Une liste de classements, un tableau (m, n) ou un RankingMultiset.
+        :param chunk_size: Le nombre de classements traités simultanément (facultatif).
+        :param weights: Le poids de chaque classement (facultatif, 1 par défaut).
+        :return: Le score de Kemeny.
+        """
+        if isinstance(rankings, RankingMultiset):
+            rankings, weights = rankings.rankings, rankings.weights
+        distances = kendall_tau_distances(median, rankings, chunk_size)
+        if weights is None:
+            return int(distances.sum())
+        return int(distances @ np.asarray(weights, dtype=np.int64))
 
-        :param ranking: Une permutation.
-        :return: Le nombre d'inversions dans le classement.
+    @staticmethod
+    def score_from_file(median: Sequence[int], path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+        """
+        Score de Kemeny d'une permutation en lisant les classements par blocs depuis un fichier (binaire ou texte,
+        voir data.permutation_file), sans les charger entièrement en mémoire. Les doublons de chaque bloc ne
+        sont évalués qu'une fois.
+
+        :param median: La permutation candidate (éléments de 1 à n).
+        :param path: Chemin vers le fichier des classements.
+        :param chunk_rows: Le nombre de classements lus à la fois.
+        :return: Le score de Kemeny.
         """
-        return KemenyScoreCalculator._merge_sort_and_count(ranking, 0, len(ranking) - 1)
+        return sum(KemenyScoreCalculator.score_from_rankings(median, RankingMultiset(chunk))
+                   for chunk in iter_permutation_chunks(path, chunk_rows))
 
     @staticmethod
-    def _merge_sort_and_count(arr: List[int], left: int, right: int) -> int:
+    def count_inversions(ranking: Sequence[int]) -> int:
         """
-        Utilise l'algorithme de tri fusion pour compter le nombre d'inversions dans un tableau.
+        Compte le nombre d'inversions dans un classement donné, sans le modifier.
 
-        :param arr: Le tableau à trier et à compter les inversions.
-        :param left: L'indice de gauche du sous-tableau.
-        :param right: L'indice de droite du sous-tableau.
-        :return: Le nombre d'inversions dans le sous-tableau.
+        :param ranking: Une suite de valeurs (une permutation, ou des valeurs quelconques comparables).
+        :return: Le nombre de paires i < j telles que ranking[i] > ranking[j].
         """
-        if left >= right:
+        values = np.asarray(ranking)
+        if values.size < 2:
             return 0
-
-        mid = (left + right) // 2
-        inv_count = KemenyScoreCalculator._merge_sort_and_count(arr, left, mid)
-        inv_count += KemenyScoreCalculator._merge_sort_and_count(arr, mid + 1, right)
-        inv_count += KemenyScoreCalculator._merge_and_count(arr, left, mid, right)
-
-        return inv_count
+        # Rangs de 1 à n ; à valeurs égales, l'ordre d'apparition est conservé et la paire n'est pas comptée
+        ranks = np.empty(values.size, dtype=np.int64)
+        ranks[np.argsort(values, kind='stable')] = np.arange(1, values.size + 1)
+        return int(kernels.inversion_count(ranks))
 
     @staticmethod
-    def _merge_and_count(arr: List[int], left: int, mid: int, right: int) -> int:
+    def count_inversions_batch(rankings: RankingsLike) -> np.ndarray:
         """
-        Fusionne deux sous-tableaux triés et compte le nombre d'inversions.
+        Compte les inversions de chaque ligne d'un tableau (m, n) de permutations de 1 à n.
 
-        :param arr: Le tableau à fusionner.
-        :param left: L'indice de gauche du sous-tableau gauche.
-        :param mid: Le point milieu du tableau.
-        :param right: L'indice de droite du sous-tableau droit.
-        :return: Le nombre d'inversions lors de la fusion.
+        :param rankings: Une liste de permutations ou un tableau (m, n).
+        :return: Le nombre d'inversions de chaque permutation (m,).
         """
-        left_subarray = arr[left:mid + 1]
-        right_subarray = arr[mid + 1:right + 1]
-
-        i = j = 0
-        k = left
-        inversions = 0
-
-        while i < len(left_subarray) and j < len(right_subarray):
-            if left_subarray[i] <= right_subarray[j]:
-                arr[k] = left_subarray[i]
-                i += 1
-            else:
-                arr[k] = right_subarray[j]
-                inversions += (mid - i + 1 - left)
-                j += 1
-            k += 1
-
-        while i < len(left_subarray):
-            arr[k] = left_subarray[i]
-            i += 1
-            k += 1
-
-        while j < len(right_subarray):
-            arr[k] = right_subarray[j]
-            j += 1
-            k += 1
-
-        return inversions
+        return batch_inversions(rankings)
 
 
 # Exemple d'utilisation
@@ -124,10 +146,12 @@ if __name__ == "__main__":
 
     calculator = KemenyScoreCalculator()
 
-    # Calculer le score de Kemeny pour les classements
-    score = calculator.calculate_kemeny_score(rankings)
-    print(f"Score de Kemeny : {score}")
+    # Calculer le score de Kemeny d'une permutation candidate
+    score = calculator.calculate_kemeny_score(rankings, [2, 1, 3, 4])
+    print(f"Score de Kemeny de [2, 1, 3, 4] : {score}")
+    print(f"Borne inférieure : {calculator.calculate_lower_bound(rankings)}")
 
     # Compter les inversions dans un classement donné
-    inversions = calculator.count_inversions([4, 3, 2, 1])
-    print(f"Nombre d'inversions : {inversions}")
+    ranking = [4, 3, 2, 1]
+    inversions = calculator.count_inversions(ranking)
+    print(f"Nombre d'inversions : {inversions} (classement inchangé : {ranking})")
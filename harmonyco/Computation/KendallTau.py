@@ -1,3 +1,9 @@
+import numpy as np
+
+from . import kernels
+from .preference_matrix import DEFAULT_CHUNK_BYTES, default_chunk_size, rankings_to_positions
+
+
 class FenwickTree:
     def __init__(self, size):
         self.size = size
@@ -42,6 +48,8 @@ def kendall_tau_distance_with_fenwick(permutation1, permutation2):
 
     # Représenter permutation1 en termes de positions dans permutation2
     mapped_permutation = [position_in_permutation2[value] for value in permutation1]
+    if kernels.USE_NUMBA:
+        return int(kernels.inversion_count(np.asarray(mapped_permutation, dtype=np.int64)))
 
     # Calcul de la distance de Kendall-Tau en utilisant un arbre de Fenwick
     fenwick_tree = FenwickTree(n)
@@ -57,9 +65,132 @@ def kendall_tau_distance_with_fenwick(permutation1, permutation2):
     return kendall_tau_distance
 
 
+def batch_inversions(arrays):
+    """
+    Compte le nombre d'inversions de chaque ligne d'un tableau (m, n) de valeurs distinctes de 1 à n.
+
+    Un arbre de Fenwick est tenu par ligne et les mises à jour sont vectorisées sur les m lignes,
+    soit O(n log n) opérations NumPy de taille m au lieu de m arbres Python.
+
+    Parameters:
+    - arrays (np.ndarray): Tableau (m, n) de valeurs de 1 à n (une permutation par ligne).
+
+    Returns:
+    - np.ndarray: Le nombre d'inversions de chaque ligne (m,).
+    """
+    arrays = np.asarray(arrays)
+    m, n = arrays.shape
+    tree = np.zeros((m, n + 1), dtype=np.int32)
+    rows = np.arange(m)
+    inversions = np.zeros(m, dtype=np.int64)
+
+    for i in range(n):
+        values = arrays[:, i].astype(np.int64)
+
+        # Nombre de valeurs déjà vues inférieures ou égales à la valeur courante
+        seen = np.zeros(m, dtype=np.int64)
+        index = values.copy()
+        while index.any():
+            seen += tree[rows, index]
+            index -= index & -index
+        inversions += i - seen
+
+        # Mise à jour de l'arbre de Fenwick avec la valeur courante
+        index = values.copy()
+        active = index <= n
+        while active.any():
+            tree[rows[active], index[active]] += 1
+            index[active] += index[active] & -index[active]
+            active = index <= n
+
+    return inversions
+
+
+def kendall_tau_distances(permutation, rankings, chunk_size=None):
+    """
+    Calcule la distance de Kendall-Tau entre une permutation et chacun des m classements d'un ensemble.
+
+    Parameters:
+    - permutation (list): La permutation candidate (éléments de 1 à n).
+    - rankings (list or np.ndarray): Les m classements, sous forme de liste ou de tableau (m, n).
+    - chunk_size (int): Nombre de classements traités simultanément (facultatif).
+
+    Returns:
+    - np.ndarray: Les m distances de Kendall-Tau.
+    """
+    positions = rankings_to_positions(rankings)
+    m, n = positions.shape
+    candidate = np.asarray(permutation, dtype=np.int64) - 1
+    if chunk_size is None:
+        chunk_size = default_chunk_size(n)
+
+    distances = np.empty(m, dtype=np.int64)
+    for start in range(0, m, chunk_size):
+        # Position, dans chaque classement, des éléments pris dans l'ordre de la permutation candidate
+        mapped = positions[start:start + chunk_size][:, candidate].astype(np.int64) + 1
+        distances[start:start + chunk_size] = batch_inversions(mapped)
+    return distances
+
+
+def _pairwise_signs(positions):
+    """
+    Vecteurs de signes des paires : +1 si i précède j, -1 sinon, pour toutes les paires i < j.
+
+    Parameters:
+    - positions (np.ndarray): Tableau (c, n) de positions.
+
+    Returns:
+    - np.ndarray: Tableau (c, n(n-1)/2) de signes.
+    """
+    n = positions.shape[1]
+    first, second = np.triu_indices(n, 1)
+    dtype = np.float32 if len(first) <= 2 ** 24 else np.float64
+    return np.where(positions[:, first] < positions[:, second], 1, -1).astype(dtype)
+
+
+def kendall_tau_distance_matrix(rankings, chunk_size=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Calcule la matrice (m, m) des distances de Kendall-Tau entre tous les classements d'un ensemble.
+
+    Chaque classement est représenté par le vecteur des signes de ses n(n-1)/2 paires ; deux classements
+    diffèrent sur une paire exactement quand les signes diffèrent, d'où d = (p - <s_a, s_b>) / 2. Les produits
+    scalaires sont calculés par blocs de lignes pour borner la mémoire.
+
+    Parameters:
+    - rankings (list or np.ndarray): Les m classements, sous forme de liste ou de tableau (m, n).
+    - chunk_size (int): Nombre de classements par bloc (facultatif).
+    - chunk_bytes (int): Budget mémoire d'un bloc de signes, utilisé si chunk_size n'est pas fourni.
+
+    Returns:
+    - np.ndarray: La matrice symétrique (m, m) des distances.
+    """
+    positions = rankings_to_positions(rankings)
+    m, n = positions.shape
+    num_pairs = n * (n - 1) // 2
+    if chunk_size is None:
+        chunk_size = max(1, chunk_bytes // max(1, 4 * num_pairs))
+
+    distances = np.empty((m, m), dtype=np.int64)
+    for row_start in range(0, m, chunk_size):
+        row_signs = _pairwise_signs(positions[row_start:row_start + chunk_size])
+        row_end = row_start + len(row_signs)
+        for col_start in range(row_start, m, chunk_size):
+            if col_start == row_start:
+                col_signs = row_signs
+            else:
+                col_signs = _pairwise_signs(positions[col_start:col_start + chunk_size])
+            col_end = col_start + len(col_signs)
+            block = np.rint((num_pairs - row_signs @ col_signs.T) / 2).astype(np.int64)
+            distances[row_start:row_end, col_start:col_end] = block
+            distances[col_start:col_end, row_start:row_end] = block.T
+    return distances
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     perm1 = [10, 6, 7 , 8 , 9,5 , 1, 3, 2, 4]
     perm2 = [1, 4,5 ,10 , 9, 8, 7 , 6, 3, 2]
     distance = kendall_tau_distance_with_fenwick(perm1, perm2)
     print(f"La distance de Kendall-Tau entre les permutations est : {distance}")
+    print(f"Distances de perm1 à l'ensemble : {kendall_tau_distances(perm1, [perm1, perm2])}")
+    print(f"Matrice des distances :\n{kendall_tau_distance_matrix([perm1, perm2])}")
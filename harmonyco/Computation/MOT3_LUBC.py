@@ -1,117 +1,165 @@
-from typing import List, Dict, Set
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import numpy as np
 
+from .preference_matrix import distance_matrix
+from .preprocessing import MajorityGraphPreprocessor
+
+# Règles de fixation des paires appliquées par défaut
+RULES = ('pareto', 'majorite_3_4', 'condorcet')
+
 
 class MOT3LUBC:
     """
     Classe pour gérer les contraintes MOT3 et LUBC dans le cadre du problème de la médiane de permutation.
-    MOT3 (Majority of Three) est une méthode qui vérifie les triplets d'éléments pour des relations de majorité,
-    tandis que LUBC (Linear Upper Bound Constraints) applique des contraintes linéaires pour améliorer l'élagage
-    lors de la recherche de la solution optimale.
+
+    MOT3 regroupe les règles qui fixent l'ordre d'une paire d'éléments dans toutes les médianes, calculées à partir
+    de la matrice de préférence :
+    - règle de Pareto : tous les classements placent i avant j ;
+    - règle des 3/4 : strictement plus des trois quarts des classements placent i avant j ;
+    - règle de Condorcet étendue : i appartient à une composante fortement connexe du graphe majoritaire qui
+      précède celle de j.
+    L'union de ces relations est ensuite fermée transitivement. LUBC (Lower and Upper Bound Constraints) en déduit
+    les positions possibles de chaque élément : au moins le nombre de ses prédécesseurs obligés, au plus n - 1
+    moins le nombre de ses successeurs obligés.
+
+    Les paires fixées sont stockées sous forme de bits (n² / 8 octets) ; matrix() reconstruit la matrice booléenne
+    utilisée par le Branch and Bound (instance.tab_c) et par les modèles PLNE, où ces paires deviennent des
+    variables fixées.
     """
 
-    def __init__(self, n: int):
+    def __init__(self, preference_matrix: np.ndarray, m: Optional[int] = None, rules: Sequence[str] = RULES):
         """
-        Initialise l'objet MOT3LUBC avec le nombre d'éléments à classer.
+        Calcule les paires fixées et les bornes de position à partir de la matrice de préférence.
 
-        :param n: Le nombre total d'éléments dans le problème de la médiane de permutation.
+        :param preference_matrix: La matrice de préférence (n, n) : preference_matrix[i][j] est le nombre de
+                                  classements qui placent i + 1 avant j + 1.
+        :param m: Le nombre de classements (déduit de la matrice si n > 1).
+        :param rules: Les règles appliquées, parmi RULES.
         """
-        self.n = n
-        self.tabMOT3 = np.zeros((n, n, n), dtype=bool)  # Tableau pour stocker les triplets MOT3
-        self.tabLUBC = np.zeros((n, n), dtype=int)  # Tableau pour stocker les contraintes LUBC
-        self._initialize_constraints()
+        preference_matrix = np.asarray(preference_matrix, dtype=np.int64)
+        self.n = preference_matrix.shape[0]
+        if m is None:
+            m = int(preference_matrix[0][1] + preference_matrix[1][0]) if self.n > 1 else 0
+        self.m = m
+        unknown = set(rules) - set(RULES)
+        if unknown:
+            raise ValueError(f"Règles inconnues : {sorted(unknown)} (disponibles : {list(RULES)})")
+        self.rules = tuple(rules)
+
+        # Nombre de paires fixées par chaque règle, avant la fermeture transitive
+        self.nb_pairs_by_rule: Dict[str, int] = {}
+        fixed = np.zeros((self.n, self.n), dtype=bool)
+        for rule in self.rules:
+            pairs = self._rule_pairs(rule, preference_matrix)
+            self.nb_pairs_by_rule[rule] = int(np.count_nonzero(pairs))
+            fixed |= pairs
+        fixed = self.transitive_closure(fixed)
+        if fixed[np.diag_indices(self.n)].any():
+            raise ValueError("Les paires fixées forment un cycle")
+        self._store(fixed)
 
-    def _initialize_constraints(self):
+    def _rule_pairs(self, rule: str, preference_matrix: np.ndarray) -> np.ndarray:
         """
-        Initialise les contraintes de base MOT3 et LUBC.
+        Calcule les paires fixées par une règle.
+
+        :param rule: Le nom de la règle.
+        :param preference_matrix: La matrice de préférence.
+        :return: Une matrice booléenne (n, n), vraie en [i][j] si i doit précéder j.
         """
-        for i in range(self.n):
-            for j in range(self.n):
-                if i != j:
-                    for k in range(self.n):
-                        if i != k and j != k:
-                            self.tabMOT3[i][j][k] = self._compute_mot3_constraint(i, j, k)
-                    self.tabLUBC[i][j] = self._compute_lubc_constraint(i, j)
+        if rule == 'pareto':
+            pairs = preference_matrix == self.m
+        elif rule == 'majorite_3_4':
+            pairs = 4 * preference_matrix > 3 * self.m
+        else:
+            components = MajorityGraphPreprocessor.condorcet_components(distance_matrix(preference_matrix))
+            rank = np.empty(self.n, dtype=np.int64)
+            for index, component in enumerate(components):
+                rank[component] = index
+            pairs = rank[:, None] < rank[None, :]
+        np.fill_diagonal(pairs, False)
+        return pairs
 
-    def _compute_mot3_constraint(self, i: int, j: int, k: int) -> bool:
+    @staticmethod
+    def transitive_closure(relation: np.ndarray) -> np.ndarray:
         """
-        Calcule la contrainte MOT3 pour un triplet d'éléments (i, j, k).
+        Fermeture transitive d'une relation (Floyd-Warshall booléen, une opération (n, n) par élément).
 
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :param k: Indice du troisième élément.
-        :return: Vrai si le triplet satisfait la contrainte MOT3, sinon Faux.
+        :param relation: Une matrice booléenne (n, n).
+        :return: La matrice de la fermeture transitive.
         """
-        # Implémentation simplifiée pour démonstration ; la logique réelle dépend de l'application
-        # MOT3 vérifie si l'ordre de préférence entre trois éléments respecte une règle de majorité
-        return (i < j and j < k) or (k < j and j < i)
+        closure = np.array(relation, dtype=bool)
+        for k in range(closure.shape[0]):
+            closure |= closure[:, k, None] & closure[None, k, :]
+        return closure
 
-    def _compute_lubc_constraint(self, i: int, j: int) -> int:
+    def _store(self, fixed: np.ndarray):
+        """
+        Enregistre les paires fixées sous forme de bits et calcule les bornes de position.
         """
-        Calcule la contrainte LUBC entre deux éléments (i, j).
+        self._bits = np.packbits(fixed, axis=None)
+        self.nb_fixed_pairs = int(np.count_nonzero(fixed))
+        # LUBC : positions (à partir de 0) possibles de chaque élément
+        self.lower_positions = fixed.sum(axis=0).astype(np.int64)
+        self.upper_positions = (self.n - 1 - fixed.sum(axis=1)).astype(np.int64)
 
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :return: La valeur de la contrainte LUBC entre i et j.
+    def matrix(self) -> np.ndarray:
         """
-        # Implémentation simplifiée pour démonstration ; la logique réelle dépend de l'application
-        # LUBC est souvent utilisé pour établir des bornes supérieures dans l'élagage d'un arbre de recherche
-        return abs(i - j)
+        Matrice booléenne (n, n) des paires fixées : [i][j] est vrai si i + 1 précède j + 1 dans toutes les
+        médianes.
+        """
+        return np.unpackbits(self._bits, count=self.n * self.n).astype(bool).reshape(self.n, self.n)
 
-    def check_mot3(self, pi: List[int]) -> bool:
+    def before(self, i: int, j: int) -> bool:
         """
-        Vérifie si une permutation respecte toutes les contraintes MOT3.
+        Indique si l'élément i + 1 doit précéder l'élément j + 1, en lisant un seul bit.
 
-        :param pi: La permutation à vérifier.
-        :return: Vrai si la permutation respecte toutes les contraintes MOT3, sinon Faux.
+        :param i: Indice du premier élément (à partir de 0).
+        :param j: Indice du deuxième élément (à partir de 0).
         """
-        for i in range(self.n):
-            for j in range(self.n):
-                for k in range(self.n):
-                    if self.tabMOT3[i][j][k] and not self._check_order(pi, i, j, k):
-                        return False
-        return True
+        bit = i * self.n + j
+        return bool((self._bits[bit >> 3] >> (7 - (bit & 7))) & 1)
 
-    def _check_order(self, pi: List[int], i: int, j: int, k: int) -> bool:
+    @property
+    def fixed_ratio(self) -> float:
         """
-        Vérifie si l'ordre de la permutation respecte l'ordre attendu entre les éléments i, j, et k.
+        Proportion des n(n - 1)/2 paires dont l'ordre est fixé.
+        """
+        return 2.0 * self.nb_fixed_pairs / (self.n * (self.n - 1)) if self.n > 1 else 1.0
 
-        :param pi: La permutation à vérifier.
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :param k: Indice du troisième élément.
-        :return: Vrai si l'ordre est respecté, sinon Faux.
+    @property
+    def position_bounds(self) -> List[Tuple[int, int]]:
+        """
+        Bornes LUBC : la liste des couples (position minimale, position maximale) de chaque élément.
         """
-        pos_i = pi.index(i)
-        pos_j = pi.index(j)
-        pos_k = pi.index(k)
-        return (pos_i < pos_j < pos_k) or (pos_k < pos_j < pos_i)
+        return list(zip(self.lower_positions.tolist(), self.upper_positions.tolist()))
+
+    @staticmethod
+    def _positions(pi: Sequence[int]) -> np.ndarray:
+        positions = np.empty(len(pi), dtype=np.int64)
+        positions[np.asarray(pi, dtype=np.int64) - 1] = np.arange(len(pi))
+        return positions
 
-    def check_lubc(self, pi: List[int]) -> bool:
+    def check_mot3(self, pi: Sequence[int]) -> bool:
         """
-        Vérifie si une permutation respecte toutes les contraintes LUBC.
+        Vérifie si une permutation respecte toutes les paires fixées.
 
-        :param pi: La permutation à vérifier.
-        :return: Vrai si la permutation respecte toutes les contraintes LUBC, sinon Faux.
+        :param pi: La permutation à vérifier (éléments de 1 à n).
+        :return: Vrai si la permutation respecte toutes les contraintes MOT3, sinon Faux.
         """
-        for i in range(self.n):
-            for j in range(self.n):
-                if i != j and self.tabLUBC[i][j] > 0:
-                    if not self._check_distance(pi, i, j):
-                        return False
-        return True
+        positions = self._positions(pi)
+        rows, cols = np.nonzero(self.matrix())
+        return bool(np.all(positions[rows] < positions[cols]))
 
-    def _check_distance(self, pi: List[int], i: int, j: int) -> bool:
+    def check_lubc(self, pi: Sequence[int]) -> bool:
         """
-        Vérifie si la distance entre deux éléments dans la permutation respecte la contrainte LUBC.
+        Vérifie si chaque élément d'une permutation est placé entre ses bornes de position.
 
-        :param pi: La permutation à vérifier.
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :return: Vrai si la distance est respectée, sinon Faux.
+        :param pi: La permutation à vérifier (éléments de 1 à n).
+        :return: Vrai si la permutation respecte toutes les contraintes LUBC, sinon Faux.
         """
-        distance = abs(pi.index(i) - pi.index(j))
-        return distance <= self.tabLUBC[i][j]
+        positions = self._positions(pi)
+        return bool(np.all((self.lower_positions <= positions) & (positions <= self.upper_positions)))
 
     def apply_constraints(self, permutations: List[List[int]]) -> List[List[int]]:
         """
@@ -120,29 +168,36 @@ class MOT3LUBC:
         :param permutations: La liste des permutations à filtrer.
         :return: La liste des permutations qui respectent toutes les contraintes.
         """
-        valid_permutations = []
-        for pi in permutations:
-            if self.check_mot3(pi) and self.check_lubc(pi):
-                valid_permutations.append(pi)
-        return valid_permutations
+        return [pi for pi in permutations if self.check_mot3(pi) and self.check_lubc(pi)]
 
-    def add_custom_mot3_constraint(self, i: int, j: int, k: int, value: bool):
+    def add_custom_mot3_constraint(self, i: int, j: int):
         """
-        Ajoute ou modifie une contrainte MOT3 personnalisée pour un triplet d'éléments (i, j, k).
+        Impose que l'élément i + 1 précède l'élément j + 1, puis met à jour la fermeture transitive et les bornes.
 
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :param k: Indice du troisième élément.
-        :param value: La valeur booléenne de la contrainte (True pour active, False pour désactive).
+        :param i: Indice du premier élément (à partir de 0).
+        :param j: Indice du deuxième élément (à partir de 0).
         """
-        self.tabMOT3[i][j][k] = value
+        fixed = self.matrix()
+        if fixed[j][i] or i == j:
+            raise ValueError(f"La paire ({i + 1}, {j + 1}) contredit les paires déjà fixées")
+        fixed[i][j] = True
+        self._store(self.transitive_closure(fixed))
 
-    def add_custom_lubc_constraint(self, i: int, j: int, value: int):
-        """
-        Ajoute ou modifie une contrainte LUBC personnalisée entre deux éléments (i, j).
 
-        :param i: Indice du premier élément.
-        :param j: Indice du deuxième élément.
-        :param value: La valeur entière de la contrainte LUBC.
-        """
-        self.tabLUBC[i][j] = value
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from .preference_matrix import build_preference_matrix
+
+    rankings = [
+        [1, 2, 3, 4, 5],
+        [1, 3, 2, 4, 5],
+        [2, 1, 3, 5, 4],
+        [1, 2, 4, 3, 5]
+    ]
+    constraints = MOT3LUBC(build_preference_matrix(rankings), len(rankings))
+    print("Paires fixées :")
+    print(constraints.matrix().astype(int))
+    print(f"{constraints.nb_fixed_pairs} paires fixées ({100 * constraints.fixed_ratio:.0f} %), "
+          f"par règle : {constraints.nb_pairs_by_rule}")
+    print("Bornes de position :", constraints.position_bounds)
+    print("[1, 2, 3, 4, 5] respecte les contraintes :", constraints.check_mot3([1, 2, 3, 4, 5]))
@@ -1,12 +1,25 @@
-from typing import List, Dict, Any
-from permutation import Permutation
-from preprocessing import PermutationPreprocessor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..algorithms.AutoSelect.AutoSelect import auto_select
+from .instance import Instance
+from .permutation import Permutation
+from .preference_matrix import build_preference_matrix, lower_bound, score_permutation
+from .preprocessing import PermutationPreprocessor
+from .ranking_multiset import RankingMultiset
 
 
 class Consensus:
     """
     Classe pour représenter et gérer un objet Consensus.
     Un Consensus est défini comme une liste de classements (classements de consensus).
+
+    L'objet tient à jour la matrice de préférence des classements et le score de Kemeny de la dernière médiane
+    calculée : ajouter ou retirer un classement applique une mise à jour vectorisée en O(n²) au lieu de
+    reconstruire la matrice en O(m * n²). Il tient aussi à jour le multiensemble des classements distincts et de
+    leurs nombres d'occurrences, à partir duquel l'instance passée aux solveurs est construite sans parcourir les
+    m classements.
     """
 
     def __init__(self, rankings: List[List[int]], additional_info: Dict[str, Any] = None):
@@ -20,6 +33,21 @@ class Consensus:
         self.rankings = [Permutation(preprocessor.normalize_permutation(r)) for r in rankings]
         self.additional_info = additional_info if additional_info is not None else {}
 
+        self.n = len(self.rankings[0]) if self.rankings else None
+        self.preference_matrix: Optional[np.ndarray] = None
+        self.median: Optional[Permutation] = None
+        self.median_score: Optional[int] = None
+        # Nombre d'occurrences de chaque classement distinct
+        self._counts: Dict[Permutation, int] = {}
+        if self.rankings:
+            if any(len(r) != self.n for r in self.rankings):
+                raise ValueError("Tous les classements doivent avoir la même taille.")
+            for ranking in self.rankings:
+                self._counts[ranking] = self._counts.get(ranking, 0) + 1
+            # Les classements identiques ne sont comparés qu'une fois
+            multiset = self._multiset()
+            self.preference_matrix = build_preference_matrix(multiset.rankings, weights=multiset.weights)
+
     def __repr__(self):
         """
         Représentation en chaîne de caractères de l'objet Consensus.
@@ -35,17 +63,87 @@ class Consensus:
         """
         preprocessor = PermutationPreprocessor()
         normalized_ranking = preprocessor.normalize_permutation(ranking)
-        self.rankings.append(Permutation(normalized_ranking))
+        if self.n is None or (not self.rankings and len(normalized_ranking) != self.n):
+            self.n = len(normalized_ranking)
+            self.preference_matrix = np.zeros((self.n, self.n), dtype=np.int64)
+            self._counts = {}
+            self.median = None
+            self.median_score = None
+        elif len(normalized_ranking) != self.n:
+            raise ValueError(f"Le classement doit contenir {self.n} éléments.")
+
+        permutation = Permutation(normalized_ranking)
+        self.rankings.append(permutation)
+        self._counts[permutation] = self._counts.get(permutation, 0) + 1
+        self._apply_ranking(normalized_ranking, 1)
 
     def remove_ranking(self, index: int):
         """
-        Supprime un classement de l'objet Consensus par son index.
+        Supprime un classement de l'objet Consensus par son index, en O(n²).
+
+        Le dernier classement prend la place du classement supprimé (l'ordre des classements n'a pas d'incidence
+        sur le consensus) : seul l'index du dernier classement change.
 
         :param index: L'index du classement à supprimer.
         """
         if index < 0 or index >= len(self.rankings):
             raise IndexError("Index hors limites.")
-        self.rankings.pop(index)
+        ranking = self.rankings[index]
+        last = self.rankings.pop()
+        if index < len(self.rankings):
+            self.rankings[index] = last
+        if self._counts[ranking] == 1:
+            del self._counts[ranking]
+        else:
+            self._counts[ranking] -= 1
+        self._apply_ranking(ranking.elements, -1)
+
+    def _apply_ranking(self, ranking: List[int], sign: int):
+        """
+        Ajoute (sign = 1) ou retire (sign = -1) les préférences d'un classement à la matrice de préférence, et met
+        à jour le score de la médiane courante de la distance de Kendall-Tau entre celle-ci et le classement.
+
+        :param ranking: Le classement (permutation de 1 à n).
+        :param sign: 1 pour un ajout, -1 pour un retrait.
+        """
+        positions = np.empty(self.n, dtype=np.int64)
+        positions[np.asarray(ranking) - 1] = np.arange(self.n)
+        # before[i][j] est vrai si i + 1 précède j + 1 dans le classement
+        before = positions[:, None] < positions[None, :]
+        self.preference_matrix += sign * before
+        if self.median is not None:
+            self.median_score += sign * score_permutation(self.median.elements, before.T)
+
+    @property
+    def tabD(self) -> Optional[np.ndarray]:
+        """
+        La matrice des distances des classements courants (voir Instance.tabD).
+        """
+        return None if self.preference_matrix is None else self.preference_matrix.T
+
+    def lower_bound(self) -> int:
+        """
+        Borne inférieure simple du score de Kemeny des classements courants.
+        """
+        return 0 if self.preference_matrix is None else lower_bound(self.tabD)
+
+    def _multiset(self) -> RankingMultiset:
+        """
+        Le multiensemble des classements courants, construit à partir des classements distincts.
+        """
+        return RankingMultiset.from_unique(np.stack([ranking.to_array() for ranking in self._counts]),
+                                           list(self._counts.values()))
+
+    def to_instance(self) -> Instance:
+        """
+        Construit l'instance des classements courants à partir des classements distincts, sans recalculer la
+        matrice de préférence.
+
+        :return: Un objet Instance.
+        """
+        if not self.rankings:
+            raise ValueError("Le consensus ne contient aucun classement.")
+        return Instance(self._multiset(), preference_matrix=self.preference_matrix.copy())
 
     def get_ranking(self, index: int) -> Permutation:
         """
@@ -66,16 +164,28 @@ class Consensus:
         """
         return self.rankings
 
-    def compute_consensus(self) -> Permutation:
+    def compute_consensus(self, time_limit: Optional[float] = None, n_jobs: Optional[int] = None,
+                          seed: Optional[int] = None) -> Tuple[Permutation, int]:
         """
-        Calcule un classement de consensus à partir des classements actuels.
-        Cette méthode peut implémenter un algorithme spécifique pour générer le classement de consensus.
-
-        :return: Un classement de consensus basé sur les classements actuels sous forme d'objet Permutation.
+        Calcule un classement de consensus de Kemeny-Young à partir des classements actuels.
+
+        Les algorithmes sont choisis automatiquement selon la taille des composantes de Condorcet et le budget de
+        temps (voir auto_select) : programmation dynamique exacte pour les petites composantes, Branch and Bound
+        amorcé par les heuristiques pour les moyennes, recuit simulé pour les grandes. Lorsqu'une médiane a déjà
+        été calculée, la résolution repart d'elle.
+
+        :param time_limit: La durée maximale du calcul en secondes (facultatif).
+        :param n_jobs: Le nombre de processus utilisés par les solveurs (facultatif).
+        :param seed: La graine du générateur aléatoire (facultatif).
+        :return: Le couple (classement de consensus sous forme d'objet Permutation, écart entre son score et la
+                 meilleure borne inférieure obtenue ; 0 si la médiane est prouvée optimale).
         """
-        # Implémentation simplifiée : retourne la première permutation comme consensus.
-        # Vous pouvez remplacer cela par un algorithme plus sophistiqué, comme la méthode de Kemeny-Young.
-        return self.rankings[0]
+        instance = self.to_instance()
+        auto_select(instance, time_limit=time_limit, n_jobs=n_jobs, seed=seed,
+                    initial_permutation=None if self.median is None else self.median.elements)
+        self.median = instance.medians[0]
+        self.median_score = instance.medians_score
+        return self.median, int(instance.get_gap())
 
     def add_additional_info(self, key: str, value: Any):
         """
@@ -147,8 +257,15 @@ if __name__ == "__main__":
     # Affichage de tous les classements
     print("Tous les classements :", [r.elements for r in consensus.get_all_rankings()])
 
-    # Calcul du consensus (implémentation simplifiée)
-    print("Classement de consensus :", consensus.compute_consensus().elements)
+    # Calcul du consensus
+    median, gap = consensus.compute_consensus()
+    print("Classement de consensus :", median.elements, "écart :", gap)
+
+    # Mise à jour incrémentale, puis nouveau calcul à partir de la médiane précédente
+    consensus.add_ranking([4, 3, 2, 1])
+    print("Score de la médiane précédente :", consensus.median_score)
+    median, gap = consensus.compute_consensus(time_limit=1.0)
+    print("Classement de consensus :", median.elements, consensus.median_score, "écart :", gap)
 
     # Ajout d'informations supplémentaires
     consensus.add_additional_info("méthode", "Copeland")
@@ -0,0 +1,94 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class InsertionState:
+    """
+    Classe pour représenter une permutation modifiée par mouvements d'insertion (retirer l'élément à la position
+    source et le réinsérer à la position cible).
+
+    L'ordre courant est tenu dans un tableau mutable accompagné du tableau inverse des positions, et les mouvements
+    sont appliqués en place. Le coût d'un mouvement se lit sur la ligne de la matrice antisymétrique
+    W = tabD - tabD^T de l'élément déplacé : O(n) pour une cible, et O(n) pour toutes les cibles à la fois
+    grâce à une somme préfixe.
+    """
+
+    def __init__(self, tab_d: np.ndarray, order: Sequence[int], energy: Optional[int] = None,
+                 antisymmetric: Optional[np.ndarray] = None):
+        """
+        Initialise l'état à partir d'un ordre d'indices (éléments à partir de 0).
+
+        :param tab_d: La matrice des distances (n, n).
+        :param order: L'ordre initial, sous forme d'indices de 0 à n - 1.
+        :param energy: Le score de l'ordre initial, s'il est déjà connu (facultatif).
+        :param antisymmetric: La matrice tabD - tabD^T, si elle est déjà calculée (facultatif).
+        """
+        tab_d = np.asarray(tab_d)
+        self.n = tab_d.shape[0]
+        if antisymmetric is None:
+            antisymmetric = tab_d.astype(np.int64) - tab_d.T
+        self.antisymmetric = antisymmetric
+        self.order = np.array(order, dtype=np.int64)
+        self.position = np.empty(self.n, dtype=np.int64)
+        self.position[self.order] = np.arange(self.n)
+        if energy is None:
+            energy = int(np.triu(tab_d[np.ix_(self.order, self.order)], 1).sum())
+        self.energy = energy
+
+    def delta(self, source: int, target: int) -> int:
+        """
+        Variation du score si l'élément à la position source est réinséré à la position target.
+
+        :param source: La position de l'élément déplacé.
+        :param target: Sa nouvelle position.
+        :return: La variation du score.
+        """
+        row = self.antisymmetric[self.order[source]]
+        if target < source:
+            return int(row[self.order[target:source]].sum())
+        if target > source:
+            return -int(row[self.order[source + 1:target + 1]].sum())
+        return 0
+
+    def deltas(self, source: int) -> np.ndarray:
+        """
+        Variation du score pour chacune des n positions cibles de l'élément à la position source.
+
+        :param source: La position de l'élément déplacé.
+        :return: Un tableau (n,) des variations (0 pour target == source).
+        """
+        row = self.antisymmetric[self.order[source]][self.order]
+        prefix = np.concatenate(([0], np.cumsum(row)))
+        targets = np.arange(self.n)
+        return np.where(targets < source, prefix[source] - prefix[targets],
+                        prefix[source + 1] - prefix[targets + 1])
+
+    def apply(self, source: int, target: int, delta: Optional[int] = None):
+        """
+        Applique en place le mouvement d'insertion de source vers target.
+
+        :param source: La position de l'élément déplacé.
+        :param target: Sa nouvelle position.
+        :param delta: La variation du score déjà calculée (facultatif).
+        """
+        if delta is None:
+            delta = self.delta(source, target)
+        element = self.order[source]
+        if target < source:
+            self.order[target + 1:source + 1] = self.order[target:source]
+            low, high = target, source
+        elif target > source:
+            self.order[source:target] = self.order[source + 1:target + 1]
+            low, high = source, target
+        else:
+            return
+        self.order[target] = element
+        self.position[self.order[low:high + 1]] = np.arange(low, high + 1)
+        self.energy += delta
+
+    def permutation(self) -> list:
+        """
+        Retourne l'ordre courant sous forme de permutation des éléments 1 à n.
+        """
+        return (self.order + 1).tolist()
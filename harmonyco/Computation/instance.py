@@ -0,0 +1,400 @@
+import random
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .MOT3_LUBC import MOT3LUBC
+from .permutation import Permutation
+from .preference_matrix import (RankingsLike, build_preference_matrix, distance_matrix, lower_bound,
+                                rankings_to_positions, score_permutation)
+from .ranking_multiset import RankingMultiset
+
+
+class Instance:
+    """
+    Classe pour représenter une instance du problème de la médiane de permutations.
+
+    L'instance est construite en une seule passe sur l'ensemble des classements : seule la matrice des distances
+    tabD est calculée à la construction. Les tables de contraintes et les bornes utilisées par les solveurs exacts
+    (tab_c, tab_contraintes_d, tab_triplets, triangles de la borne add3cycles) sont calculées à la première demande,
+    de sorte qu'une heuristique comme Borda ne paie jamais le coût O(n³) des triplets.
+
+    Les classements identiques sont regroupés à la construction (voir RankingMultiset) : rankings contient les
+    classements distincts, weights leur nombre d'occurrences et m le nombre total de classements.
+    """
+
+    def __init__(self, permutations: Union[RankingsLike, RankingMultiset],
+                 preference_matrix: Optional[np.ndarray] = None, weights: Optional[Sequence[int]] = None):
+        """
+        Initialise l'instance à partir d'un ensemble de permutations.
+
+        :param permutations: Une liste de classements (permutations de 1 à n), un tableau (m, n) ou un
+                             RankingMultiset.
+        :param preference_matrix: La matrice de préférence des classements, si elle est déjà tenue à jour ailleurs
+                                  (facultatif ; elle n'est alors pas recalculée).
+        :param weights: Le nombre d'occurrences de chaque classement (facultatif, 1 par défaut).
+        """
+        if not isinstance(permutations, RankingMultiset) or weights is not None:
+            permutations = RankingMultiset(permutations if not isinstance(permutations, RankingMultiset)
+                                           else permutations.rankings, weights)
+        self.rankings = permutations.rankings
+        self.weights = permutations.weights
+        self.m, self.n = permutations.m, permutations.n
+        if preference_matrix is None:
+            preference_matrix = build_preference_matrix(self.rankings, weights=self.weights)
+        self.preference_matrix = preference_matrix
+        self.tabD = distance_matrix(self.preference_matrix)
+
+        self.best_upper_bound = float('inf')
+        self.medians: List[Permutation] = []
+        self._median_set = set()
+        self.medians_score = float('inf')
+        self.is_optimal = False
+        self.memory_limit = 100000
+
+        self._best_lower_bound = None
+        self._A = None
+        self._simple_lower_bound = None
+        self._constraints = None
+        self._tab_c = None
+        self._tab_contraintes_d = None
+        self._tab_triplets = None
+        self._tab_triangle_associe = None
+        self._tab_triangle_add = None
+        self._add3cycles_lower_bound = None
+        self._apport = None
+
+    @classmethod
+    def random(cls, m: int, n: int, seed: Optional[int] = None) -> 'Instance':
+        """
+        Crée une instance de m permutations de taille n tirées uniformément au hasard.
+
+        :param m: Le nombre de permutations.
+        :param n: La taille des permutations.
+        :param seed: La graine du générateur aléatoire (facultatif).
+        :return: L'instance générée.
+        """
+        rng = np.random.default_rng(seed)
+        return cls(np.argsort(rng.random((m, n)), axis=1) + 1)
+
+    def subinstance(self, elements: Sequence[int]) -> 'Instance':
+        """
+        Crée l'instance restreinte à un sous-ensemble d'éléments.
+
+        Chaque classement est projeté sur les éléments retenus, renumérotés de 1 à k dans l'ordre de la liste :
+        l'élément k de la sous-instance correspond à l'élément elements[k - 1] + 1 de l'instance.
+
+        :param elements: Les éléments retenus, sous forme d'indices de 0 à n - 1.
+        :return: La sous-instance (k éléments, m classements).
+        """
+        positions = rankings_to_positions(self.rankings)[:, list(elements)]
+        sub = Instance(np.argsort(positions, axis=1, kind='stable') + 1, weights=self.weights)
+        sub.memory_limit = self.memory_limit
+        return sub
+
+    def __repr__(self):
+        """
+        Représentation en chaîne de caractères de l'instance.
+        :return: Une chaîne de caractères représentant l'instance.
+        """
+        return f"Instance(m={self.m}, n={self.n}, best_upper_bound={self.best_upper_bound})"
+
+    @property
+    def tab_d(self) -> np.ndarray:
+        """
+        Alias de tabD utilisé par le Branch and Bound.
+        """
+        return self.tabD
+
+    @property
+    def A(self) -> List[Permutation]:
+        """
+        L'ensemble A des permutations distinctes de l'instance, sous forme d'objets Permutation.
+        """
+        if self._A is None:
+            self._A = [Permutation(ranking, check=False) for ranking in self.rankings]
+        return self._A
+
+    # ------------------------------------------------------------------
+    # Bornes
+    # ------------------------------------------------------------------
+
+    @property
+    def simple_lower_bound(self) -> int:
+        """
+        Somme sur toutes les paires du minimum des deux coûts possibles.
+        """
+        if self._simple_lower_bound is None:
+            self._simple_lower_bound = lower_bound(self.tabD)
+        return self._simple_lower_bound
+
+    @property
+    def best_lower_bound(self) -> int:
+        """
+        Meilleure borne inférieure connue (la borne simple tant qu'aucune autre n'a été déclarée).
+        """
+        if self._best_lower_bound is None:
+            return self.simple_lower_bound
+        return self._best_lower_bound
+
+    @best_lower_bound.setter
+    def best_lower_bound(self, value: int):
+        self._best_lower_bound = value
+
+    def set_lower_bound(self, score: int):
+        """
+        Met à jour la borne inférieure si la valeur fournie l'améliore.
+
+        :param score: Une borne inférieure du score de Kemeny.
+        """
+        if score > self.best_lower_bound:
+            self.best_lower_bound = score
+
+    def set_upper_bound(self, score: int):
+        """
+        Met à jour la borne supérieure si la valeur fournie l'améliore.
+
+        :param score: Le score d'une permutation trouvée par un solveur.
+        """
+        if score < self.best_upper_bound:
+            self.best_upper_bound = score
+
+    def get_gap(self) -> float:
+        """
+        Retourne l'écart entre la meilleure borne supérieure et la meilleure borne inférieure.
+        """
+        return self.best_upper_bound - self.best_lower_bound
+
+    def get_relative_gap(self) -> float:
+        """
+        Retourne l'écart relatif (en %) entre les bornes.
+        """
+        if self.best_upper_bound in (0, float('inf')):
+            return 0.0 if self.best_upper_bound == 0 else 100.0
+        return 100.0 * self.get_gap() / self.best_upper_bound
+
+    def declare_is_optimal(self):
+        """
+        Déclare la meilleure borne supérieure optimale (appelé par les solveurs exacts).
+        """
+        self.is_optimal = True
+        self.best_lower_bound = self.best_upper_bound
+
+    # ------------------------------------------------------------------
+    # Médianes trouvées par les solveurs
+    # ------------------------------------------------------------------
+
+    def distance_to_set_matrix(self, permutation: Union[Permutation, Sequence[int]]) -> int:
+        """
+        Calcule le score de Kemeny d'une permutation par rapport à l'ensemble de l'instance.
+
+        :param permutation: Une permutation (objet Permutation ou liste d'éléments).
+        :return: La somme des distances de Kendall-Tau aux permutations de l'instance.
+        """
+        if isinstance(permutation, Permutation):
+            return permutation.distance_to_set_matrix(self.tabD)
+        return score_permutation(permutation, self.tabD)
+
+    def add_solver_permutation(self, permutation: Union[Permutation, Sequence[int]]):
+        """
+        Propose une permutation trouvée par un solveur. Seules les permutations de meilleur score sont conservées.
+
+        :param permutation: La permutation proposée.
+        """
+        if not isinstance(permutation, Permutation):
+            permutation = Permutation(permutation)
+        score = self.distance_to_set_matrix(permutation)
+        permutation.set_dist(score)
+        if score < self.medians_score:
+            self.medians_score = score
+            self.medians = [permutation]
+            self._median_set = {permutation}
+        elif score == self.medians_score and permutation not in self._median_set:
+            self.medians.append(permutation)
+            self._median_set.add(permutation)
+        self.set_upper_bound(score)
+
+    def add_solver_permutations(self, permutations: Iterable[Union[Permutation, Sequence[int]]]):
+        """
+        Propose plusieurs permutations trouvées par un solveur.
+
+        :param permutations: Les permutations proposées.
+        """
+        for permutation in permutations:
+            self.add_solver_permutation(permutation)
+
+    def pick_a_random_median(self) -> Permutation:
+        """
+        Retourne une des meilleures permutations connues, choisie au hasard.
+        """
+        return random.choice(self.medians)
+
+    # ------------------------------------------------------------------
+    # Tables de contraintes (calculées à la demande)
+    # ------------------------------------------------------------------
+
+    @property
+    def constraints(self) -> MOT3LUBC:
+        """
+        Paires fixées (règles de Pareto, des 3/4 et de Condorcet étendue, fermées transitivement) et bornes de
+        position des éléments, voir MOT3LUBC.
+        """
+        if self._constraints is None:
+            self._constraints = MOT3LUBC(self.preference_matrix, self.m)
+        return self._constraints
+
+    @property
+    def tab_c(self) -> np.ndarray:
+        """
+        tab_c[i][j] est vrai si l'élément i + 1 précède l'élément j + 1 dans toutes les médianes (voir constraints).
+        """
+        if self._tab_c is None:
+            self._tab_c = self.constraints.matrix()
+        return self._tab_c
+
+    @property
+    def tabC(self) -> np.ndarray:
+        """
+        Alias de tab_c.
+        """
+        return self.tab_c
+
+    @property
+    def tab_contraintes_d(self) -> np.ndarray:
+        """
+        tab_contraintes_d[i][j] est vrai si l'élément j + 1 peut être placé immédiatement après l'élément i + 1,
+        c'est-à-dire si l'échange de ces deux voisins n'améliore pas le score.
+        """
+        if self._tab_contraintes_d is None:
+            self._tab_contraintes_d = self.tabD <= self.tabD.T
+        return self._tab_contraintes_d
+
+    @property
+    def tab_triplets(self) -> np.ndarray:
+        """
+        tab_triplets[i][j][k] est vrai si les éléments i + 1, j + 1, k + 1 peuvent être consécutifs dans cet ordre,
+        c'est-à-dire si aucun réarrangement de ces trois voisins n'améliore le score.
+        """
+        if self._tab_triplets is None:
+            n = self.n
+            d = self.tabD
+            self._tab_triplets = np.empty((n, n, n), dtype=bool)
+            for i in range(n):
+                # Coût de chacun des six ordres possibles des éléments (i, j, k), pour tous les j (lignes) et k
+                row_j, row_k = d[i][:, None], d[i][None, :]
+                col_j, col_k = d[:, i][:, None], d[:, i][None, :]
+                order_ijk = row_j + row_k + d
+                order_ikj = row_j + row_k + d.T
+                order_jik = col_j + row_k + d
+                order_jki = col_j + col_k + d
+                order_kij = row_j + col_k + d.T
+                order_kji = col_j + col_k + d.T
+                best = np.minimum.reduce([order_ikj, order_jik, order_jki, order_kij, order_kji])
+                self._tab_triplets[i] = order_ijk <= best
+        return self._tab_triplets
+
+    # ------------------------------------------------------------------
+    # Borne add3cycles (triangles de la tournoi majoritaire)
+    # ------------------------------------------------------------------
+
+    def _compute_triangles(self):
+        """
+        Sélectionne un ensemble de 3-cycles de la tournoi majoritaire disjoints par les arêtes.
+
+        Dans chaque 3-cycle, au moins une paire est nécessairement placée contre la majorité : la borne simple
+        peut donc être augmentée du plus petit écart majoritaire du cycle. Les cycles étant disjoints par les
+        arêtes, ces apports s'additionnent.
+        """
+        n = self.n
+        d = self.tabD
+        beats = d < d.T
+        gap = d.T - d
+
+        candidates = []
+        for a in range(n):
+            # Cycles a -> b -> c -> a avec a le plus petit indice du cycle
+            mask = beats[a][:, None] & beats & beats[:, a][None, :]
+            mask[:a + 1, :] = False
+            mask[:, :a + 1] = False
+            b_idx, c_idx = np.nonzero(mask)
+            if len(b_idx):
+                weights = np.minimum(np.minimum(gap[a, b_idx], gap[b_idx, c_idx]), gap[c_idx, a])
+                candidates.extend(zip(weights.tolist(), [a] * len(b_idx), b_idx.tolist(), c_idx.tolist()))
+
+        candidates.sort(key=lambda x: -x[0])
+
+        associe = np.zeros((n, n), dtype=np.int32)
+        add = np.zeros((n, n), dtype=d.dtype)
+        apport = np.zeros(n, dtype=d.dtype)
+        total = 0
+        for weight, a, b, c in candidates:
+            if associe[a][b] or associe[b][c] or associe[c][a]:
+                continue
+            for x, y, z in ((a, b, c), (b, c, a), (c, a, b)):
+                associe[x][y] = associe[y][x] = z + 1
+                add[x][y] = add[y][x] = weight
+                apport[x] += weight
+            total += weight
+
+        self._tab_triangle_associe = associe
+        self._tab_triangle_add = add
+        self._apport = apport
+        self._add3cycles_lower_bound = int(total)
+
+    @property
+    def tab_triangle_associe(self) -> np.ndarray:
+        """
+        tab_triangle_associe[i][j] est le troisième élément (à partir de 1) du triangle sélectionné contenant
+        la paire (i + 1, j + 1), ou 0 si la paire n'appartient à aucun triangle.
+        """
+        if self._tab_triangle_associe is None:
+            self._compute_triangles()
+        return self._tab_triangle_associe
+
+    @property
+    def tab_nb_triangle_associe(self) -> np.ndarray:
+        """
+        Nombre de triangles sélectionnés contenant chaque paire (0 ou 1, les triangles étant disjoints).
+        """
+        return (self.tab_triangle_associe != 0).astype(np.uint8)
+
+    @property
+    def tab_triangle_add(self) -> np.ndarray:
+        """
+        tab_triangle_add[i][j] est l'apport à la borne du triangle contenant la paire (i + 1, j + 1).
+        """
+        if self._tab_triangle_add is None:
+            self._compute_triangles()
+        return self._tab_triangle_add
+
+    @property
+    def apport(self) -> np.ndarray:
+        """
+        apport[i] est la somme des apports des triangles sélectionnés contenant l'élément i + 1.
+        """
+        if self._apport is None:
+            self._compute_triangles()
+        return self._apport
+
+    @property
+    def add3cyles_lower_bound(self) -> int:
+        """
+        Apport total des triangles sélectionnés, à ajouter à la borne inférieure simple.
+        """
+        if self._add3cycles_lower_bound is None:
+            self._compute_triangles()
+        return self._add3cycles_lower_bound
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    instance = Instance([
+        [1, 3, 2, 4],
+        [4, 2, 3, 1],
+        [2, 1, 4, 3]
+    ])
+
+    print(instance)
+    print("Matrice des distances :\n", instance.tabD)
+    print("Borne inférieure simple :", instance.simple_lower_bound)
+    print("Apport des 3-cycles :", instance.add3cyles_lower_bound)
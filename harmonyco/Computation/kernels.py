@@ -0,0 +1,195 @@
+import os
+
+import numpy as np
+
+# Backend des noyaux de calcul, choisi à l'importation : compilés par Numba s'il est installé (et si la variable
+# d'environnement HARMONYCO_DISABLE_NUMBA ne vaut pas 1), sinon exécutés tels quels en Python.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+USE_NUMBA = numba is not None and os.environ.get('HARMONYCO_DISABLE_NUMBA') != '1'
+BACKEND = 'numba' if USE_NUMBA else 'python'
+
+
+def jit(function):
+    """
+    Compile une fonction avec numba.njit si le backend compilé est actif, sinon la retourne inchangée.
+
+    La version Python reste accessible par l'attribut py_func dans les deux cas.
+    """
+    if USE_NUMBA:
+        return numba.njit(cache=True, nogil=True)(function)
+    function.py_func = function
+    return function
+
+
+@jit
+def inversion_count(values):
+    """
+    Compte les inversions d'un tableau de valeurs distinctes de 1 à n avec un arbre de Fenwick.
+
+    :param values: Un tableau (n,) d'entiers de 1 à n.
+    :return: Le nombre de paires i < j telles que values[i] > values[j].
+    """
+    n = values.shape[0]
+    tree = np.zeros(n + 1, dtype=np.int64)
+    inversions = 0
+    for i in range(n):
+        # Nombre de valeurs déjà vues inférieures ou égales à la valeur courante
+        seen = 0
+        index = values[i]
+        while index > 0:
+            seen += tree[index]
+            index -= index & -index
+        inversions += i - seen
+
+        index = values[i]
+        while index <= n:
+            tree[index] += 1
+            index += index & -index
+    return inversions
+
+
+@jit
+def insertion_delta(order, antisymmetric, source, target):
+    """
+    Variation du score quand l'élément à la position source est réinséré à la position target
+    (voir InsertionState.delta).
+    """
+    element = order[source]
+    delta = 0
+    if target < source:
+        for k in range(target, source):
+            delta += antisymmetric[element, order[k]]
+    else:
+        for k in range(source + 1, target + 1):
+            delta -= antisymmetric[element, order[k]]
+    return delta
+
+
+@jit
+def sa_anneal(order, position, antisymmetric, energy, sources, targets, thresholds):
+    """
+    Boucle de mouvements d'un électron du recuit simulé (voir sa_run), en place sur order et position.
+
+    :param order: L'ordre courant (indices), modifié en place.
+    :param position: Le tableau inverse de order, modifié en place.
+    :param antisymmetric: La matrice tabD - tabD^T.
+    :param energy: Le score de l'ordre courant.
+    :param sources: Les positions des éléments déplacés, une par mouvement.
+    :param targets: Les positions cibles, une par mouvement.
+    :param thresholds: Les seuils d'acceptation -T * log(u), un par mouvement.
+    :return: (score final, meilleur score rencontré, meilleur ordre rencontré).
+    """
+    e_min = energy
+    p_min = order.copy()
+    for i in range(sources.shape[0]):
+        r2 = sources[i]
+        r1 = targets[i]
+        if r1 == r2:
+            continue
+        delta = insertion_delta(order, antisymmetric, r2, r1)
+        if delta <= 0 or delta < thresholds[i]:
+            element = order[r2]
+            if r1 < r2:
+                for k in range(r2, r1, -1):
+                    order[k] = order[k - 1]
+                    position[order[k]] = k
+            else:
+                for k in range(r2, r1):
+                    order[k] = order[k + 1]
+                    position[order[k]] = k
+            order[r1] = element
+            position[element] = r1
+            energy += delta
+            if energy < e_min:
+                e_min = energy
+                p_min[:] = order
+    return energy, e_min, p_min
+
+
+@jit
+def child_bounds(tab_d, tab_min, candidates, remaining, semi_dist, lower_bound, lower_bound_add, contributions):
+    """
+    Bornes des fils d'un nœud du Branch and Bound (voir BranchAndBoundSearch.children) :
+    semi-distance + borne simple des restants + apport des triangles.
+
+    :return: Un tableau des bornes, dans l'ordre de candidates.
+    """
+    bounds = np.empty(candidates.shape[0], dtype=np.int64)
+    for c in range(candidates.shape[0]):
+        element = candidates[c]
+        rest = 0
+        rest_min = 0
+        for r in range(remaining.shape[0]):
+            rest += tab_d[element, remaining[r]]
+            rest_min += tab_min[element, remaining[r]]
+        bounds[c] = (semi_dist + rest) + (lower_bound - rest_min) + (lower_bound_add - contributions[element])
+    return bounds
+
+
+def check_parity(trials=200, seed=0):
+    """
+    Vérifie que les noyaux du backend actif donnent les mêmes résultats que leur version Python et que les
+    implémentations NumPy de référence, sur des entrées aléatoires.
+
+    :param trials: Le nombre d'entrées aléatoires par noyau.
+    :param seed: La graine du générateur aléatoire.
+    :return: Le nombre de vérifications effectuées (une AssertionError est levée au premier écart).
+    """
+    from .insertion import InsertionState
+
+    rng = np.random.default_rng(seed)
+    checks = 0
+    for _ in range(trials):
+        n = int(rng.integers(1, 40))
+        values = rng.permutation(n) + 1
+        expected = int(np.triu(values[:, None] > values[None, :], 1).sum())
+        assert inversion_count(values) == inversion_count.py_func(values) == expected
+        checks += 1
+
+        tab_d = rng.integers(0, 10, size=(n, n)).astype(np.int64)
+        np.fill_diagonal(tab_d, 0)
+        state = InsertionState(tab_d, rng.permutation(n))
+        source, target = int(rng.integers(0, n)), int(rng.integers(0, n))
+        expected = state.delta(source, target)
+        assert insertion_delta(state.order, state.antisymmetric, source, target) == expected
+        assert insertion_delta.py_func(state.order, state.antisymmetric, source, target) == expected
+        checks += 1
+
+        moves = int(rng.integers(0, 200))
+        sources = rng.integers(0, n, size=moves)
+        targets = rng.integers(0, n, size=moves)
+        thresholds = rng.random(moves) * 5
+        results = []
+        for kernel in (sa_anneal, sa_anneal.py_func):
+            order, position = state.order.copy(), state.position.copy()
+            energy, e_min, p_min = kernel(order, position, state.antisymmetric, state.energy, sources, targets,
+                                          thresholds)
+            assert energy == InsertionState(tab_d, order).energy
+            assert e_min == InsertionState(tab_d, p_min).energy
+            assert (position[order] == np.arange(n)).all()
+            results.append((energy, e_min, order.tolist(), p_min.tolist()))
+        assert results[0] == results[1]
+        checks += 1
+
+        tab_min = np.minimum(tab_d, tab_d.T)
+        used = rng.random(n) < 0.5
+        remaining = np.flatnonzero(~used)
+        candidates = remaining[rng.random(len(remaining)) < 0.7]
+        contributions = rng.integers(0, 5, size=n).astype(np.int64)
+        expected = (7 + tab_d[np.ix_(candidates, remaining)].sum(axis=1)) + \
+                   (11 - tab_min[np.ix_(candidates, remaining)].sum(axis=1)) + (3 - contributions[candidates])
+        for kernel in (child_bounds, child_bounds.py_func):
+            bounds = kernel(tab_d, tab_min, candidates, remaining, 7, 11, 3, contributions)
+            assert (bounds == expected).all()
+        checks += 1
+    return checks
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    print(f"Backend des noyaux : {BACKEND}")
+    print(f"Parité vérifiée ({check_parity()} vérifications)")
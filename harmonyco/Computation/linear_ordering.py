@@ -0,0 +1,138 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Tolérance sur les valeurs des variables relâchées
+TOLERANCE = 1e-6
+
+
+def pair_index(n: int) -> np.ndarray:
+    """
+    Numérotation des paires i < j : index[i][j] est le numéro de la variable de la paire (0 sur la diagonale et
+    sous elle, qui ne sont pas utilisées).
+
+    Les paires sont numérotées ligne par ligne : (0, 1), (0, 2), ..., (0, n - 1), (1, 2), ...
+
+    :param n: Le nombre d'éléments.
+    :return: Un tableau (n, n) d'entiers.
+    """
+    index = np.zeros((n, n), dtype=np.int64)
+    rows, cols = np.triu_indices(n, 1)
+    index[rows, cols] = np.arange(len(rows))
+    return index
+
+
+def objective_coefficients(tab_d: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Objectif linéaire de la formulation par ordre linéaire.
+
+    La variable y_ij (i < j) vaut 1 si i est placé avant j. Le score d'un ordre vaut
+    somme_{i<j} tabD[i][j] * y_ij + tabD[j][i] * (1 - y_ij) = constante + somme_{i<j} (tabD[i][j] - tabD[j][i]) * y_ij.
+
+    :param tab_d: La matrice des distances (n, n).
+    :return: Le couple (coefficients des variables dans l'ordre de pair_index, constante).
+    """
+    tab_d = np.asarray(tab_d, dtype=np.int64)
+    rows, cols = np.triu_indices(tab_d.shape[0], 1)
+    return tab_d[rows, cols] - tab_d[cols, rows], int(tab_d[cols, rows].sum())
+
+
+def order_matrix(values: Sequence[float], n: int) -> np.ndarray:
+    """
+    Matrice complète P des relations d'ordre à partir des valeurs des variables : P[i][j] = y_ij si i < j,
+    1 - y_ji si i > j, et 0 sur la diagonale.
+
+    :param values: Les valeurs des n(n - 1)/2 variables, dans l'ordre de pair_index.
+    :param n: Le nombre d'éléments.
+    :return: Un tableau (n, n) de réels.
+    """
+    matrix = np.zeros((n, n))
+    rows, cols = np.triu_indices(n, 1)
+    matrix[rows, cols] = values
+    matrix[cols, rows] = 1.0 - np.asarray(values, dtype=float)
+    return matrix
+
+
+def violated_triangles(matrix: np.ndarray, max_cuts: Optional[int] = None,
+                       tolerance: float = TOLERANCE) -> List[Tuple[int, int, int]]:
+    """
+    Sépare les contraintes de transitivité : cherche les triplets (i, j, k) tels que
+    P[i][j] + P[j][k] + P[k][i] > 2, c'est-à-dire un cycle i -> j -> k -> i.
+
+    Pour chaque i, les sommes P[i][j] + P[j][k] + P[k][i] de tous les couples (j, k) sont calculées en une
+    opération NumPy (n, n) ; la mémoire reste en O(n²). Chaque cycle est rapporté une seule fois, avec i le plus
+    petit de ses trois éléments.
+
+    :param matrix: La matrice P des relations d'ordre (voir order_matrix).
+    :param max_cuts: Le nombre maximal de triplets retournés, les plus violés d'abord (facultatif).
+    :param tolerance: La violation minimale prise en compte.
+    :return: La liste des triplets violés.
+    """
+    n = matrix.shape[0]
+    found_triangles, found_violations = [], []
+    for i in range(n - 2):
+        # sums[j][k] = P[i][j] + P[j][k] + P[k][i], restreint à i < j et i < k
+        sums = matrix[i, i + 1:, None] + matrix[i + 1:, i + 1:] + matrix[None, i + 1:, i]
+        js, ks = np.nonzero(sums > 2.0 + tolerance)
+        if len(js):
+            found_triangles.append(np.column_stack((np.full(len(js), i), js + i + 1, ks + i + 1)))
+            found_violations.append(sums[js, ks])
+    if not found_triangles:
+        return []
+    triangles = np.concatenate(found_triangles)
+    violations = np.concatenate(found_violations)
+    if max_cuts is not None and len(triangles) > max_cuts:
+        triangles = triangles[np.argsort(-violations, kind='stable')[:max_cuts]]
+    return [tuple(int(v) for v in triangle) for triangle in triangles]
+
+
+def triangle_cut(i: int, j: int, k: int) -> Tuple[List[Tuple[int, int, int]], int]:
+    """
+    Contrainte P[i][j] + P[j][k] + P[k][i] <= 2 exprimée sur les variables des paires.
+
+    :return: Le couple (liste de (a, b, coefficient) avec a < b, second membre).
+    """
+    terms, rhs = [], 2
+    for a, b in ((i, j), (j, k), (k, i)):
+        if a < b:
+            terms.append((a, b, 1))
+        else:
+            # P[a][b] = 1 - y_ba
+            terms.append((b, a, -1))
+            rhs -= 1
+    return terms, rhs
+
+
+def order_from_matrix(matrix: np.ndarray) -> List[int]:
+    """
+    Permutation associée à une matrice de relations d'ordre : les éléments sont triés par nombre décroissant
+    d'éléments placés après eux. Si la matrice est entière et transitive, c'est exactement l'ordre qu'elle code.
+
+    :param matrix: La matrice P des relations d'ordre.
+    :return: La permutation (éléments de 1 à n).
+    """
+    return (np.argsort(-matrix.sum(axis=1), kind='stable') + 1).tolist()
+
+
+def pair_values(permutation: Sequence[int]) -> np.ndarray:
+    """
+    Valeurs des variables des paires pour une permutation donnée (par exemple pour un démarrage à chaud).
+
+    :param permutation: La permutation (éléments de 1 à n).
+    :return: Les n(n - 1)/2 valeurs 0 ou 1, dans l'ordre de pair_index.
+    """
+    positions = np.empty(len(permutation), dtype=np.int64)
+    positions[np.asarray(permutation) - 1] = np.arange(len(permutation))
+    rows, cols = np.triu_indices(len(permutation), 1)
+    return (positions[rows] < positions[cols]).astype(np.int64)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    # Ordre 1 < 2 < 3 < 4 sauf la paire (1, 3) inversée : cycles 1 -> 2 -> 3 -> 1
+    values = pair_values([1, 2, 3, 4])
+    values[pair_index(4)[0, 2]] = 0
+    matrix = order_matrix(values, 4)
+    print("Triplets violés :", violated_triangles(matrix))
+    print("Contrainte :", triangle_cut(0, 1, 2))
+    print("Ordre :", order_from_matrix(matrix))
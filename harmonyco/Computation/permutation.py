@@ -1,34 +1,86 @@
-from typing import List
+from array import array
+from typing import List, Sequence, Union
+
+import numpy as np
+
+from .preference_matrix import score_permutation
 
 
 class Permutation:
     """
     Classe pour représenter une permutation. Une permutation est définie comme une liste ordonnée d'éléments uniques.
+
+    Les solveurs créent un très grand nombre de permutations : les éléments sont stockés dans un tableau compact
+    array('i') (4 octets par élément), la classe n'a pas de __dict__ (__slots__), et l'inverse et le hachage ne
+    sont calculés qu'à la première demande. La distance de Kendall-Tau est calculée en O(n log n) par comptage
+    des inversions (arbre de Fenwick).
     """
 
-    def __init__(self, elements: List[int]):
+    __slots__ = ('_elements', '_inverse', '_hash', 'dist')
+
+    def __init__(self, elements: Union[Sequence[int], np.ndarray, array], check: bool = True):
         """
         Initialise une permutation avec une liste d'éléments.
 
-        :param elements: Une liste d'entiers représentant une permutation.
+        :param elements: Une liste d'entiers, un tableau NumPy ou un array('i') représentant une permutation.
+        :param check: Si True, vérifie que les éléments sont uniques (les solveurs qui construisent eux-mêmes
+                      des permutations valides peuvent passer False).
         """
-        if len(elements) != len(set(elements)):
+        if isinstance(elements, np.ndarray):
+            buffer = array('i')
+            buffer.frombytes(np.ascontiguousarray(elements, dtype=np.int32).tobytes())
+        else:
+            buffer = array('i', elements)
+        if check and len(buffer) != len(set(buffer)):
             raise ValueError("Tous les éléments doivent être uniques.")
-        self.elements = elements
+        self._elements = buffer
+        self._inverse = None
+        self._hash = None
+        # Distance (ou score) associée à la permutation par un algorithme, voir set_dist
+        self.dist = None
+
+    @property
+    def elements(self) -> List[int]:
+        """
+        Les éléments de la permutation, sous forme d'une nouvelle liste.
+        """
+        return self._elements.tolist()
+
+    def to_array(self) -> np.ndarray:
+        """
+        Les éléments de la permutation sous forme d'un tableau NumPy int32 en lecture seule, sans copie.
+        """
+        view = np.frombuffer(self._elements, dtype=np.int32)
+        view.flags.writeable = False
+        return view
+
+    def get_tab(self) -> List[int]:
+        """
+        Alias de elements.
+        """
+        return self.elements
+
+    def set_dist(self, dist: int):
+        """
+        Associe une distance (par exemple le score de Kemeny) à la permutation.
+
+        :param dist: La distance.
+        """
+        self.dist = dist
 
     def __repr__(self):
         """
         Représentation en chaîne de caractères de la permutation.
         :return: Une chaîne de caractères représentant la permutation.
         """
-        return f"Permutation({self.elements})"
+        return f"Permutation({self._elements.tolist()})"
 
     def __len__(self):
         """
         Retourne la taille de la permutation.
         :return: La taille de la permutation.
         """
-        return len(self.elements)
+        return len(self._elements)
 
     def __getitem__(self, index: int) -> int:
         """
@@ -37,7 +89,44 @@ class Permutation:
         :param index: L'index de l'élément.
         :return: L'élément à l'index donné.
         """
-        return self.elements[index]
+        return self._elements[index]
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __eq__(self, other) -> bool:
+        """
+        Deux permutations sont égales si elles ont les mêmes éléments dans le même ordre.
+        """
+        if not isinstance(other, Permutation):
+            return NotImplemented
+        return self._elements == other._elements
+
+    def __hash__(self) -> int:
+        """
+        Hachage de la permutation, calculé une seule fois. Il est égal à celui du tuple de ses éléments et ne
+        dépend donc pas de l'exécution (contrairement au hachage des chaînes et des octets).
+        """
+        if self._hash is None:
+            self._hash = hash(tuple(self._elements))
+        return self._hash
+
+    @property
+    def inverse(self) -> array:
+        """
+        L'inverse de la permutation (calculé une seule fois) : inverse[e - 1] est la position, à partir de 1, de
+        l'élément e.
+        """
+        if self._inverse is None:
+            n = len(self._elements)
+            values = self.to_array().astype(np.int64)
+            if n and (values.min() < 1 or values.max() > n):
+                raise ValueError("Les éléments doivent être les entiers de 1 à n.")
+            inverse = np.empty(n, dtype=np.int32)
+            inverse[values - 1] = np.arange(1, n + 1, dtype=np.int32)
+            self._inverse = array('i')
+            self._inverse.frombytes(inverse.tobytes())
+        return self._inverse
 
     def invert(self) -> 'Permutation':
         """
@@ -45,28 +134,46 @@ class Permutation:
 
         :return: Une nouvelle permutation qui est l'inverse de la permutation actuelle.
         """
-        inverted = [0] * len(self.elements)
-        for i, element in enumerate(self.elements):
-            inverted[element - 1] = i + 1
-        return Permutation(inverted)
+        inverted = Permutation(self.inverse, check=False)
+        inverted._inverse = self._elements
+        return inverted
 
-    def distance(self, other: 'Permutation') -> int:
+    def distance(self, other: Union['Permutation', Sequence[int]]) -> int:
         """
         Calcule la distance de Kendall-Tau entre cette permutation et une autre.
-        La distance de Kendall-Tau est le nombre de paires discordantes entre deux permutations.
+        La distance de Kendall-Tau est le nombre de paires d'éléments placées dans un ordre différent par les deux
+        permutations ; elle se calcule en O(n log n) en comptant les inversions des positions, dans l'autre
+        permutation, des éléments pris dans l'ordre de celle-ci.
 
         :param other: Une autre permutation.
         :return: La distance de Kendall-Tau entre les deux permutations.
         """
-        if len(self.elements) != len(other):
+        if not isinstance(other, Permutation):
+            other = Permutation(other, check=False)
+        if len(self._elements) != len(other):
             raise ValueError("Les deux permutations doivent avoir la même taille.")
+        if not self._elements:
+            return 0
+        # Importé à la demande : charger Numba coûte plusieurs centaines de millisecondes au démarrage
+        from . import kernels
+        positions = np.frombuffer(other.inverse, dtype=np.int32)
+        return int(kernels.inversion_count(positions[self.to_array() - 1].astype(np.int64)))
+
+    def distance_to(self, other: Union['Permutation', Sequence[int]]) -> int:
+        """
+        Alias de distance.
+        """
+        return self.distance(other)
 
-        inversion_count = 0
-        for i in range(len(self.elements)):
-            for j in range(i + 1, len(self.elements)):
-                if (self.elements[i] < self.elements[j]) != (other[i] < other[j]):
-                    inversion_count += 1
-        return inversion_count
+    def distance_to_set_matrix(self, tab_d: np.ndarray) -> int:
+        """
+        Calcule le score de Kemeny de la permutation à partir de la matrice des distances d'un ensemble
+        (instance.tabD), c'est-à-dire la somme de ses distances de Kendall-Tau aux permutations de l'ensemble.
+
+        :param tab_d: La matrice des distances (n, n).
+        :return: Le score de Kemeny.
+        """
+        return score_permutation(self.to_array(), tab_d)
 
     def is_identity(self) -> bool:
         """
@@ -74,7 +181,7 @@ class Permutation:
 
         :return: True si la permutation est l'identité, sinon False.
         """
-        return self.elements == list(range(1, len(self.elements) + 1))
+        return bool(np.array_equal(self.to_array(), np.arange(1, len(self._elements) + 1)))
 
     def apply(self, other: 'Permutation') -> 'Permutation':
         """
@@ -83,11 +190,10 @@ class Permutation:
         :param other: La permutation à appliquer.
         :return: Une nouvelle permutation résultant de l'application de l'autre permutation à celle-ci.
         """
-        if len(self.elements) != len(other):
+        if len(self._elements) != len(other):
             raise ValueError("Les deux permutations doivent avoir la même taille.")
-
-        applied = [self.elements[other[i] - 1] for i in range(len(self.elements))]
-        return Permutation(applied)
+        other_array = other.to_array() if isinstance(other, Permutation) else np.asarray(other)
+        return Permutation(self.to_array()[other_array - 1], check=False)
 
     def to_cycle_notation(self) -> str:
         """
@@ -95,17 +201,17 @@ class Permutation:
 
         :return: Une chaîne de caractères représentant la permutation en notation cyclique.
         """
-        visited = [False] * len(self.elements)
+        visited = [False] * len(self._elements)
         cycles = []
 
-        for i in range(len(self.elements)):
+        for i in range(len(self._elements)):
             if not visited[i]:
                 cycle = []
                 x = i
                 while not visited[x]:
                     visited[x] = True
                     cycle.append(x + 1)
-                    x = self.elements[x] - 1
+                    x = self._elements[x] - 1
                 if len(cycle) > 1:
                     cycles.append(cycle)
 
@@ -125,3 +231,4 @@ if __name__ == "__main__":
     print("Permutation identité ?", p2.is_identity())
     print("Application de p2 à p1 :", p1.apply(p2))
     print("Notation cyclique de p1 :", p1.to_cycle_notation())
+    print("Ensemble de permutations :", {p1, p2, Permutation([4, 3, 2, 1])})
@@ -0,0 +1,193 @@
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# Budget mémoire (en octets) du tableau booléen intermédiaire (c, n, n) utilisé lors de la construction par blocs.
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+RankingsLike = Union[np.ndarray, Sequence[Sequence[int]]]
+
+
+def rankings_to_array(rankings: RankingsLike) -> np.ndarray:
+    """
+    Convertit un ensemble de classements en un tableau NumPy (m, n) d'entiers.
+
+    :param rankings: Une liste de classements (permutations de 1 à n) ou un tableau (m, n).
+    :return: Un tableau d'entiers de forme (m, n).
+    """
+    array = np.asarray(rankings)
+    if array.ndim != 2:
+        raise ValueError("Les classements doivent former un tableau à deux dimensions (m, n).")
+    if not np.issubdtype(array.dtype, np.integer):
+        array = array.astype(np.int64)
+    return array
+
+
+def rankings_to_positions(rankings: RankingsLike) -> np.ndarray:
+    """
+    Calcule la position de chaque élément dans chaque classement.
+
+    positions[k][e] est la position (à partir de 0) de l'élément e + 1 dans le classement k.
+
+    :param rankings: Un tableau (m, n) de classements (éléments de 1 à n).
+    :return: Un tableau (m, n) de positions.
+    """
+    array = rankings_to_array(rankings)
+    m, n = array.shape
+    dtype = np.int16 if n <= np.iinfo(np.int16).max else np.int32
+    positions = np.empty((m, n), dtype=dtype)
+    rows = np.arange(m)[:, None]
+    positions[rows, array - 1] = np.arange(n, dtype=dtype)
+    return positions
+
+
+def default_chunk_size(n: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> int:
+    """
+    Nombre de classements traités par bloc pour que le tableau intermédiaire (c, n, n) tienne dans le budget.
+
+    :param n: Le nombre d'éléments.
+    :param chunk_bytes: Le budget mémoire en octets.
+    :return: La taille de bloc (au moins 1).
+    """
+    return max(1, chunk_bytes // max(1, n * n))
+
+
+def accumulate_preference_matrix(preference_matrix: np.ndarray, positions: np.ndarray,
+                                 chunk_size: Optional[int] = None,
+                                 weights: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Ajoute à une matrice de préférence existante les comparaisons issues d'un bloc de positions.
+
+    :param preference_matrix: La matrice (n, n) à mettre à jour en place.
+    :param positions: Un tableau (m, n) de positions (voir rankings_to_positions).
+    :param chunk_size: Le nombre de classements comparés simultanément (facultatif).
+    :param weights: Le poids (nombre d'occurrences) de chaque classement (facultatif, 1 par défaut).
+    :return: La matrice de préférence mise à jour.
+    """
+    m, n = positions.shape
+    if chunk_size is None:
+        # Avec des poids, les comparaisons d'un bloc sont converties en entiers de 8 octets
+        chunk_size = default_chunk_size(n) if weights is None else default_chunk_size(n, DEFAULT_CHUNK_BYTES // 8)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=preference_matrix.dtype)
+
+    for start in range(0, m, chunk_size):
+        block = positions[start:start + chunk_size]
+        # before[k][i][j] est vrai si i précède j dans le classement k
+        before = block[:, :, None] < block[:, None, :]
+        if weights is None:
+            preference_matrix += before.sum(axis=0, dtype=preference_matrix.dtype)
+        else:
+            preference_matrix += (weights[start:start + chunk_size] @ before.reshape(len(block), n * n)).reshape(n, n)
+    return preference_matrix
+
+
+def build_preference_matrix(rankings: RankingsLike, chunk_size: Optional[int] = None,
+                            weights: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Construit la matrice de préférence d'un ensemble de classements.
+
+    preference_matrix[i][j] est le nombre de classements dans lesquels l'élément i + 1 précède l'élément j + 1.
+    La construction compare les rangs par diffusion NumPy, par blocs de classements pour borner la mémoire,
+    soit O(m * n²) opérations vectorisées au lieu d'une triple boucle Python. Avec des poids (classements
+    distincts d'un RankingMultiset), chaque classement compte autant de fois que son poids.
+
+    :param rankings: Une liste de classements ou un tableau (m, n).
+    :param chunk_size: Le nombre de classements traités par bloc (facultatif).
+    :param weights: Le poids (nombre d'occurrences) de chaque classement (facultatif, 1 par défaut).
+    :return: La matrice de préférence (n, n) d'entiers.
+    """
+    positions = rankings_to_positions(rankings)
+    n = positions.shape[1]
+    preference_matrix = np.zeros((n, n), dtype=np.int64)
+    return accumulate_preference_matrix(preference_matrix, positions, chunk_size, weights)
+
+
+def build_preference_matrix_from_chunks(chunks: Iterable[RankingsLike], n: int,
+                                        chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Construit la matrice de préférence à partir d'un flux de blocs de classements.
+
+    :param chunks: Un itérable de tableaux (c, n) de classements.
+    :param n: Le nombre d'éléments.
+    :param chunk_size: Le nombre de classements comparés simultanément (facultatif).
+    :return: La matrice de préférence (n, n).
+    """
+    preference_matrix = np.zeros((n, n), dtype=np.int64)
+    for chunk in chunks:
+        accumulate_preference_matrix(preference_matrix, rankings_to_positions(chunk), chunk_size=chunk_size)
+    return preference_matrix
+
+
+def distance_matrix(preference_matrix: np.ndarray) -> np.ndarray:
+    """
+    Convertit une matrice de préférence en matrice des distances utilisée par les solveurs (instance.tabD).
+
+    tabD[i][j] est le coût de placer l'élément i + 1 avant l'élément j + 1, c'est-à-dire le nombre de
+    classements dans lesquels j + 1 précède i + 1.
+
+    :param preference_matrix: La matrice de préférence (n, n).
+    :return: La matrice des distances (n, n).
+    """
+    return np.ascontiguousarray(preference_matrix.T)
+
+
+def score_permutation(permutation: Sequence[int], tab_d: np.ndarray) -> int:
+    """
+    Calcule la distance de Kendall-Tau totale d'une permutation à l'ensemble décrit par tabD.
+
+    :param permutation: Une permutation des éléments 1 à n.
+    :param tab_d: La matrice des distances (n, n).
+    :return: Le score de Kemeny de la permutation.
+    """
+    order = np.asarray(permutation, dtype=np.int64) - 1
+    return int(np.triu(tab_d[np.ix_(order, order)], 1).sum())
+
+
+def score_permutations(permutations: RankingsLike, tab_d: np.ndarray, chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Calcule le score de Kemeny de plusieurs permutations à la fois, par blocs de lignes.
+
+    :param permutations: Un tableau (k, n) de permutations des éléments 1 à n.
+    :param tab_d: La matrice des distances (n, n).
+    :param chunk_size: Le nombre de permutations évaluées simultanément (facultatif).
+    :return: Les k scores.
+    """
+    orders = rankings_to_array(permutations) - 1
+    k, n = orders.shape
+    if chunk_size is None:
+        chunk_size = default_chunk_size(n, DEFAULT_CHUNK_BYTES // tab_d.itemsize)
+    upper = np.triu(np.ones((n, n), dtype=bool), 1)
+
+    scores = np.empty(k, dtype=np.int64)
+    for start in range(0, k, chunk_size):
+        block = orders[start:start + chunk_size]
+        # costs[b][i][j] = tabD[block[b][i]][block[b][j]]
+        costs = tab_d[block[:, :, None], block[:, None, :]]
+        scores[start:start + chunk_size] = (costs * upper).sum(axis=(1, 2))
+    return scores
+
+
+def lower_bound(tab_d: np.ndarray) -> int:
+    """
+    Borne inférieure simple du score de Kemeny : somme sur les paires du minimum des deux coûts.
+
+    :param tab_d: La matrice des distances (n, n).
+    :return: La borne inférieure.
+    """
+    return int(np.triu(np.minimum(tab_d, tab_d.T), 1).sum())
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    rankings = [
+        [1, 2, 3, 4],
+        [4, 3, 2, 1],
+        [2, 1, 4, 3]
+    ]
+
+    preferences = build_preference_matrix(rankings)
+    print("Matrice de préférence :\n", preferences)
+    tab_d = distance_matrix(preferences)
+    print("Score de [2, 1, 3, 4] :", score_permutation([2, 1, 3, 4], tab_d))
+    print("Borne inférieure :", lower_bound(tab_d))
@@ -1,4 +1,7 @@
-from typing import List, Tuple
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 class PermutationPreprocessor:
@@ -93,6 +96,169 @@ class PermutationPreprocessor:
         return processed_perms
 
 
+class MajorityGraphPreprocessor:
+    """
+    Classe pour décomposer une instance selon le graphe majoritaire (critère de Condorcet étendu).
+
+    Le graphe majoritaire contient l'arc i -> j lorsqu'au moins autant de classements placent i avant j que
+    l'inverse (les égalités donnent donc un arc dans chaque sens). Ses composantes fortement connexes sont
+    totalement ordonnées : si C1 précède C2, chaque élément de C1 bat strictement chaque élément de C2, et toute
+    médiane place C1 avant C2. Chaque composante peut donc être résolue séparément.
+    """
+
+    @staticmethod
+    def majority_graph(tab_d: np.ndarray) -> np.ndarray:
+        """
+        Construit la matrice d'adjacence du graphe majoritaire.
+
+        :param tab_d: La matrice des distances (n, n).
+        :return: Une matrice booléenne (n, n), vraie en [i][j] si placer i avant j ne coûte pas plus que l'inverse.
+        """
+        tab_d = np.asarray(tab_d)
+        graph = tab_d <= tab_d.T
+        np.fill_diagonal(graph, False)
+        return graph
+
+    @staticmethod
+    def strongly_connected_components(graph: np.ndarray) -> List[List[int]]:
+        """
+        Calcule les composantes fortement connexes d'un graphe orienté (algorithme de Tarjan, version itérative).
+
+        :param graph: La matrice d'adjacence booléenne (n, n).
+        :return: Les composantes (indices à partir de 0), dans l'ordre topologique du graphe condensé.
+        """
+        n = graph.shape[0]
+        successors = [np.flatnonzero(row).tolist() for row in graph]
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                v, i = work[-1]
+                if i < len(successors[v]):
+                    work[-1] = (v, i + 1)
+                    w = successors[v][i]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(sorted(component))
+
+        # Tarjan produit les composantes dans l'ordre topologique inverse
+        components.reverse()
+        return components
+
+    @staticmethod
+    def condorcet_components(tab_d: np.ndarray) -> List[List[int]]:
+        """
+        Calcule les composantes fortement connexes du graphe majoritaire, dans l'ordre où elles apparaissent
+        dans toute médiane.
+
+        :param tab_d: La matrice des distances (n, n).
+        :return: Les composantes (indices à partir de 0).
+        """
+        return MajorityGraphPreprocessor.strongly_connected_components(
+            MajorityGraphPreprocessor.majority_graph(tab_d))
+
+    @staticmethod
+    def solve_by_components(instance, algorithm: Callable, verbose: bool = False, time_limit: Optional[float] = None,
+                            initial_permutation: Optional[Sequence[int]] = None, **kwargs):
+        """
+        Résout une instance composante par composante et concatène les médianes obtenues.
+
+        L'algorithme est appelé sur la sous-instance de chaque composante de plus de deux éléments ; une
+        composante de deux éléments est à égalité, ses deux ordres sont optimaux. Le coût des paires entre
+        composantes est fixé, la borne inférieure de l'instance est donc la somme de ce coût et des bornes des
+        sous-instances, et la médiane est optimale si toutes les sous-instances ont été résolues exactement.
+
+        :param instance: L'instance à résoudre.
+        :param algorithm: Une fonction algorithm(instance, **kwargs) qui ajoute ses médianes à l'instance.
+        :param verbose: Si True, affiche la taille des composantes.
+        :param time_limit: Durée totale en secondes (facultatif). Le temps restant est partagé entre les
+                           composantes restantes au prorata du carré de leur taille et transmis à l'algorithme
+                           par son paramètre time_limit.
+        :param initial_permutation: Une permutation de départ (éléments de 1 à n), projetée sur chaque composante
+                                    et transmise à l'algorithme par son paramètre initial_permutation (facultatif).
+        :param kwargs: Les paramètres transmis à l'algorithme.
+        :return: La liste des composantes (indices à partir de 0).
+        """
+        components = MajorityGraphPreprocessor.condorcet_components(instance.tabD)
+        if verbose:
+            sizes = [len(component) for component in components]
+            print(f"{len(components)} composantes de Condorcet, taille maximale {max(sizes, default=0)}")
+
+        deadline = None if time_limit is None else time.time() + time_limit
+        initial_rank = None
+        if initial_permutation is not None:
+            initial_rank = np.empty(instance.n, dtype=np.int64)
+            initial_rank[np.asarray(list(initial_permutation), dtype=np.int64) - 1] = np.arange(instance.n)
+        remaining_weight = sum(len(component) ** 2 for component in components if len(component) > 2)
+
+        median = []
+        lower_bound = 0
+        optimal = True
+        for component in components:
+            if len(component) <= 2:
+                median.extend(element + 1 for element in component)
+                lower_bound += int(instance.tabD[component[0], component[-1]])
+                continue
+            sub = instance.subinstance(component)
+            arguments = dict(kwargs)
+            if deadline is not None:
+                share = len(component) ** 2 / remaining_weight
+                arguments['time_limit'] = max(0.0, deadline - time.time()) * share
+                remaining_weight -= len(component) ** 2
+            if initial_rank is not None:
+                arguments['initial_permutation'] = (np.argsort(initial_rank[component], kind='stable') + 1).tolist()
+            algorithm(sub, **arguments)
+            if not sub.medians:
+                raise RuntimeError("L'algorithme n'a proposé aucune permutation pour une composante.")
+            median.extend(component[element - 1] + 1 for element in sub.medians[0].elements)
+            lower_bound += sub.best_lower_bound
+            optimal = optimal and sub.is_optimal
+
+        # Coût des paires entre composantes, identique dans toutes les médianes
+        rank = np.empty(instance.n, dtype=np.int64)
+        rank[[element for component in components for element in component]] = np.repeat(
+            np.arange(len(components)), [len(component) for component in components])
+        across = rank[:, None] < rank[None, :]
+        lower_bound += int(instance.tabD[across].sum())
+
+        instance.add_solver_permutation(median)
+        instance.set_lower_bound(lower_bound)
+        if optimal:
+            instance.declare_is_optimal()
+        return components
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     preprocessor = PermutationPreprocessor()
@@ -118,3 +284,13 @@ if __name__ == "__main__":
     # Conversion de la notation cyclique à la notation standard
     standard_notation = preprocessor.convert_from_cycle_notation(cycle_notation, 4)
     print("Notation standard à partir de la notation cyclique :", standard_notation)
+
+    # Décomposition selon le graphe majoritaire
+    from .instance import Instance
+
+    instance = Instance([
+        [1, 2, 3, 4, 5],
+        [2, 3, 1, 5, 4],
+        [3, 1, 2, 4, 5]
+    ])
+    print("Composantes de Condorcet :", MajorityGraphPreprocessor.condorcet_components(instance.tabD))
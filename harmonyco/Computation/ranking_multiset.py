@@ -0,0 +1,190 @@
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from .preference_matrix import DEFAULT_CHUNK_BYTES, RankingsLike, rankings_to_array
+
+# Multiplicateurs (impairs, 64 bits) du hachage des lignes, fixés pour que le hachage soit reproductible
+_HASH_SEED = 0x5EED
+
+
+def row_hashes(rankings: RankingsLike, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> np.ndarray:
+    """
+    Hache chaque classement en un entier de 64 bits : somme des éléments multipliés par des constantes impaires
+    tirées au hasard, modulo 2**64. Le calcul est vectorisé par blocs de lignes.
+
+    Deux classements égaux ont le même hachage ; deux classements différents peuvent entrer en collision, avec
+    une probabilité de l'ordre de 2**-64 par paire.
+
+    :param rankings: Un tableau (m, n) de classements.
+    :param chunk_bytes: Le budget mémoire d'un bloc.
+    :return: Les m hachages (uint64).
+    """
+    array = rankings_to_array(rankings)
+    m, n = array.shape
+    multipliers = np.random.default_rng(_HASH_SEED).integers(0, 2 ** 63, size=n, dtype=np.uint64) * 2 + 1
+    chunk_size = max(1, chunk_bytes // max(1, 8 * n))
+    hashes = np.empty(m, dtype=np.uint64)
+    for start in range(0, m, chunk_size):
+        block = array[start:start + chunk_size].astype(np.uint64)
+        hashes[start:start + chunk_size] = (block * multipliers).sum(axis=1, dtype=np.uint64)
+    return hashes
+
+
+class RankingMultiset:
+    """
+    Multiensemble de classements : les classements distincts, dans l'ordre de leur première apparition, et le
+    nombre d'occurrences (poids) de chacun.
+
+    Les classements identiques sont fréquents dans les données réelles (sondages, journaux de clics) ; toutes
+    les opérations en O(m), comme la construction de la matrice de préférence ou le calcul d'un score de Kemeny,
+    ne parcourent ainsi que les k classements distincts, pondérés.
+    """
+
+    def __init__(self, rankings: RankingsLike, weights: Optional[Sequence[int]] = None):
+        """
+        Regroupe les classements identiques.
+
+        :param rankings: Une liste de classements ou un tableau (m, n).
+        :param weights: Le poids entier de chaque classement (1 par défaut).
+        """
+        array = rankings_to_array(rankings)
+        if weights is None:
+            weights = np.ones(array.shape[0], dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.int64)
+        if weights.shape != (array.shape[0],):
+            raise ValueError("Il faut un poids par classement.")
+        if (weights < 0).any():
+            raise ValueError("Les poids doivent être positifs ou nuls.")
+        self.rankings, self.weights = self._deduplicate(array, weights)
+
+    @staticmethod
+    def _deduplicate(array: np.ndarray, weights: np.ndarray):
+        """
+        Regroupe les lignes identiques d'un tableau et additionne leurs poids.
+
+        Les lignes sont regroupées par hachage (un tri de m entiers au lieu d'un tri lexicographique des lignes),
+        puis chaque ligne est comparée au représentant de son groupe ; en cas de collision, le regroupement est
+        refait par comparaison des lignes entières.
+        """
+        if array.shape[0] == 0:
+            return array.copy(), weights.copy()
+        _, first, inverse = np.unique(row_hashes(array), return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        if not np.array_equal(array[first[inverse]], array):
+            rows = np.ascontiguousarray(array).view(np.dtype((np.void, array.dtype.itemsize * array.shape[1])))
+            _, first, inverse = np.unique(rows.reshape(-1), return_index=True, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        # Groupes renumérotés dans l'ordre de première apparition
+        order = np.argsort(first, kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        totals = np.bincount(rank[inverse], weights=weights, minlength=len(order)).astype(np.int64)
+        keep = totals > 0
+        return array[first[order]][keep], totals[keep]
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[RankingsLike]) -> 'RankingMultiset':
+        """
+        Construit le multiensemble d'un flux de blocs de classements (par exemple iter_permutation_chunks) ; seuls
+        les classements distincts sont conservés en mémoire.
+
+        :param chunks: Un itérable de tableaux (c, n).
+        :return: Le multiensemble.
+        """
+        multiset = None
+        for chunk in chunks:
+            if multiset is None:
+                multiset = cls(chunk)
+            else:
+                multiset.add(chunk)
+        if multiset is None:
+            raise ValueError("Le flux ne contient aucun classement.")
+        return multiset
+
+    @classmethod
+    def from_unique(cls, rankings: RankingsLike, weights: Sequence[int]) -> 'RankingMultiset':
+        """
+        Construit le multiensemble de classements déjà distincts (tenus à jour ailleurs, par exemple par Consensus)
+        sans les regrouper à nouveau.
+
+        :param rankings: Un tableau (k, n) de classements distincts.
+        :param weights: Le poids (strictement positif) de chaque classement.
+        :return: Le multiensemble.
+        """
+        multiset = cls.__new__(cls)
+        multiset.rankings = rankings_to_array(rankings)
+        multiset.weights = np.asarray(weights, dtype=np.int64)
+        if multiset.weights.shape != (multiset.rankings.shape[0],):
+            raise ValueError("Il faut un poids par classement.")
+        return multiset
+
+    def add(self, rankings: Union['RankingMultiset', RankingsLike], weights: Optional[Sequence[int]] = None):
+        """
+        Ajoute des classements (ou un autre multiensemble) au multiensemble.
+
+        :param rankings: Les classements à ajouter, ou un objet RankingMultiset.
+        :param weights: Le poids de chaque classement ajouté (1 par défaut).
+        """
+        if isinstance(rankings, RankingMultiset):
+            rankings, weights = rankings.rankings, rankings.weights
+        other = RankingMultiset(rankings, weights)
+        if other.n != self.n and len(other.rankings) and len(self.rankings):
+            raise ValueError(f"Les classements doivent contenir {self.n} éléments.")
+        self.rankings, self.weights = self._deduplicate(
+            np.concatenate([self.rankings, other.rankings.astype(self.rankings.dtype)]),
+            np.concatenate([self.weights, other.weights]))
+
+    @property
+    def n(self) -> int:
+        """
+        Le nombre d'éléments classés.
+        """
+        return self.rankings.shape[1]
+
+    @property
+    def m(self) -> int:
+        """
+        Le nombre total de classements, doublons compris.
+        """
+        return int(self.weights.sum())
+
+    @property
+    def nb_unique(self) -> int:
+        """
+        Le nombre de classements distincts.
+        """
+        return self.rankings.shape[0]
+
+    @property
+    def compression_ratio(self) -> float:
+        """
+        Le nombre total de classements divisé par le nombre de classements distincts.
+        """
+        return self.m / self.nb_unique if self.nb_unique else 1.0
+
+    def expand(self) -> np.ndarray:
+        """
+        Retourne le tableau (m, n) de tous les classements, chacun répété selon son poids.
+        """
+        return np.repeat(self.rankings, self.weights, axis=0)
+
+    def __repr__(self):
+        return f"RankingMultiset(m={self.m}, n={self.n}, distincts={self.nb_unique})"
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from .preference_matrix import build_preference_matrix
+
+    rankings = [
+        [1, 2, 3, 4],
+        [2, 1, 3, 4],
+        [1, 2, 3, 4],
+        [4, 3, 2, 1],
+        [1, 2, 3, 4]
+    ]
+    multiset = RankingMultiset(rankings)
+    print(multiset)
+    print("Classements distincts :", multiset.rankings.tolist(), "poids :", multiset.weights.tolist())
+    print("Matrice de préférence pondérée :\n", build_preference_matrix(multiset.rankings, weights=multiset.weights))
@@ -1,57 +1,192 @@
 # algorithm_choice.py
 import argparse
+import importlib
+import inspect
+from importlib import metadata
+
+from ..Computation.instance import Instance
+from ..data.permutation_file import load_permutations
+
+# Groupe des points d'entrée par lesquels un paquet externe déclare ses algorithmes, par exemple dans son
+# pyproject.toml :
+#   [project.entry-points."harmonyco.algorithms"]
+#   mon_solveur = "mon_paquet.module:ma_fonction"
+ENTRY_POINT_GROUP = 'harmonyco.algorithms'
+
+# Algorithmes fournis avec HarmonyCo : nom -> (module relatif à harmonyco.algorithms, fonction). Les modules ne
+# sont importés qu'à la demande, de sorte que choisir borda n'importe ni PuLP ni CPLEX.
+BUILTIN_ALGORITHMS = {
+    'auto': ('.AutoSelect.AutoSelect', 'auto_select'),
+    'BestOfA': ('.BestOfA.BestOfA', 'heuristic_best_of_a'),
+    'borda': ('.borda.borda', 'heuristic_borda_count'),
+    'branchandbound': ('.branchandbound.branchandbound', 'branch_and_bound'),
+    'copeland': ('.copeland.copeland', 'heuristic_copeland'),
+    'CPLEX': ('.CPLEX.CPLEX', 'solve_median_permutation_cplex'),
+    'LocalSearch': ('.LocalSearch.LocalSearch', 'local_search'),
+    'Parcons': ('.Parcons.Parcons', 'parcons_dp'),
+    'Pickaperm': ('.Pickaperm.Pickaperm', 'pickaperm'),
+    'PLNE': ('.PLNE.PLNE', 'plne_algorithm'),
+    'Portfolio': ('.Portfolio.Portfolio', 'portfolio'),
+    'SimulatedAnnealing': ('.SimulatedAnnealing.SimulatedAnnealing', 'heuristic_sa'),
+}
+
+# Algorithmes enregistrés : nom -> (module, fonction), point d'entrée ou fonction
+_registry = dict(BUILTIN_ALGORITHMS)
+_entry_points_loaded = False
+
+
+def register_algorithm(name, algorithm):
+    """
+    Enregistre un algorithme sous un nom (ou remplace celui qui porte déjà ce nom).
+
+    Parameters:
+    - name (str): Nom de l'algorithme.
+    - algorithm: Une fonction algorithm(instance, **kwargs), ou une chaîne "module:fonction" importée à la demande.
+    """
+    if isinstance(algorithm, str):
+        module, _, function = algorithm.partition(':')
+        if not module or not function:
+            raise ValueError(f"Algorithme '{name}' : chemin '{algorithm}' invalide (attendu 'module:fonction').")
+        algorithm = (module, function)
+    _registry[name] = algorithm
 
-from .BestOfA.BestOfA import heuristic_best_of_a
-from .borda.borda import heuristic_borda_count
-from .branchandbound.branchandbound import branch_and_bound_recursive
-from .copeland.copeland import heuristic_copeland
-from .CPLEX.CPLEX import solve_median_permutation_cplex
-from .Parcons.Parcons import parcons_algorithm
-from .Pickaperm.Pickaperm import pickaperm_algorithm
-from .PLNE.PLNE import plne_algorithm
-from .SimulatedAnnealing.SimulatedAnnealing import heuristic_sa
+
+def _load_entry_points():
+    """
+    Ajoute au registre les algorithmes déclarés par les paquets installés (groupe ENTRY_POINT_GROUP), sans les
+    importer. Les algorithmes fournis avec HarmonyCo ne peuvent pas être remplacés ainsi.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name not in BUILTIN_ALGORITHMS:
+            _registry.setdefault(entry_point.name, entry_point)
 
 
 def list_available_algorithms():
     """
-    Retourne la liste des algorithmes disponibles dans HarmonyCo.
+    Retourne la liste des algorithmes disponibles dans HarmonyCo, y compris ceux des points d'entrée.
     """
-    return [
-        'BestOfA',
-        'borda',
-        'branchandbound',
-        'copeland',
-        'CPLEX',
-        'Parcons',
-        'Pickaperm',
-        'PLNE',
-        'SimulatedAnnealing'
-    ]
+    _load_entry_points()
+    return list(_registry)
 
 
-def get_algorithm(algorithm_name):
+def get_algorithm(algorithm_name, polish=False):
     """
-    Récupère l'algorithme correspondant au nom fourni.
+    Récupère l'algorithme correspondant au nom fourni, en important son module à ce moment-là.
 
     Parameters:
     - algorithm_name (str): Nom de l'algorithme choisi.
+    - polish (bool): Si True, les médianes trouvées sont améliorées par recherche locale (insertion et KwikSort).
+
+    Returns:
+    - function: La fonction correspondant à l'algorithme choisi, ou None si le nom est inconnu.
+
+    Raises:
+    - ImportError: Si le module de l'algorithme ou l'une de ses dépendances (par exemple cplex) est absent.
+    """
+    if algorithm_name not in _registry:
+        _load_entry_points()
+    algorithm = _registry.get(algorithm_name, None)
+    if algorithm is None:
+        return None
+    if isinstance(algorithm, metadata.EntryPoint):
+        algorithm = algorithm.load()
+    elif isinstance(algorithm, tuple):
+        module, function = algorithm
+        algorithm = getattr(importlib.import_module(module, __package__), function)
+    if polish:
+        from .LocalSearch.LocalSearch import with_polish
+        return with_polish(algorithm)
+    return algorithm
+
+
+def supported_kwargs(algorithm, **kwargs):
+    """
+    Filtre des paramètres facultatifs : ne garde que ceux qui ne valent pas None et que l'algorithme accepte.
+
+    Parameters:
+    - algorithm (function): Une fonction algorithm(instance, **kwargs).
+    - kwargs: Les paramètres candidats (par exemple time_limit, seed).
 
     Returns:
-    - function: La fonction correspondant à l'algorithme choisi.
+    - dict: Les paramètres à transmettre.
     """
-    algorithms = {
-        'BestOfA': heuristic_best_of_a,
-        'borda': heuristic_borda_count,
-        'branchandbound': branch_and_bound_recursive,
-        'copeland': heuristic_copeland,
-        'CPLEX': solve_median_permutation_cplex,
-        'Parcons': parcons_algorithm,
-        'Pickaperm': pickaperm_algorithm,
-        'PLNE': plne_algorithm,
-        'SimulatedAnnealing': heuristic_sa,
-    }
+    try:
+        parameters = inspect.signature(algorithm).parameters
+    except (TypeError, ValueError):
+        parameters = {}
+    return {name: value for name, value in kwargs.items() if value is not None and name in parameters}
 
-    return algorithms.get(algorithm_name, None)
+
+def solve_instance(permutations, algorithm, cache=None, algorithm_name=None, reuse_medians=True, **kwargs):
+    """
+    Exécute un algorithme sur un ensemble de permutations, en s'appuyant éventuellement sur un cache d'instances.
+
+    Avec un cache (voir harmonyco.data.instance_cache), la matrice de préférence et les tables de contraintes déjà
+    calculées sont relues, et la meilleure médiane connue est proposée à l'instance : si elle a été prouvée
+    optimale, l'algorithme n'est pas exécuté ; sinon elle sert de point de départ (initial_permutation) aux
+    algorithmes qui l'acceptent. Le résultat est enregistré dans le cache, même si l'algorithme est interrompu.
+    Un objet Instance est utilisé tel quel : pour profiter du cache, il doit avoir été construit par
+    cache.instance.
+
+    L'instance indique la provenance de sa médiane : instance.cache_hit vaut True si l'algorithme n'a pas été
+    exécuté (médiane optimale relue dans le cache), et instance.source_algorithm est le nom de l'algorithme qui
+    a trouvé la médiane retenue (celui du cache si l'algorithme n'a pas fait mieux que la médiane du cache).
+
+    Parameters:
+    - permutations: Une liste de permutations, un tableau (m, n), un RankingMultiset ou un objet Instance.
+    - algorithm (function): Une fonction algorithm(instance, **kwargs) qui met à jour l'instance.
+    - cache (InstanceCache): Le cache des instances (facultatif).
+    - algorithm_name (str): Le nom de l'algorithme, enregistré dans le cache avec la médiane (facultatif).
+    - reuse_medians (bool): Si False, seules la matrice de préférence et les tables de contraintes sont relues
+      dans le cache : l'algorithme s'exécute sans la médiane du cache (mais son résultat y est enregistré).
+
+    Returns:
+    - Instance: L'instance mise à jour par l'algorithme.
+    """
+    if isinstance(permutations, Instance):
+        instance = permutations
+    elif cache is not None:
+        instance = cache.instance(permutations, warm_start=reuse_medians)
+    else:
+        instance = Instance(permutations)
+    cached = getattr(instance, 'cached_result', None)
+    instance.cache_hit = bool(instance.is_optimal and cached is not None)
+    if instance.is_optimal:
+        instance.source_algorithm = cached.get('algorithm') if cached is not None else None
+        return instance
+    if instance.medians and 'initial_permutation' not in kwargs:
+        kwargs.update(supported_kwargs(algorithm, initial_permutation=instance.medians[0].elements))
+    try:
+        algorithm(instance, **kwargs)
+    finally:
+        # La médiane du cache reste en tête de instance.medians si l'algorithme n'a pas trouvé mieux
+        instance.source_algorithm = cached.get('algorithm') \
+            if cached is not None and instance.medians_score >= cached['score'] else algorithm_name
+        if cache is not None:
+            cache.save(instance, algorithm=algorithm_name)
+    return instance
+
+
+def calculate_median(permutations, algorithm, cache=None, **kwargs):
+    """
+    Exécute un algorithme sur un ensemble de permutations et retourne la meilleure médiane trouvée.
+
+    Parameters:
+    - permutations: Une liste de permutations, un tableau (m, n), un RankingMultiset ou un objet Instance.
+    - algorithm (function): Une fonction algorithm(instance, **kwargs) qui met à jour l'instance.
+    - cache (InstanceCache): Le cache des instances (facultatif, voir solve_instance).
+
+    Returns:
+    - list: La permutation médiane trouvée, ou None si l'algorithme n'en a proposé aucune.
+    """
+    instance = solve_instance(permutations, algorithm, cache=cache, **kwargs)
+    if not instance.medians:
+        return None
+    return list(instance.medians[0].elements)
 
 
 def main():
@@ -74,27 +209,35 @@ def main():
     # Afficher les algorithmes disponibles
     print("\nVoici les algorithmes que vous pouvez utiliser pour résoudre le problème :")
     algorithms = {
-        '1': ('Best Of A', heuristic_best_of_a),
-        '2': ('Borda', heuristic_borda_count),
-        '3': ('Branch and Bound', branch_and_bound_recursive),
-        '4': ('Copeland', heuristic_copeland),
-        '5': ('CPLEX', solve_median_permutation_cplex),
-        '6': ('Parcons', parcons_algorithm),
-        '7': ('Pickaperm', pickaperm_algorithm),
-        '8': ('PLNE', plne_algorithm),
-        '9': ('Simulated Annealing', heuristic_sa)
+        '1': ('Best Of A', 'BestOfA', False),
+        '2': ('Borda', 'borda', False),
+        '3': ('Branch and Bound', 'branchandbound', False),
+        '4': ('Copeland', 'copeland', False),
+        '5': ('CPLEX', 'CPLEX', False),
+        '6': ('Parcons', 'Parcons', False),
+        '7': ('Pickaperm', 'Pickaperm', False),
+        '8': ('PLNE', 'PLNE', False),
+        '9': ('Simulated Annealing', 'SimulatedAnnealing', False),
+        '10': ('Automatique (selon la taille et le temps)', 'auto', False),
+        '11': ('Portfolio (heuristiques en parallèle)', 'Portfolio', False),
+        '12': ('Borda + recherche locale', 'borda', True)
     }
-    for key, (name, _) in algorithms.items():
+    for key, (name, _, _) in algorithms.items():
         print(f"{key} - {name}")
 
     # Demander à l'utilisateur de choisir un algorithme
-    choice = input("\nVeuillez choisir un algorithme (1-9) : ")
+    choice = input("\nVeuillez choisir un algorithme (1-12) : ")
 
     # Vérifier que le choix est valide
     if choice in algorithms:
-        algorithm_name, algorithm_function = algorithms[choice]
+        algorithm_name, registered_name, polish = algorithms[choice]
         print(f"\nVous avez choisi : {algorithm_name}\n")
-        result = algorithm_function(permutations)
+        try:
+            algorithm_function = get_algorithm(registered_name, polish=polish)
+        except ImportError as e:
+            print(f"L'algorithme {algorithm_name} n'est pas utilisable : {e}")
+            return
+        result = calculate_median(permutations, algorithm_function)
         print(f"Le résultat de la permutation médiane est : {result}")
     else:
         print("\nChoix invalide. Veuillez réessayer en exécutant à nouveau le programme.")
@@ -102,13 +245,9 @@ def main():
 
 def read_permutations_from_file(file_path):
     """
-    Lit les permutations à partir d'un fichier texte.
+    Lit les permutations à partir d'un fichier texte ou binaire (voir harmonyco.data.permutation_file).
 
-    :param file_path: Chemin vers le fichier texte contenant les permutations.
+    :param file_path: Chemin vers le fichier contenant les permutations.
     :return: Une liste de permutations.
     """
-    permutations = []
-    with open(file_path, 'r') as f:
-        for line in f:
-            permutations.append(list(map(int, line.strip().split())))
-    return permutations
+    return load_permutations(file_path).tolist()
@@ -0,0 +1,114 @@
+import time
+
+from ..BestOfA.BestOfA import heuristic_best_of_a
+from ..borda.borda import heuristic_borda_count
+from ..branchandbound.branchandbound import branch_and_bound
+from ..copeland.copeland import heuristic_copeland
+from ..Parcons.Parcons import parcons_dp
+from ..SimulatedAnnealing.SimulatedAnnealing import heuristic_sa
+from ...Computation.preprocessing import MajorityGraphPreprocessor
+
+# Taille maximale d'une composante résolue par la programmation dynamique de Parcons (table de 2^n entrées)
+EXACT_DP_MAX_N = 20
+# Taille maximale d'une composante confiée au Branch and Bound
+BRANCH_AND_BOUND_MAX_N = 60
+# Part du budget de temps donnée au recuit simulé avant le Branch and Bound
+SA_TIME_SHARE = 0.2
+
+
+def auto_select(instance, verbose=False, time_limit=None, n_jobs=None, seed=None, initial_permutation=None,
+                decompose=True):
+    """
+    Choisit et enchaîne automatiquement les algorithmes selon la taille de l'instance et le budget de temps.
+
+    L'instance est d'abord décomposée selon le graphe majoritaire ; chaque composante est ensuite résolue selon sa
+    taille n :
+    - n <= EXACT_DP_MAX_N : programmation dynamique exacte (Parcons) ;
+    - n <= BRANCH_AND_BOUND_MAX_N : Borda, Copeland et recuit simulé pour la borne supérieure, puis Branch and
+      Bound sur le temps restant ;
+    - au-delà : Borda, Copeland puis recuit simulé (en parallèle avec n_jobs) sur tout le temps restant.
+    Avec m <= 2, l'un des classements est optimal et Best of A suffit. La résolution s'arrête dès que les bornes
+    se rejoignent.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche des informations détaillées.
+    - time_limit (float): Durée maximale en secondes (facultatif). Sans limite, le recuit simulé d'une grande
+      composante n'exécute qu'un électron (sa_mode 1).
+    - n_jobs (int): Nombre de processus pour le recuit simulé et le Branch and Bound (-1 : tous les cœurs).
+    - seed (int): Graine du générateur aléatoire (facultatif).
+    - initial_permutation (list): Permutation de départ, par exemple une médiane précédente (facultatif).
+    - decompose (bool): Si True, résout séparément les composantes de Condorcet.
+
+    Returns:
+    - None: Met à jour l'objet instance (médianes, bornes, is_optimal).
+    """
+    if decompose and instance.n > 2 and len(MajorityGraphPreprocessor.condorcet_components(instance.tabD)) > 1:
+        MajorityGraphPreprocessor.solve_by_components(instance, auto_select, verbose=verbose, time_limit=time_limit,
+                                                      initial_permutation=initial_permutation, n_jobs=n_jobs,
+                                                      seed=seed, decompose=False)
+        return
+
+    deadline = None if time_limit is None else time.time() + time_limit
+    n = instance.n
+    if initial_permutation is not None:
+        instance.add_solver_permutation(initial_permutation)
+    heuristic_borda_count(instance)
+    heuristic_copeland(instance)
+    if instance.m <= 2:
+        heuristic_best_of_a(instance)
+    if _is_closed(instance):
+        return
+
+    if n <= EXACT_DP_MAX_N:
+        if verbose:
+            print(f"auto ({n} éléments) : programmation dynamique exacte")
+        parcons_dp(instance, verbose=verbose)
+        return
+
+    if n <= BRANCH_AND_BOUND_MAX_N:
+        if verbose:
+            print(f"auto ({n} éléments) : recuit simulé puis Branch and Bound")
+        sa_time = None if deadline is None else SA_TIME_SHARE * _remaining(deadline)
+        heuristic_sa(instance, sa_mode=2, seed=seed, n_jobs=n_jobs, time_limit=sa_time,
+                     initial_permutation=instance.medians[0].elements)
+        instance.set_lower_bound(instance.simple_lower_bound + instance.add3cyles_lower_bound)
+        if _is_closed(instance):
+            return
+        branch_and_bound(instance, verbose=verbose, n_jobs=n_jobs,
+                         time_limit=None if deadline is None else _remaining(deadline))
+        return
+
+    if verbose:
+        print(f"auto ({n} éléments) : recuit simulé")
+    if initial_permutation is not None:
+        # Descente rapide depuis la médiane précédente avant le recuit complet
+        heuristic_sa(instance, sa_mode=0, seed=seed, initial_permutation=initial_permutation,
+                     time_limit=None if deadline is None else _remaining(deadline))
+    heuristic_sa(instance, sa_mode=1 if deadline is None else 3, seed=seed, n_jobs=n_jobs,
+                 time_limit=None if deadline is None else _remaining(deadline))
+    _is_closed(instance)
+
+
+def _remaining(deadline):
+    return max(0.0, deadline - time.time())
+
+
+def _is_closed(instance):
+    """
+    Déclare la solution optimale si les bornes se rejoignent.
+    """
+    if instance.best_upper_bound <= instance.best_lower_bound:
+        instance.declare_is_optimal()
+        return True
+    return False
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from ...Computation.instance import Instance
+
+    for n in (8, 30, 80):
+        instance = Instance.random(7, n, seed=0)
+        auto_select(instance, verbose=True, time_limit=2.0, seed=0)
+        print(f"n={n} : score {instance.best_upper_bound}, écart {instance.get_gap()}, optimal {instance.is_optimal}")
@@ -1,4 +1,9 @@
 # BestOfA.py
+import numpy as np
+
+from ...Computation.KendallTau import kendall_tau_distance_with_fenwick
+from ...Computation.preference_matrix import score_permutations
+
 
 def kendall_tau_distance(perm1, perm2):
     """
@@ -11,9 +16,7 @@ def kendall_tau_distance(perm1, perm2):
     Returns:
     - int: La distance de Kendall-Tau entre les deux permutations.
     """
-    n = len(perm1)
-    pairs = [(perm1[i], perm1[j]) for i in range(n) for j in range(i + 1, n)]
-    return sum((perm2.index(x) > perm2.index(y)) for x, y in pairs)
+    return kendall_tau_distance_with_fenwick(perm1, perm2)
 
 
 def heuristic_best_of_a(instance, verbose=False):
@@ -27,16 +30,12 @@ def heuristic_best_of_a(instance, verbose=False):
     Returns:
     - None: Met à jour l'objet instance avec les résultats de l'algorithme Best of A.
     """
-    best_score = float('inf')
-    dist_to_a = 0
-    best_permutation = None
-
-    # Parcours de chaque permutation dans l'ensemble A
-    for permutation in instance.A:
-        dist_to_a = permutation.distance_to_set_matrix(instance.tabD)
-        if dist_to_a < best_score:
-            best_score = dist_to_a
-            best_permutation = permutation
+    # Score de chaque permutation distincte de l'ensemble A (les doublons sont regroupés dans l'instance),
+    # calculé par blocs sur la matrice des distances
+    scores = score_permutations(instance.rankings, instance.tabD)
+    best_index = int(np.argmin(scores))
+    best_score = int(scores[best_index])
+    best_permutation = instance.rankings[best_index].tolist()
 
     # Mise à jour des résultats dans l'instance
     instance.BestOfA_upper_bound = best_score
@@ -48,6 +47,8 @@ def heuristic_best_of_a(instance, verbose=False):
 
 
 if __name__ == "__main__":
+    from ...Computation.instance import Instance
+
     # Exemple de permutations
     permutations = [
         [1, 2, 3],
@@ -56,5 +57,6 @@ if __name__ == "__main__":
     ]
 
     # Calcul de la médiane
-    median = heuristic_best_of_a(permutations)
-    print("Médiane trouvée:", median)
+    instance = Instance(permutations)
+    heuristic_best_of_a(instance, verbose=True)
+    print("Médiane trouvée:", instance.medians)
@@ -1,88 +1,138 @@
 # Il ne faut pas oublier d'installer pip install cplex
 
+import math
+import time
+
 import cplex
+import numpy as np
 from cplex.exceptions import CplexError
 
+from ...Computation.linear_ordering import (objective_coefficients, order_from_matrix, order_matrix, pair_values,
+                                            triangle_cut, violated_triangles)
+
+# Nombre maximal de contraintes de transitivité ajoutées à chaque tour de séparation (multiplié par n)
+CUTS_PER_ELEMENT = 5
+# Nombre maximal de tours de séparation
+MAX_ROUNDS = 1000
+
 
-def solve_median_permutation_cplex(permutations):
+def solve_median_permutation_cplex(instance, verbose=False, time_limit=None, fix_pairs=True, cuts_per_round=None,
+                                   max_rounds=MAX_ROUNDS):
     """
-    Utilise CPLEX pour calculer la médiane des permutations.
+    Utilise CPLEX pour calculer la médiane des permutations (formulation par ordre linéaire).
+
+    Même modèle que plne_algorithm : une variable y_ij par paire i < j, objectif linéaire tiré de la matrice des
+    distances, contraintes de transitivité ajoutées par tours de séparation, d'abord sur la relaxation continue
+    puis sur le problème en nombres entiers.
 
     Parameters:
-    - permutations (list of lists): Liste des permutations à analyser.
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche la progression et les messages de CPLEX.
+    - time_limit (float): Durée maximale en secondes (facultatif).
+    - fix_pairs (bool): Si True, fixe les variables des paires ordonnées de la même façon dans toutes les médianes
+      (instance.tab_c : règles de Pareto, des 3/4 et de Condorcet étendue).
+    - cuts_per_round (int): Nombre maximal de contraintes ajoutées par tour (par défaut, CUTS_PER_ELEMENT * n).
+    - max_rounds (int): Nombre maximal de tours de séparation.
 
     Returns:
-    - list: La permutation médiane trouvée par CPLEX.
+    - None: Met à jour l'objet instance (médiane, bornes, is_optimal).
     """
-    n = len(permutations[0])  # Taille des permutations
-    m = len(permutations)  # Nombre de permutations
+    n = instance.n
+    deadline = None if time_limit is None else time.time() + time_limit
+    if n < 2:
+        instance.add_solver_permutation(list(range(1, n + 1)))
+        instance.declare_is_optimal()
+        return
+    cuts_per_round = CUTS_PER_ELEMENT * n if cuts_per_round is None else cuts_per_round
+
+    coefficients, constant = objective_coefficients(instance.tabD)
+    rows, cols = np.triu_indices(n, 1)
+    names = [f"y_{i}_{j}" for i, j in zip(rows.tolist(), cols.tolist())]
+    lower = np.zeros(len(names))
+    upper = np.ones(len(names))
+    if fix_pairs:
+        fixed = instance.tab_c
+        lower[fixed[rows, cols]] = 1.0
+        upper[fixed[cols, rows]] = 0.0
 
-    # Créer un modèle CPLEX
     try:
         model = cplex.Cplex()
-        model.set_problem_type(cplex.Cplex.problem_type.LP)
-        model.set_results_stream(None)  # Désactiver les logs pour une exécution plus propre
-        model.set_warning_stream(None)
-
-        # Définir les variables de décision
-        # x[i][j] est 1 si l'élément i est placé avant l'élément j dans la médiane, sinon 0
-        variable_names = []
-        for i in range(n):
-            for j in range(i + 1, n):
-                variable_names.append(f"x_{i}_{j}")
-
-        # Ajout des variables binaires au modèle
-        model.variables.add(names=variable_names, types=["B"] * len(variable_names))
-
-        # Fonction objectif : Minimiser la somme des distances de Kendall-Tau
-        objective = []
-        for i in range(n):
-            for j in range(i + 1, n):
-                objective.append(0)  # Les coefficients seront mis à jour dans les contraintes
-        model.objective.set_linear(list(zip(variable_names, objective)))
+        if not verbose:
+            model.set_log_stream(None)
+            model.set_results_stream(None)
+            model.set_warning_stream(None)
         model.objective.set_sense(model.objective.sense.minimize)
-
-        # Contraintes pour chaque permutation
-        constraints = []
-        for k in range(m):
-            for i in range(n):
-                for j in range(i + 1, n):
-                    if permutations[k][i] < permutations[k][j]:
-                        # Ajouter contrainte x[i][j] = 1 si i précède j
-                        constraints.append((f"x_{i}_{j}", 1))
-                    else:
-                        # Ajouter contrainte x[i][j] = 0 si j précède i
-                        constraints.append((f"x_{i}_{j}", -1))
-
-        # Ajout des contraintes au modèle
-        model.linear_constraints.add(lin_expr=constraints, senses=["E"] * len(constraints))
-
-        # Résolution du problème
-        model.solve()
-
-        # Récupération des résultats
-        solution = model.solution.get_values()
-        median_permutation = []
-        for i in range(n):
-            for j in range(i + 1, n):
-                if solution[variable_names.index(f"x_{i}_{j}")] > 0.5:
-                    median_permutation.append(i + 1)
-                else:
-                    median_permutation.append(j + 1)
-
-        return median_permutation
+        model.variables.add(obj=coefficients.astype(float).tolist(), lb=lower.tolist(), ub=upper.tolist(),
+                            names=names)
+
+        nb_cuts, rounds, matrix, closed = 0, 0, None, False
+        for integer in (False, True):
+            if integer:
+                model.variables.set_types([(name, model.variables.type.binary) for name in names])
+                # Démarrage à chaud sur la meilleure médiane connue
+                if instance.medians:
+                    model.MIP_starts.add(
+                        cplex.SparsePair(ind=names,
+                                         val=pair_values(instance.medians[0].elements).astype(float).tolist()),
+                        model.MIP_starts.effort_level.auto)
+            closed = False
+            while rounds < max_rounds and not (deadline is not None and time.time() >= deadline):
+                rounds += 1
+                if deadline is not None:
+                    model.parameters.timelimit.set(max(0.1, deadline - time.time()))
+                model.solve()
+                if not model.solution.is_primal_feasible():
+                    break
+                status = model.solution.get_status()
+                proven = status in (model.solution.status.optimal, model.solution.status.MIP_optimal,
+                                    model.solution.status.optimal_tolerance)
+                # Borne de la relaxation courante (moins de contraintes) : borne inférieure valide
+                bound = model.solution.MIP.get_best_objective() if integer else \
+                    (model.solution.get_objective_value() if proven else None)
+                if bound is not None:
+                    instance.set_lower_bound(int(math.ceil(bound + constant - 1e-6)))
+                matrix = order_matrix(model.solution.get_values(names), n)
+                triangles = violated_triangles(matrix, cuts_per_round)
+                if verbose:
+                    print(f"CPLEX {'entier' if integer else 'relaxé'} tour {rounds} : objectif "
+                          f"{model.solution.get_objective_value() + constant:.2f}, "
+                          f"{len(triangles)} contraintes ajoutées")
+                if not triangles:
+                    closed = proven
+                    break
+                lin_expr, rhs = [], []
+                for (i, j, k) in triangles:
+                    terms, right = triangle_cut(i, j, k)
+                    lin_expr.append(cplex.SparsePair(ind=[f"y_{a}_{b}" for a, b, _ in terms],
+                                                     val=[float(c) for _, _, c in terms]))
+                    rhs.append(float(right))
+                model.linear_constraints.add(lin_expr=lin_expr, senses=['L'] * len(rhs), rhs=rhs)
+                nb_cuts += len(triangles)
+            if not closed:
+                break
+
+        instance.nb_cuts_cplex = nb_cuts
+        if matrix is not None:
+            # Ordre le plus proche de la dernière solution (exactement celle-ci si elle est entière et sans cycle)
+            instance.add_solver_permutation(order_from_matrix(matrix))
+        if closed and instance.best_upper_bound <= instance.best_lower_bound:
+            instance.declare_is_optimal()
+        if verbose:
+            print(f"CPLEX ({instance.medians_score}) {instance.medians[0] if instance.medians else None}, "
+                  f"{nb_cuts} contraintes de transitivité, optimal : {instance.is_optimal}")
 
     except CplexError as exc:
         print(exc)
-        return None
 
 
 # Exemple d'utilisation
 if __name__ == "__main__":
-    permutations = [
+    from ...Computation.instance import Instance
+
+    instance = Instance([
         [1, 3, 2, 4],
         [1, 2, 3, 4],
         [4, 2, 3, 1]
-    ]
-    median = solve_median_permutation_cplex(permutations)
-    print(f"La permutation médiane trouvée est : {median}")
+    ])
+    solve_median_permutation_cplex(instance)
+    print(f"La permutation médiane trouvée est : {instance.medians[0]} ({instance.medians_score})")
@@ -0,0 +1,165 @@
+import functools
+
+import numpy as np
+
+from ...Computation.insertion import InsertionState
+from ...Computation.permutation import Permutation
+from ...Computation.preference_matrix import score_permutation
+
+
+def kwiksort(tab_d, order):
+    """
+    Tri par pivot (KwikSort) d'un ordre d'indices selon le graphe majoritaire.
+
+    Chaque sous-liste est partagée autour de l'élément du milieu : les éléments qu'il vaut mieux placer avant
+    le pivot passent à gauche, les autres à droite. À égalité, l'élément garde sa position relative au pivot
+    dans l'ordre de départ, qui sert donc aussi de départage.
+
+    Parameters:
+    - tab_d (numpy.ndarray): La matrice des distances (n, n).
+    - order (list): L'ordre de départ, sous forme d'indices de 0 à n - 1.
+
+    Returns:
+    - numpy.ndarray: Le nouvel ordre d'indices.
+    """
+    tab_d = np.asarray(tab_d)
+    order = np.asarray(order, dtype=np.int64)
+    result = np.empty_like(order)
+    # Pile de sous-listes (éléments, position de départ dans le résultat), pour éviter la récursion
+    stack = [(order, 0)]
+    while stack:
+        elements, start = stack.pop()
+        if len(elements) <= 1:
+            result[start:start + len(elements)] = elements
+            continue
+        middle = len(elements) // 2
+        pivot = elements[middle]
+        others = np.delete(elements, middle)
+        # Coût de placer chaque élément avant le pivot, moins celui de le placer après
+        balance = tab_d[others, pivot].astype(np.int64) - tab_d[pivot, others]
+        was_before = np.arange(len(others)) < middle
+        before = (balance < 0) | ((balance == 0) & was_before)
+        left, right = others[before], others[~before]
+        result[start + len(left)] = pivot
+        stack.append((left, start))
+        stack.append((right, start + len(left) + 1))
+    return result
+
+
+def insertion_local_search(tab_d, order, max_passes=None, antisymmetric=None):
+    """
+    Recherche locale par meilleure insertion jusqu'à un optimum local.
+
+    À chaque passe, chaque élément est retiré et réinséré à la position qui diminue le plus le score ; les
+    variations pour toutes les positions cibles sont évaluées en O(n) à partir de la matrice antisymétrique
+    (voir InsertionState.deltas). La recherche s'arrête après une passe sans amélioration.
+
+    Parameters:
+    - tab_d (numpy.ndarray): La matrice des distances (n, n).
+    - order (list): L'ordre de départ, sous forme d'indices de 0 à n - 1.
+    - max_passes (int): Nombre maximal de passes (facultatif, par défaut jusqu'à l'optimum local).
+    - antisymmetric (numpy.ndarray): La matrice tabD - tabD^T, si elle est déjà calculée (facultatif).
+
+    Returns:
+    - InsertionState: L'état final (ordre et score).
+    """
+    state = InsertionState(tab_d, order, antisymmetric=antisymmetric)
+    passes = 0
+    improved = True
+    while improved and (max_passes is None or passes < max_passes):
+        improved = False
+        passes += 1
+        for element in state.order.copy():
+            source = int(state.position[element])
+            deltas = state.deltas(source)
+            target = int(np.argmin(deltas))
+            if deltas[target] < 0:
+                state.apply(source, target, int(deltas[target]))
+                improved = True
+    return state
+
+
+def polish_permutation(tab_d, permutation, max_passes=None):
+    """
+    Améliore une permutation : recherche locale par insertion depuis la permutation elle-même et depuis son
+    KwikSort, en gardant le meilleur des deux optima locaux.
+
+    Parameters:
+    - tab_d (numpy.ndarray): La matrice des distances (n, n).
+    - permutation (list): La permutation à améliorer (éléments de 1 à n).
+    - max_passes (int): Nombre maximal de passes de recherche locale (facultatif).
+
+    Returns:
+    - tuple: (permutation améliorée sous forme de liste, score).
+    """
+    tab_d = np.asarray(tab_d)
+    order = np.asarray(permutation, dtype=np.int64) - 1
+    antisymmetric = tab_d.astype(np.int64) - tab_d.T
+    best = None
+    for start in (order, kwiksort(tab_d, order)):
+        state = insertion_local_search(tab_d, start, max_passes=max_passes, antisymmetric=antisymmetric)
+        if best is None or state.energy < best.energy:
+            best = state
+    return best.permutation(), int(best.energy)
+
+
+def local_search(instance, verbose=False, initial_permutation=None, max_passes=None):
+    """
+    Post-optimisation par recherche locale des meilleures permutations connues de l'instance.
+
+    Les médianes déjà proposées (ou initial_permutation, ou à défaut l'ordre de Borda) sont améliorées par
+    polish_permutation et les résultats sont proposés à l'instance.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche des informations détaillées.
+    - initial_permutation (list): Permutation à améliorer (facultatif).
+    - max_passes (int): Nombre maximal de passes de recherche locale (facultatif).
+
+    Returns:
+    - None: Met à jour l'objet instance avec les permutations améliorées.
+    """
+    tab_d = np.asarray(instance.tabD)
+    if initial_permutation is not None:
+        starts = [list(initial_permutation)]
+    elif instance.medians:
+        starts = [list(p.elements) for p in instance.medians]
+    else:
+        starts = [(np.argsort(tab_d.sum(axis=1), kind='stable') + 1).tolist()]
+
+    for start in starts:
+        polished, score = polish_permutation(tab_d, start, max_passes=max_passes)
+        if verbose:
+            print(f"LocalSearch ({score_permutation(start, tab_d)} -> {score}) {polished}")
+        instance.add_solver_permutation(Permutation(polished))
+
+
+def with_polish(algorithm):
+    """
+    Enveloppe un algorithme pour que ses médianes passent par la recherche locale (local_search).
+
+    Parameters:
+    - algorithm (function): Une fonction algorithm(instance, **kwargs) qui met à jour l'instance.
+
+    Returns:
+    - function: La fonction enveloppée, de même signature.
+    """
+    @functools.wraps(algorithm)
+    def polished(instance, *args, **kwargs):
+        result = algorithm(instance, *args, **kwargs)
+        if instance.medians and not instance.is_optimal:
+            local_search(instance, verbose=kwargs.get('verbose', False))
+        return result
+    return polished
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from ...Computation.instance import Instance
+    from ..borda.borda import heuristic_borda_count
+
+    instance = Instance.random(20, 60, seed=0)
+    heuristic_borda_count(instance, verbose=False)
+    print(f"Borda : {instance.medians_score}")
+    local_search(instance, verbose=False)
+    print(f"Borda + recherche locale : {instance.medians_score} (borne inférieure {instance.best_lower_bound})")
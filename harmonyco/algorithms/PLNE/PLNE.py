@@ -1,44 +1,140 @@
+import math
+import time
+
+import numpy as np
 import pulp
 
-def plne_algorithm(A):
-    num_perms = len(A)
-    num_elements = len(A[0])
-    inversion_matrix = [[0] * num_perms for _ in range(num_perms)]
+from ...Computation.linear_ordering import (objective_coefficients, order_from_matrix, order_matrix, pair_values,
+                                            triangle_cut, violated_triangles)
+
+# Nombre maximal de contraintes de transitivité ajoutées à chaque tour de séparation (multiplié par n)
+CUTS_PER_ELEMENT = 5
+# Nombre maximal de tours de séparation
+MAX_ROUNDS = 1000
+
+
+def plne_algorithm(instance, verbose=False, time_limit=None, fix_pairs=True, cuts_per_round=None,
+                   max_rounds=MAX_ROUNDS, solver=None):
+    """
+    Résolution exacte par programmation linéaire en nombres entiers (formulation par ordre linéaire) avec PuLP.
+
+    Le modèle a une variable binaire y_ij par paire i < j (1 si i précède j) et un objectif linéaire construit à
+    partir de la matrice des distances (voir linear_ordering.objective_coefficients). Les O(n³) contraintes de
+    transitivité ne sont pas posées à l'avance : elles sont ajoutées par tours de séparation, d'abord sur la
+    relaxation continue, qui fournit une borne inférieure, puis sur le problème en nombres entiers, jusqu'à ce que
+    la solution ne contienne plus de cycle.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche la progression et les messages du solveur.
+    - time_limit (float): Durée maximale en secondes (facultatif).
+    - fix_pairs (bool): Si True, fixe les variables des paires ordonnées de la même façon dans toutes les médianes
+      (instance.tab_c : règles de Pareto, des 3/4 et de Condorcet étendue).
+    - cuts_per_round (int): Nombre maximal de contraintes ajoutées par tour (par défaut, CUTS_PER_ELEMENT * n).
+    - max_rounds (int): Nombre maximal de tours de séparation.
+    - solver: Un solveur PuLP (par défaut, CBC fourni avec PuLP).
+
+    Returns:
+    - None: Met à jour l'objet instance (médiane, bornes, is_optimal).
+    """
+    n = instance.n
+    deadline = None if time_limit is None else time.time() + time_limit
+    if n < 2:
+        instance.add_solver_permutation(list(range(1, n + 1)))
+        instance.declare_is_optimal()
+        return
+    cuts_per_round = CUTS_PER_ELEMENT * n if cuts_per_round is None else cuts_per_round
+
+    coefficients, constant = objective_coefficients(instance.tabD)
+    rows, cols = np.triu_indices(n, 1)
+    prob = pulp.LpProblem("MedianePermutations", pulp.LpMinimize)
+    y = {}
+    for (i, j) in zip(rows.tolist(), cols.tolist()):
+        y[i, j] = pulp.LpVariable(f"y_{i}_{j}", lowBound=0, upBound=1)
+    prob += pulp.lpSum(int(c) * y[i, j] for c, i, j in zip(coefficients, rows.tolist(), cols.tolist())) + constant
 
-    for i in range(num_perms):
-        for j in range(i + 1, num_perms):
-            adjusted_perm = [a - b for a, b in zip(A[i], A[j])]
-            count_inversions(adjusted_perm)
-            inversion_matrix[j][i] = inversion_matrix[i][j]
+    if fix_pairs:
+        fixed = instance.tab_c
+        for (i, j) in y:
+            if fixed[i][j]:
+                y[i, j].lowBound = 1
+            elif fixed[j][i]:
+                y[i, j].upBound = 0
 
-    # Define the PLNE problem
-    prob = pulp.LpProblem("PermutationMedian", pulp.LpMinimize)
+    nb_cuts, rounds, matrix, closed = 0, 0, None, False
+    for integer in (False, True):
+        if integer:
+            for variable in y.values():
+                variable.cat = pulp.LpInteger
+            # Démarrage à chaud sur la meilleure médiane connue
+            if instance.medians:
+                for variable, value in zip(y.values(), pair_values(instance.medians[0].elements)):
+                    variable.setInitialValue(int(value))
+        closed = False
+        while rounds < max_rounds and not _out_of_time(deadline):
+            rounds += 1
+            remaining = None if deadline is None else deadline - time.time()
+            prob.solve(_solver(solver, verbose, remaining, integer and bool(instance.medians)))
+            if prob.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+                break
+            proven = prob.sol_status == pulp.LpSolutionOptimal
+            # Les variables de coefficient nul n'apparaissent pas dans le modèle et n'ont pas de valeur
+            values = [y[i, j].varValue or 0.0 for (i, j) in zip(rows.tolist(), cols.tolist())]
+            objective = float(np.dot(coefficients, values)) + constant
+            if proven:
+                # Optimum d'une relaxation (moins de contraintes) : borne inférieure valide
+                instance.set_lower_bound(int(math.ceil(objective - 1e-6)))
+            matrix = order_matrix(values, n)
+            triangles = violated_triangles(matrix, cuts_per_round)
+            if verbose:
+                print(f"PLNE {'entier' if integer else 'relaxé'} tour {rounds} : objectif "
+                      f"{objective:.2f}, {len(triangles)} contraintes ajoutées")
+            if not triangles:
+                closed = proven
+                break
+            for (i, j, k) in triangles:
+                terms, rhs = triangle_cut(i, j, k)
+                prob += pulp.lpSum(coefficient * y[a, b] for a, b, coefficient in terms) <= rhs, \
+                    f"t_{i}_{j}_{k}"
+            nb_cuts += len(triangles)
+        if not closed:
+            break
 
-    # Decision variables
-    x = [[pulp.LpVariable(f"x_{i}_{j}", cat='Binary') for j in range(num_elements)] for i in range(num_elements)]
+    instance.nb_cuts_plne = nb_cuts
+    if matrix is not None:
+        # Ordre le plus proche de la dernière solution (exactement celle-ci si elle est entière et sans cycle)
+        instance.add_solver_permutation(order_from_matrix(matrix))
+    if closed and instance.best_upper_bound <= instance.best_lower_bound:
+        instance.declare_is_optimal()
+    if verbose:
+        print(f"PLNE ({instance.medians_score}) {instance.medians[0] if instance.medians else None}, "
+              f"{nb_cuts} contraintes de transitivité, optimal : {instance.is_optimal}")
 
-    # Objective function
-    prob += pulp.lpSum(inversion_matrix[i][j] * x[k][i] * x[k][j]
-                       for i in range(num_elements) for j in range(num_elements) for k in range(num_elements) if i != j)
 
-    # Constraints
-    for j in range(num_elements):
-        prob += pulp.lpSum(x[i][j] for i in range(num_elements)) == 1, f"Element_{j}_once"
+def _out_of_time(deadline):
+    return deadline is not None and time.time() >= deadline
 
-    for i in range(num_elements):
-        prob += pulp.lpSum(x[i][j] for j in range(num_elements)) == 1, f"Position_{i}_filled"
 
-    # Solve the problem
-    prob.solve()
+def _solver(solver, verbose, time_limit, warm_start):
+    """
+    Solveur PuLP utilisé pour un tour : celui fourni, ou CBC avec la limite de temps restante.
+    """
+    if solver is not None:
+        return solver
+    options = {'msg': verbose, 'warmStart': warm_start}
+    if time_limit is not None:
+        options['timeLimit'] = max(1, int(math.ceil(time_limit)))
+    return pulp.PULP_CBC_CMD(**options)
 
-    # Extract the median permutation from the solution
-    median_permutation = []
-    for i in range(num_elements):
-        for j in range(num_elements):
-            if pulp.value(x[i][j]) == 1:
-                median_permutation.append(j + 1)
 
-    return median_permutation
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from ...Computation.instance import Instance
 
-def count_inversions(adjusted_perm):
-    pass
+    instance = Instance([
+        [1, 3, 2, 4],
+        [4, 2, 3, 1],
+        [2, 1, 4, 3]
+    ])
+    plne_algorithm(instance, verbose=False)
+    print(f"La permutation médiane trouvée est : {instance.medians[0]} ({instance.medians_score})")
@@ -1,70 +1,176 @@
 
-from typing import List, Dict
-from itertools import permutations
+import math
+from typing import List
 
-class Permutation:
-    def __init__(self, elements: List[int]):
-        self.elements = elements
+import numpy as np
 
-    def distance_to(self, other: 'Permutation') -> int:
-        """
-        Calcule la distance de Kendall-Tau entre cette permutation et une autre.
-        :param other: Une autre permutation.
-        :return: La distance de Kendall-Tau.
-        """
-        return KemenyScoreCalculator.count_inversions([self.elements.index(x) for x in other.elements])
-
-    def __repr__(self):
-        return f"Permutation({self.elements})"
+from ...Computation.instance import Instance
+from ...Computation.permutation import Permutation
+from ...Computation.preference_matrix import score_permutation
 
+# Taille maximale traitée : les tables de la programmation dynamique ont 2^n entrées (environ 0,6 Go à n = 25,
+# 15 Go à n = 30, voir _table_bytes).
+MAX_ELEMENTS = 25
 
-class KemenyScoreCalculator:
-    @staticmethod
-    def count_inversions(arr: List[int]) -> int:
-        return KemenyScoreCalculator._merge_sort_and_count(arr, 0, len(arr) - 1)
 
-    @staticmethod
-    def _merge_sort_and_count(arr: List[int], left: int, right: int) -> int:
-        if left >= right:
-            return 0
+def parcons_dp(instance, verbose=False, all_medians=False, max_medians=1000, prune=True):
+    """
+    Programmation dynamique exacte sur les sous-ensembles (à la Held–Karp) pour calculer la médiane des permutations.
+
+    f[S] est le coût minimal des paires ayant au moins un élément dans S lorsque les éléments de S occupent les |S|
+    premières positions : f[S | x] = min f[S] + somme des tabD[x][y] pour y hors de S et différent de x. Les
+    sous-ensembles sont codés par masques de bits et traités couche par couche (par cardinal), chaque couche étant
+    vectorisée. Les sommes de lignes sur S sont lues dans deux tables (bits de poids faible, bits de poids fort) de
+    taille n * 2^(n/2), soit O(2^n * n) opérations.
+    Avec prune, un sous-ensemble dont le coût plus la borne inférieure simple du reste dépasse la meilleure borne
+    supérieure n'est pas étendu.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les distances tabulées).
+    - verbose (bool): Si True, affiche des informations détaillées.
+    - all_medians (bool): Si True, ajoute à l'instance toutes les médianes optimales (au plus max_medians).
+    - max_medians (int): Nombre maximal de médianes reconstruites lorsque all_medians est vrai.
+    - prune (bool): Si True, élague les sous-ensembles à l'aide des bornes.
+
+    Returns:
+    - None: Met à jour l'objet instance avec les résultats de l'algorithme.
+    """
+    tab_d = np.asarray(instance.tabD, dtype=np.int64)
+    n = tab_d.shape[0]
+    if n > MAX_ELEMENTS:
+        raise ValueError(f"Parcons est limité à {MAX_ELEMENTS} éléments (n = {n}) : ses tables occuperaient "
+                         f"environ {_table_bytes(n, prune) / 2 ** 30:.1f} Go.")
+    if n == 0:
+        return
+
+    # Type compact pour la table des coûts : int32 tant que le score maximal y tient
+    dtype = np.int32 if int(tab_d.sum()) < np.iinfo(np.int32).max else np.int64
+    infinity = np.iinfo(dtype).max
+    full = (1 << n) - 1
+    half = n // 2
+    low_mask = (1 << half) - 1
+    row_sums = tab_d.sum(axis=1)
+    row_low = _subset_sums(tab_d, 0, half)
+    row_high = _subset_sums(tab_d, half, n)
+
+    upper_bound = None
+    remaining_bound = None
+    if prune:
+        upper_bound = instance.best_upper_bound
+        if upper_bound == float('inf'):
+            # Borne de départ : l'ordre de Borda
+            upper_bound = score_permutation(np.argsort(tab_d.sum(axis=1), kind='stable') + 1, tab_d)
+        remaining_bound = _inner_lower_bounds(np.minimum(tab_d, tab_d.T), dtype)
+
+    f = np.full(1 << n, infinity, dtype=dtype)
+    f[0] = 0
+    reached = np.zeros(1 << n, dtype=bool)
+    layer = np.zeros(1, dtype=np.int64)
+    nb_states = 1
+    for _ in range(n):
+        for x in range(n):
+            bit = 1 << x
+            sets = layer[(layer & bit) == 0]
+            if len(sets) == 0:
+                continue
+            targets = sets | bit
+            cost = f[sets] + (row_sums[x] - row_low[x][sets & low_mask] - row_high[x][sets >> half])
+            f[targets] = np.minimum(f[targets], cost)
+            reached[targets] = True
+        layer = np.flatnonzero(reached)
+        reached[layer] = False
+        if prune:
+            layer = layer[f[layer] + remaining_bound[full ^ layer] <= upper_bound]
+        nb_states += len(layer)
+
+    score = int(f[full])
+    instance.nb_states_parcons = nb_states
+    medians = _backtrack(f, row_sums, row_low, row_high, half, n, max_medians if all_medians else 1)
+    instance.add_solver_permutations(medians)
+    instance.declare_is_optimal()
+
+    if verbose:
+        print(f"Parcons ({score}) {len(medians)} médiane(s), {nb_states} sous-ensembles étendus")
+        for median in medians[:10]:
+            print(median)
+
+
+def _table_bytes(n, prune=True, itemsize=4):
+    """
+    Estimation de la mémoire occupée par parcons_dp : table des coûts f, indicateurs reached, bornes du reste
+    (avec prune), et la plus grande couche de sous-ensembles avec ses tableaux temporaires (int64).
 
-        mid = (left + right) // 2
-        inv_count = KemenyScoreCalculator._merge_sort_and_count(arr, left, mid)
-        inv_count += KemenyScoreCalculator._merge_sort_and_count(arr, mid + 1, right)
-        inv_count += KemenyScoreCalculator._merge_and_count(arr, left, mid, right)
+    :param n: Le nombre d'éléments.
+    :param prune: Si True, la table des bornes est comptée.
+    :param itemsize: La taille en octets d'une entrée de la table des coûts.
+    :return: Le nombre d'octets.
+    """
+    tables = (1 << n) * (itemsize + 1 + (itemsize if prune else 0))
+    return tables + 5 * 8 * math.comb(n, n // 2)
 
-        return inv_count
 
-    @staticmethod
-    def _merge_and_count(arr: List[int], left: int, mid: int, right: int) -> int:
-        left_subarray = arr[left:mid + 1]
-        right_subarray = arr[mid + 1:right + 1]
+def _subset_sums(rows, first, last):
+    """
+    Table des sommes table[x][mask] = somme des rows[x][first + b] pour les bits b de mask.
 
-        i = j = 0
-        k = left
-        inversions = 0
+    :param rows: Une matrice (n, n).
+    :param first: Le premier élément couvert par les masques.
+    :param last: L'élément suivant le dernier élément couvert.
+    :return: Un tableau (n, 2^(last - first)).
+    """
+    table = np.zeros((rows.shape[0], 1 << (last - first)), dtype=np.int64)
+    for b in range(last - first):
+        size = 1 << b
+        table[:, size:2 * size] = table[:, :size] + rows[:, first + b][:, None]
+    return table
 
-        while i < len(left_subarray) and j < len(right_subarray):
-            if left_subarray[i] <= right_subarray[j]:
-                arr[k] = left_subarray[i]
-                i += 1
-            else:
-                arr[k] = right_subarray[j]
-                inversions += (mid - i + 1 - left)
-                j += 1
-            k += 1
 
-        while i < len(left_subarray):
-            arr[k] = left_subarray[i]
-            i += 1
-            k += 1
+def _inner_lower_bounds(tab_min, dtype):
+    """
+    Borne inférieure simple de chaque sous-ensemble : somme des tab_min[x][y] sur les paires internes.
 
-        while j < len(right_subarray):
-            arr[k] = right_subarray[j]
-            j += 1
-            k += 1
+    :param tab_min: La matrice des minimums des deux coûts de chaque paire.
+    :param dtype: Le type entier de la table.
+    :return: Un tableau de 2^n bornes indexé par masque de bits.
+    """
+    n = tab_min.shape[0]
+    half = n // 2
+    low_mask = (1 << half) - 1
+    row_low = _subset_sums(tab_min, 0, half)
+    row_high = _subset_sums(tab_min, half, n)
+    bounds = np.zeros(1 << n, dtype=dtype)
+    for b in range(n):
+        # Les sous-ensembles dont b est le plus grand élément s'obtiennent à partir de ceux des éléments < b
+        size = 1 << b
+        sets = np.arange(size, dtype=np.int64)
+        bounds[size:2 * size] = bounds[:size] + row_low[b][sets & low_mask] + row_high[b][sets >> half]
+    return bounds
+
+
+def _backtrack(f, row_sums, row_low, row_high, half, n, max_medians):
+    """
+    Reconstruit les médianes optimales en remontant la table des coûts depuis l'ensemble complet.
 
-        return inversions
+    :return: Au plus max_medians permutations (éléments de 1 à n).
+    """
+    low_mask = (1 << half) - 1
+    medians = []
+    # Chaque entrée : (ensemble restant, éléments déjà placés en fin de permutation)
+    stack = [((1 << n) - 1, [])]
+    while stack and len(medians) < max_medians:
+        current, suffix = stack.pop()
+        if current == 0:
+            medians.append(suffix[::-1])
+            continue
+        for x in range(n - 1, -1, -1):
+            bit = 1 << x
+            if not current & bit:
+                continue
+            previous = current ^ bit
+            cost = int(f[previous]) + int(row_sums[x] - row_low[x][previous & low_mask] - row_high[x][previous >> half])
+            if f[previous] != np.iinfo(f.dtype).max and cost == f[current]:
+                stack.append((previous, suffix + [x + 1]))
+    return medians
 
 
 class parcons_algorithm:
@@ -80,19 +186,17 @@ class parcons_algorithm:
         Calcule la permutation médiane en minimisant la somme des distances Kendall-Tau à toutes les permutations données.
         :return: La permutation médiane.
         """
-        all_elements = list(range(1, len(self.permutations[0].elements) + 1))
-        best_permutation = None
-        best_distance = float('inf')
+        return self.calculate_medians(max_medians=1)[0]
 
-        for perm in permutations(all_elements):
-            current_perm = Permutation(list(perm))
-            total_distance = sum(current_perm.distance_to(p) for p in self.permutations)
-
-            if total_distance < best_distance:
-                best_distance = total_distance
-                best_permutation = current_perm
-
-        return best_permutation
+    def calculate_medians(self, max_medians: int = 1000) -> List[Permutation]:
+        """
+        Calcule toutes les permutations médianes (au plus max_medians).
+        :param max_medians: Le nombre maximal de médianes retournées.
+        :return: La liste des permutations médianes.
+        """
+        instance = Instance([p.elements for p in self.permutations])
+        parcons_dp(instance, all_medians=True, max_medians=max_medians)
+        return list(instance.medians)
 
 
 # Exemple d'utilisation
@@ -105,6 +209,7 @@ if __name__ == "__main__":
         Permutation([3, 4, 1, 2])
     ]
 
-    parcons = Parcons(perms)
+    parcons = parcons_algorithm(perms)
     median_perm = parcons.calculate_median()
     print(f"Permutation médiane calculée : {median_perm.elements}")
+    print(f"Toutes les médianes : {[p.elements for p in parcons.calculate_medians()]}")
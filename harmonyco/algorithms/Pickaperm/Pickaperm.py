@@ -1,7 +1,9 @@
-# branchandbound.py
+# Pickaperm.py
 import random
 from typing import List
 
+import numpy as np
+
 class pickaperm_algorithm:
     """
     Implémentation de l'algorithme Pick-a-Perm pour sélectionner une permutation parmi un ensemble de permutations.
@@ -57,8 +59,35 @@ class pickaperm_algorithm:
         return score
 
 
+def pickaperm(instance, verbose=False, seed=None):
+    """
+    Heuristique Pick-a-Perm : propose comme médiane l'un des classements de l'instance, tiré au hasard (chaque
+    classement distinct avec une probabilité proportionnelle à son nombre d'occurrences, comme un tirage uniforme
+    parmi les m classements). Son score est en espérance au plus le double de l'optimum ; Best of A en est la
+    version déterministe.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche des informations détaillées.
+    - seed (int): Graine du générateur aléatoire, pour des exécutions reproductibles (facultatif).
+
+    Returns:
+    - None: Met à jour l'objet instance avec la permutation tirée.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.asarray(instance.weights, dtype=np.float64)
+    index = int(rng.choice(len(weights), p=weights / weights.sum()))
+    chosen = instance.rankings[index].tolist()
+    instance.add_solver_permutation(chosen)
+
+    if verbose:
+        print(f"Pickaperm ({instance.distance_to_set_matrix(chosen)}) {chosen}")
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
+    from ...Computation.instance import Instance
+
     # Ensemble de permutations
     permutations = [
         [1, 2, 3, 4],
@@ -67,10 +96,15 @@ if __name__ == "__main__":
         [3, 4, 1, 2]
     ]
 
-    picker = PickAPerm(permutations)
+    picker = pickaperm_algorithm(permutations)
 
     # Sélectionne une permutation au hasard
     chosen_permutation = picker.pick()
     print(f"Permutation choisie aléatoirement : {chosen_permutation}")
 
-    # Sélectionne la "meilleure" permutation selon le critère dé
+    # Sélectionne la "meilleure" permutation selon le critère des positions fixes
+    print(f"Permutation avec le plus de positions fixes : {picker.pick_best()}")
+
+    # Version de l'interface commune des algorithmes
+    instance = Instance(permutations)
+    pickaperm(instance, verbose=True, seed=0)
@@ -0,0 +1,176 @@
+import os
+import queue
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from ..AutoSelect.AutoSelect import EXACT_DP_MAX_N
+from ..BestOfA.BestOfA import heuristic_best_of_a
+from ..borda.borda import heuristic_borda_count
+from ..copeland.copeland import heuristic_copeland
+from ..Parcons.Parcons import parcons_dp
+from ..SimulatedAnnealing.SimulatedAnnealing import heuristic_sa
+from ...Computation.instance import Instance
+
+# Solveurs que le portfolio sait lancer, par nom. 'bounds' calcule la borne inférieure add3cycles.
+PORTFOLIO_SOLVERS = ('borda', 'copeland', 'BestOfA', 'bounds', 'Parcons', 'SimulatedAnnealing')
+# Part du budget réservée au retour des résultats : les travailleurs s'arrêtent un peu avant l'échéance
+RESULT_MARGIN = 0.1
+
+
+def portfolio(instance, verbose=False, time_limit=0.2, solvers=None, n_jobs=None, seed=None, on_bound=None):
+    """
+    Exécute plusieurs algorithmes en parallèle jusqu'à une échéance et conserve la meilleure solution (anytime).
+
+    Les solveurs sont lancés dans un groupe de processus ; chaque résultat est fusionné dans l'instance dès son
+    arrivée, et chaque amélioration des bornes est signalée à on_bound. Tant qu'il reste du temps, les processus
+    libérés exécutent de nouveaux électrons du recuit simulé (graines distinctes), en alternant descentes rapides
+    (sa_mode 0) et électrons complets (sa_mode 1). À l'échéance, ou dès que les
+    bornes se rejoignent, les calculs en cours sont interrompus et l'instance contient la meilleure solution.
+
+    Parameters:
+    - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
+    - verbose (bool): Si True, affiche chaque amélioration des bornes.
+    - time_limit (float): Durée maximale en secondes.
+    - solvers (list): Les noms des solveurs à lancer (voir PORTFOLIO_SOLVERS ; par défaut tous, Parcons seulement
+      si n <= EXACT_DP_MAX_N).
+    - n_jobs (int): Nombre de processus (par défaut, tous les cœurs).
+    - seed (int): Graine des électrons du recuit simulé (facultatif).
+    - on_bound (function): Fonction on_bound(kind, value, solver, elapsed) appelée à chaque amélioration, avec
+      kind valant 'upper' ou 'lower' (facultatif).
+
+    Returns:
+    - None: Met à jour l'objet instance ; instance.portfolio_history contient les améliorations successives.
+    """
+    start = time.time()
+    deadline = start + time_limit
+    worker_deadline = deadline - RESULT_MARGIN * time_limit
+    if solvers is None:
+        solvers = [name for name in PORTFOLIO_SOLVERS if name != 'Parcons' or instance.n <= EXACT_DP_MAX_N]
+    for name in solvers:
+        if name not in PORTFOLIO_SOLVERS:
+            raise ValueError(f"Solveur inconnu pour le portfolio : {name}")
+    if n_jobs is None or n_jobs == -1:
+        n_jobs = os.cpu_count()
+    n_jobs = max(1, n_jobs)
+
+    history = []
+    instance.portfolio_history = history
+
+    def report(kind, value, name):
+        elapsed = time.time() - start
+        history.append((elapsed, kind, value, name))
+        if verbose:
+            print(f"[{elapsed * 1000:.0f} ms] {name} : borne {'supérieure' if kind == 'upper' else 'inférieure'} "
+                  f"{value}")
+        if on_bound is not None:
+            on_bound(kind, value, name, elapsed)
+
+    seeds = np.random.SeedSequence(seed)
+    tasks = [(name, None) for name in solvers if name != 'SimulatedAnnealing']
+    sa_enabled = 'SimulatedAnnealing' in solvers
+
+    # Les résultats sont déposés dans une file par les fonctions de rappel du groupe de processus
+    results = queue.Queue()
+    pool = Pool(n_jobs, initializer=_init_portfolio_worker,
+                initargs=(instance.rankings, instance.weights, instance.preference_matrix))
+    try:
+        in_flight = 0
+
+        sa_runs = 0
+
+        def submit(name, task_seed=None, sa_mode=None):
+            pool.apply_async(_run_solver, (name, task_seed, sa_mode, worker_deadline), callback=results.put,
+                             error_callback=lambda error: results.put((name, error)))
+
+        def submit_sa():
+            nonlocal sa_runs
+            submit('SimulatedAnnealing', seeds.spawn(1)[0], sa_runs % 2)
+            sa_runs += 1
+
+        for name, _ in tasks:
+            submit(name)
+            in_flight += 1
+        while sa_enabled and in_flight < max(n_jobs, len(tasks) + 1):
+            submit_sa()
+            in_flight += 1
+
+        while in_flight:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                result = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            in_flight -= 1
+            name = result[0]
+            if isinstance(result[1], BaseException):
+                if verbose:
+                    print(f"{name} : échec ({result[1]!r})")
+                continue
+
+            _, medians, lower_bound, optimal = result
+            upper_bound = instance.best_upper_bound
+            instance.add_solver_permutations(medians)
+            if instance.best_upper_bound < upper_bound:
+                report('upper', instance.best_upper_bound, name)
+            if lower_bound is not None and lower_bound > instance.best_lower_bound:
+                instance.set_lower_bound(lower_bound)
+                report('lower', instance.best_lower_bound, name)
+            if optimal or instance.best_upper_bound <= instance.best_lower_bound:
+                instance.declare_is_optimal()
+                break
+
+            if sa_enabled and worker_deadline - time.time() > 0:
+                submit_sa()
+                in_flight += 1
+    finally:
+        # Les calculs encore en cours sont abandonnés
+        pool.terminate()
+        pool.join()
+
+
+# Instance du processus travailleur, reconstruite sans recalcul de la matrice de préférence
+_worker_rankings = None
+_worker_weights = None
+_worker_preference_matrix = None
+
+
+def _init_portfolio_worker(rankings, weights, preference_matrix):
+    global _worker_rankings, _worker_weights, _worker_preference_matrix
+    _worker_rankings = rankings
+    _worker_weights = weights
+    _worker_preference_matrix = preference_matrix
+
+
+def _run_solver(name, task_seed, sa_mode, deadline):
+    """
+    Exécute un solveur sur une instance neuve du processus travailleur.
+
+    :return: (nom, médianes (listes d'éléments), borne inférieure ou None, optimalité prouvée).
+    """
+    instance = Instance(_worker_rankings, preference_matrix=_worker_preference_matrix, weights=_worker_weights)
+    lower_bound = None
+    if name == 'borda':
+        heuristic_borda_count(instance)
+    elif name == 'copeland':
+        heuristic_copeland(instance)
+    elif name == 'BestOfA':
+        heuristic_best_of_a(instance)
+    elif name == 'bounds':
+        lower_bound = instance.simple_lower_bound + instance.add3cyles_lower_bound
+    elif name == 'Parcons':
+        parcons_dp(instance)
+        lower_bound = instance.best_lower_bound
+    elif name == 'SimulatedAnnealing':
+        heuristic_sa(instance, sa_mode=sa_mode, seed=task_seed, time_limit=max(0.0, deadline - time.time()))
+    return name, [list(median.elements) for median in instance.medians], lower_bound, instance.is_optimal
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    instance = Instance.random(50, 40, seed=0)
+    portfolio(instance, verbose=True, time_limit=0.5, seed=0)
+    print(f"Score : {instance.best_upper_bound}, écart : {instance.get_gap()} ({instance.get_relative_gap():.2f}%)")
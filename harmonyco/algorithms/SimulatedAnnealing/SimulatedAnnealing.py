@@ -1,10 +1,34 @@
+import json
 import math
-import random
 import numpy as np
-import math
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ...Computation import kernels
+from ...Computation.insertion import InsertionState
+from ...Computation.instance import Instance
+from ...evaluation.generators import generate_rankings, uniform_rankings
+from ...utils.shared_array import SharedArray, attach_shared_array
+
+# Nombre de mouvements entre deux lectures de l'horloge
+TIME_CHECK_INTERVAL = 4096
+
+# Table des paramètres ajustés par tune_sa_parameters, lue par sa_schedule
+SA_PARAMETERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sa_parameters.json')
+# Probabilité visée qu'au moins un électron atteigne l'optimum, pour fixer le nombre d'électrons
+TARGET_SUCCESS = 0.999
+# Nombre maximal d'électrons d'une entrée de la table (au-delà, le réglage est écarté)
+MAX_TUNED_RUNS = 64
+# Facteurs de refroidissement essayés par tune_sa_parameters
+TUNING_ALPHAS = (0.99, 0.995, 0.999, 0.9995, 0.9998)
 
-def heuristic_sa(instance, verbose_detail=False, verbose_result=False, sa_mode=3):
+# Tables de paramètres déjà chargées, par chemin
+_parameter_tables = {}
+
+
+def heuristic_sa(instance, verbose_detail=False, verbose_result=False, sa_mode=3, seed=None, n_jobs=None,
+                 initial_permutation=None, time_limit=None):
     """
     Implémentation de l'algorithme de recuit simulé (Simulated Annealing) en Python.
 
@@ -13,35 +37,110 @@ def heuristic_sa(instance, verbose_detail=False, verbose_result=False, sa_mode=3
     - verbose_detail (bool): Si True, affiche des détails de l'exécution du SA.
     - verbose_result (bool): Si True, affiche les résultats du SA.
     - sa_mode (int): Mode de recuit simulé pour ajuster les paramètres (0 à 5).
+    - seed (int): Graine du générateur aléatoire, pour des exécutions reproductibles (facultatif).
+    - n_jobs (int): Nombre de processus pour exécuter les électrons en parallèle (-1 : tous les cœurs).
+      Par défaut, les électrons sont exécutés en série, chacun repartant de la meilleure permutation du précédent.
+    - initial_permutation (list): Permutation de départ (éléments de 1 à n), par exemple une médiane précédente
+      (facultatif ; par défaut, une permutation aléatoire).
+    - time_limit (float): Durée maximale en secondes (facultatif). Les électrons en cours s'arrêtent à l'échéance
+      et les suivants ne sont pas lancés.
 
     Returns:
     - None: Met à jour l'objet instance avec les résultats de l'algorithme SA.
     """
     sa_set = set()
-    pi = None
-    next_pi = None
-    energy = 0
-    delta_energy = 0
-    num_runs = 0
-    num_moves = 0
-    ini_temperature = 0.0
-    temperature = 0.0
-    rand = 0.0
-    alpha = 0.0
-
-    p_min = None
-    e_min = float('inf')
     global_e_min = float('inf')
 
-    r1, r2 = 0, 0
     n = instance.n
-    temp = 0
     set_size = instance.m
-    a = [0] * n
 
     # Paramétrage du SA en fonction de m et n
+    ini_temperature, alpha, num_moves, num_runs = sa_schedule(n, set_size)
+
+    # Ajustement selon le mode SA
+    if sa_mode == 0:
+        ini_temperature = 0.0
+        num_moves *= 0.33
+        num_runs = 1
+    elif sa_mode == 1:
+        ini_temperature *= 0.5
+        alpha *= 0.995
+        num_moves *= 0.666
+        num_runs = 1
+    elif sa_mode == 2:
+        ini_temperature *= 0.9
+        num_moves *= 0.866
+        num_runs = int(round(0.5 * num_runs) + 1)
+    elif sa_mode == 3:
+        pass  # paramètres par défaut
+    elif sa_mode == 4:
+        num_moves *= 1.1
+        num_runs *= 2
+    elif sa_mode == 5:
+        ini_temperature *= 1.2
+        num_moves *= 2
+        num_runs *= 10
+    else:
+        print("SA error: SAmode not specified")
+
+    num_moves = int(num_moves)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    deadline = None if time_limit is None else time.time() + time_limit
+    initial_order = None
+    if initial_permutation is not None:
+        initial_order = np.asarray(list(initial_permutation), dtype=np.int64) - 1
+
+    if n_jobs is not None and n_jobs > 1:
+        runs = sa_parallel_runs(instance.tabD, num_runs, num_moves, ini_temperature, alpha, seed, n_jobs,
+                                initial_order, deadline)
+    else:
+        runs = sa_serial_runs(instance.tabD, num_runs, num_moves, ini_temperature, alpha, seed, verbose_detail,
+                              initial_order, deadline)
+
+    for e_min, p_min in runs:
+        if e_min < global_e_min:
+            global_e_min = e_min
+            sa_set.clear()
+        if e_min == global_e_min:
+            sa_set.add(tuple(p_min.tolist()))
+
+    sa_set = [[element + 1 for element in order] for order in sa_set]
+    instance.add_solver_permutations(sa_set)
+    instance.set_upper_bound(global_e_min)
+    instance.sa_upper_bound = global_e_min
+
+    if verbose_result:
+        print(f"Simulated Annealing: ({global_e_min}) {sa_set[0]}")
+        print(
+            f"SA heuristic parameters: {ini_temperature} initial temp, {alpha} cooling, {num_moves} moves, {num_runs} runs")
+
+
+def sa_schedule(n, set_size, path=None):
+    """
+    Paramètres de base du recuit simulé (mode 3) pour une instance de n éléments et set_size classements.
+
+    Les paramètres viennent de la table ajustée par tune_sa_parameters (voir lookup_sa_parameters) lorsque (n, m)
+    tombe dans l'un de ses intervalles, et sinon des polynômes historiques, ajustés pour m = 3 et m = 4.
+
+    Parameters:
+    - n (int): Nombre d'éléments.
+    - set_size (int): Nombre de classements.
+    - path (str): Chemin vers la table des paramètres (facultatif, voir sa_parameters_path).
+
+    Returns:
+    - tuple: (température initiale, facteur de refroidissement, nombre de mouvements, nombre d'électrons).
+    """
     ini_temperature = (0.25 * set_size + 4.0) * n
 
+    tuned = lookup_sa_parameters(n, set_size, path)
+    if tuned is not None:
+        # Dans un intervalle, le nombre de mouvements est extrapolé en n² depuis la taille mesurée
+        num_moves = int(math.ceil(tuned['num_moves'] * (n / tuned['n']) ** 2))
+        return ini_temperature, tuned['alpha'], max(num_moves, 1), tuned['num_runs']
+
     if set_size in [3, 4]:
         alpha = 0.99
     elif n <= 10:
@@ -75,168 +174,294 @@ def heuristic_sa(instance, verbose_detail=False, verbose_result=False, sa_mode=3
     else:
         num_runs = math.ceil(0.002 * n * set_size + 3.0)
 
-    # Ajustement selon le mode SA
-    if sa_mode == 0:
-        ini_temperature = 0.0
-        num_moves *= 0.33
-        num_runs = 1
-    elif sa_mode == 1:
-        ini_temperature *= 0.5
-        alpha *= 0.995
-        num_moves *= 0.666
-        num_runs = 1
-    elif sa_mode == 2:
-        ini_temperature *= 0.9
-        num_moves *= 0.866
-        num_runs = int(round(0.5 * num_runs) + 1)
-    elif sa_mode == 3:
-        pass  # paramètres par défaut
-    elif sa_mode == 4:
-        num_moves *= 1.1
-        num_runs *= 2
-    elif sa_mode == 5:
-        ini_temperature *= 1.2
-        num_moves *= 2
-        num_runs *= 10
-    else:
-        print("SA error: SAmode not specified")
+    return ini_temperature, alpha, num_moves, num_runs
+
+
+def sa_parameters_path():
+    """
+    Chemin de la table des paramètres : la variable d'environnement HARMONYCO_SA_PARAMETERS si elle est définie,
+    sinon le fichier SA_PARAMETERS_FILE livré avec le module.
+    """
+    return os.environ.get('HARMONYCO_SA_PARAMETERS', SA_PARAMETERS_FILE)
+
+
+def load_sa_parameter_table(path=None):
+    """
+    Charge une table de paramètres écrite par tune_sa_parameters (mise en cache par chemin).
+
+    Parameters:
+    - path (str): Chemin vers la table (facultatif, voir sa_parameters_path).
+
+    Returns:
+    - list: Les entrées de la table (liste vide si le fichier n'existe pas).
+    """
+    path = sa_parameters_path() if path is None else path
+    if path not in _parameter_tables:
+        entries = []
+        if os.path.exists(path):
+            with open(path) as f:
+                entries = json.load(f).get('entries', [])
+        _parameter_tables[path] = entries
+    return _parameter_tables[path]
+
+
+def lookup_sa_parameters(n, set_size, path=None):
+    """
+    Cherche l'entrée de la table dont l'intervalle contient (n, set_size).
+
+    Parameters:
+    - n (int): Nombre d'éléments.
+    - set_size (int): Nombre de classements.
+    - path (str): Chemin vers la table (facultatif).
+
+    Returns:
+    - dict: L'entrée (n, m, alpha, num_moves, num_runs, ...), ou None.
+    """
+    for entry in load_sa_parameter_table(path):
+        if entry['n_min'] <= n <= entry['n_max'] and entry['m_min'] <= set_size and \
+                (entry['m_max'] is None or set_size <= entry['m_max']):
+            return entry
+    return None
+
+
+def sa_serial_runs(tab_d, num_runs, num_moves, ini_temperature, alpha, seed=None, verbose_detail=False,
+                   initial_order=None, deadline=None):
+    """
+    Exécute les électrons du recuit simulé en série, chacun repartant de la meilleure permutation du précédent.
 
-    # Initialisation avec une permutation aléatoire
-    pi = create_random_permutation(n)
+    Parameters:
+    - tab_d (np.ndarray): La matrice des distances.
+    - num_runs (int): Nombre d'électrons.
+    - num_moves (int): Nombre de mouvements par électron.
+    - ini_temperature (float): Température initiale.
+    - alpha (float): Facteur de refroidissement.
+    - seed (int): Graine du générateur aléatoire (facultatif).
+    - verbose_detail (bool): Si True, affiche des détails de l'exécution.
+    - initial_order (np.ndarray): Ordre de départ sous forme d'indices (facultatif, aléatoire par défaut).
+    - deadline (float): Instance (time.time()) à laquelle les électrons s'arrêtent (facultatif).
+
+    Returns:
+    - list: Pour chaque électron, le tuple (meilleur score, meilleur ordre sous forme d'indices).
+    """
+    rng = np.random.default_rng(seed)
+    if initial_order is None:
+        initial_order = rng.permutation(tab_d.shape[0])
+    state = InsertionState(tab_d, initial_order)
     if verbose_detail:
         print("SA Details:")
 
+    runs = []
     for j in range(num_runs):
         if verbose_detail:
             print(f"Electron {j}")
             print("i \ttemp \tenergie")
 
-        temperature = ini_temperature
-        energy = pi.distance_to_set_matrix(instance.tabD)
-        e_min = float('inf')
+        e_min, p_min = sa_run(state, num_moves, ini_temperature, alpha, rng, verbose_detail, deadline)
+        runs.append((e_min, p_min))
+        if deadline is not None and time.time() >= deadline:
+            break
+
+        # L'électron suivant repart de la meilleure permutation de celui-ci
+        if state.energy > e_min:
+            state = InsertionState(tab_d, p_min, e_min, state.antisymmetric)
+    return runs
+
+
+def sa_parallel_runs(tab_d, num_runs, num_moves, ini_temperature, alpha, seed=None, n_jobs=None, initial_order=None,
+                     deadline=None):
+    """
+    Exécute les électrons du recuit simulé indépendamment dans un groupe de processus.
+
+    La matrice des distances est partagée sans copie par mémoire partagée ; chaque électron reçoit sa propre
+    graine dérivée de seed (SeedSequence.spawn), de sorte que le résultat ne dépend pas de l'ordonnancement.
+
+    Parameters:
+    - tab_d (np.ndarray): La matrice des distances.
+    - num_runs (int): Nombre d'électrons.
+    - num_moves (int): Nombre de mouvements par électron.
+    - ini_temperature (float): Température initiale.
+    - alpha (float): Facteur de refroidissement.
+    - seed (int): Graine du générateur aléatoire (facultatif).
+    - n_jobs (int): Nombre de processus (facultatif, tous les cœurs par défaut).
+    - initial_order (np.ndarray): Ordre de départ commun à tous les électrons (facultatif, aléatoire par défaut).
+    - deadline (float): Instance (time.time()) à laquelle les électrons s'arrêtent (facultatif).
+
+    Returns:
+    - list: Pour chaque électron, le tuple (meilleur score, meilleur ordre sous forme d'indices).
+    """
+    seeds = np.random.SeedSequence(seed).spawn(num_runs)
+    with SharedArray(tab_d) as shared_tab_d:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_sa_worker,
+                                 initargs=(shared_tab_d.descriptor,)) as executor:
+            futures = [executor.submit(_sa_worker_run, run_seed, num_moves, ini_temperature, alpha, initial_order,
+                                       deadline)
+                       for run_seed in seeds]
+            # Les électrons qui n'ont pas démarré avant l'échéance ne rendent rien
+            return [run for run in (future.result() for future in futures) if run is not None]
+
+
+# Matrices du processus travailleur, attachées une fois par _init_sa_worker
+_worker_tab_d = None
+_worker_antisymmetric = None
+
+
+def _init_sa_worker(descriptor):
+    global _worker_tab_d, _worker_antisymmetric
+    _worker_tab_d = attach_shared_array(descriptor)
+    _worker_antisymmetric = _worker_tab_d.astype(np.int64) - _worker_tab_d.T
+
+
+def _sa_worker_run(run_seed, num_moves, ini_temperature, alpha, initial_order=None, deadline=None):
+    if deadline is not None and time.time() >= deadline:
+        return None
+    rng = np.random.default_rng(run_seed)
+    if initial_order is None:
+        initial_order = rng.permutation(_worker_tab_d.shape[0])
+    state = InsertionState(_worker_tab_d, initial_order, antisymmetric=_worker_antisymmetric)
+    return sa_run(state, num_moves, ini_temperature, alpha, rng, deadline=deadline)
+
+
+def sa_draws(n, num_moves, ini_temperature, alpha, rng, block=TIME_CHECK_INTERVAL):
+    """
+    Tirages aléatoires d'un électron, bloc par bloc : positions source et cible de chaque mouvement, température et
+    seuil d'acceptation -T * log(u) (voir sa_run). Un bloc n'est tiré que lorsqu'il est demandé, de sorte que la
+    mémoire ne dépend pas de num_moves et qu'un électron arrêté par l'échéance ne tire pas les blocs suivants.
+
+    Parameters:
+    - n (int): Nombre d'éléments.
+    - num_moves (int): Nombre de mouvements.
+    - ini_temperature (float): Température initiale.
+    - alpha (float): Facteur de refroidissement.
+    - rng (np.random.Generator): Le générateur aléatoire.
+    - block (int): Nombre de mouvements par bloc.
+
+    Returns:
+    - generator: Les tuples (premier mouvement, sources, cibles, températures, seuils) de chaque bloc.
+    """
+    for start in range(0, num_moves, block):
+        size = min(block, num_moves - start)
+        sources = rng.integers(0, n, size=size)
+        targets = rng.integers(0, n, size=size)
+        temperatures = ini_temperature * alpha ** start * np.power(alpha, np.arange(size))
+        thresholds = -temperatures * np.log(1.0 - rng.random(size))
+        yield start, sources, targets, temperatures, thresholds
 
-        for i in range(num_moves):
-            # Sélection des indices r1 et r2
-            r1 = random.randint(0, n - 1)
-            r2 = random.randint(0, n - 1)
+
+def sa_run(state, num_moves, ini_temperature, alpha, rng, verbose_detail=False, deadline=None, trace=None):
+    """
+    Exécute un électron du recuit simulé en place sur un état d'insertion.
+
+    Les tirages aléatoires sont faits par blocs de TIME_CHECK_INTERVAL mouvements (voir sa_draws), tirés au fur et
+    à mesure : à chaque mouvement, l'élément à la position r2 est réinséré à la
+    position r1, et le mouvement est accepté si delta <= 0 ou delta < -T * log(u), ce qui équivaut au critère de
+    Metropolis u < exp(-delta / T) sans calculer d'exponentielle. Avec le backend compilé (voir
+    Computation.kernels), la boucle des mouvements de chaque bloc est exécutée par le noyau sa_anneal ; les deux
+    chemins consomment les mêmes tirages.
+
+    Parameters:
+    - state (InsertionState): L'état courant, modifié en place.
+    - num_moves (int): Nombre de mouvements.
+    - ini_temperature (float): Température initiale.
+    - alpha (float): Facteur de refroidissement.
+    - rng (np.random.Generator): Le générateur aléatoire.
+    - verbose_detail (bool): Si True, affiche chaque mouvement accepté.
+    - deadline (float): Instance (time.time()) à laquelle l'électron s'arrête (facultatif).
+    - trace (np.ndarray): Tableau (num_moves,) auquel est ajouté le score courant avant chaque mouvement
+      (facultatif ; force la boucle Python).
+
+    Returns:
+    - tuple: (meilleur score rencontré, meilleur ordre rencontré sous forme d'indices).
+    """
+    n = state.n
+    e_min = state.energy
+    p_min = state.order.copy()
+    if n < 2 or num_moves <= 0:
+        return e_min, p_min
+
+    order = state.order
+    antisymmetric = state.antisymmetric
+    use_kernel = kernels.USE_NUMBA and not verbose_detail and trace is None
+    for start, sources, targets, temperatures, thresholds in sa_draws(n, num_moves, ini_temperature, alpha, rng):
+        if deadline is not None and time.time() >= deadline:
+            break
+        if use_kernel:
+            energy, block_e_min, block_p_min = kernels.sa_anneal(order, state.position, antisymmetric, state.energy,
+                                                                 sources, targets, thresholds)
+            state.energy = int(energy)
+            if block_e_min < e_min:
+                e_min = int(block_e_min)
+                p_min = block_p_min
+            continue
+
+        for k in range(len(sources)):
+            if trace is not None:
+                trace[start + k] += state.energy
+            r1 = targets[k]
+            r2 = sources[k]
+            if r1 == r2:
+                continue
 
             # Calcul de delta_energy
-            if r1 != r2:
-                if r2 > r1:
-                    temp = sum(instance.tabD[pi.get_tab()[r2] - 1][pi.get_tab()[u] - 1] for u in range(r1, r2))
-                    delta_energy = -set_size * (r2 - r1) + 2 * temp
-                else:
-                    temp = sum(instance.tabD[pi.get_tab()[r2] - 1][pi.get_tab()[u] - 1] for u in range(r2 + 1, r1 + 1))
-                    delta_energy = set_size * (r1 - r2) - 2 * temp
+            row = antisymmetric[order[r2]]
+            if r1 < r2:
+                delta_energy = row[order[r1:r2]].sum()
             else:
-                delta_energy = 0
+                delta_energy = -row[order[r2 + 1:r1 + 1]].sum()
 
             # Décision d'acceptation du mouvement
-            if delta_energy <= 0:
-                # Création de la nouvelle permutation
-                a = pi.get_tab().copy()
-                if r1 != r2:
-                    if r2 > r1:
-                        temp = a[r2]
-                        for u in range(r2, r1, -1):
-                            a[u] = a[u - 1]
-                        a[r1] = temp
-                    else:
-                        temp = a[r2]
-                        for u in range(r2, r1):
-                            a[u] = a[u + 1]
-                        a[r1] = temp
-                next_pi = Permutation(a)
-                pi = next_pi
-                energy += delta_energy
+            if delta_energy <= 0 or delta_energy < thresholds[k]:
+                state.apply(r2, r1, int(delta_energy))
                 if verbose_detail:
-                    print(f"{i}\t{temperature:.2f}\t{energy}")
-                if energy < e_min:
-                    e_min = energy
-                    p_min = pi
-                    if e_min < global_e_min:
-                        global_e_min = e_min
-                        sa_set.clear()
-            else:
-                rand = random.random()
-                if rand < math.exp(-delta_energy / temperature):
-                    a = pi.get_tab().copy()
-                    if r1 != r2:
-                        if r2 > r1:
-                            temp = a[r2]
-                            for u in range(r2, r1, -1):
-                                a[u] = a[u - 1]
-                            a[r1] = temp
-                        else:
-                            temp = a[r2]
-                            for u in range(r2, r1):
-                                a[u] = a[u + 1]
-                            a[r1] = temp
-                    next_pi = Permutation(a)
-                    pi = next_pi
-                    energy += delta_energy
-                    if verbose_detail:
-                        print(f"{i}\t{temperature:.2f}\t{energy}")
-            temperature *= alpha
-
-        if energy > e_min:
-            pi = p_min
-            energy = e_min
-        if energy == global_e_min:
-            sa_set.add(pi)
-
-    instance.add_solver_permutations(sa_set)
-    instance.set_upper_bound(global_e_min)
-    instance.sa_upper_bound = global_e_min
-
-    if verbose_result:
-        print(f"Simulated Annealing: ({global_e_min}) {pi}")
-        print(
-            f"SA heuristic parameters: {ini_temperature} initial temp, {alpha} cooling, {num_moves} moves, {num_runs} runs")
+                    print(f"{start + k}\t{temperatures[k]:.2f}\t{state.energy}")
+                if state.energy < e_min:
+                    e_min = state.energy
+                    p_min = order.copy()
 
+    return e_min, p_min
 
-import numpy as np
 
-
-def sa_average_solution_stat(arg1):
+def sa_average_solution_stat(arg1, m=3, n=10, seed=None):
     """
-    Calcule les statistiques moyennes des solutions pour plusieurs exécutions du recuit simulé (Simulated Annealing).
+    Calcule le score moyen, mouvement par mouvement, du recuit simulé sur des instances aléatoires, pour visualiser
+    la convergence d'un électron.
 
     Parameters:
     - arg1 (int): Nombre de cas à simuler.
+    - m (int): Nombre de classements par instance.
+    - n (int): Nombre d'éléments par instance.
+    - seed (int): Graine du générateur aléatoire (facultatif).
 
     Returns:
-    - None: Affiche les statistiques moyennes.
+    - np.ndarray: Le score moyen avant chaque mouvement (affiché également).
     """
-    nb_cas = 1000  # par défaut
     nb_cas = arg1
-    m = 3  # par défaut
-    n = 10  # par défaut
     nb_electrons = 1
     nb_mvts = 700
-    temperature = 500
     temperature = (m * 0.25 + 4.0) * n
     refroidissement = 0.99
 
     tab_average = np.zeros(nb_mvts)
+    rng = np.random.default_rng(seed)
 
     print(f"n={n}, m={m}, cas={nb_cas}, ele={nb_electrons}, mvt={nb_mvts}, tmp={temperature}, lam={refroidissement}")
 
     for cas in range(nb_cas):
-        my_instance = Instance(m, n)
+        my_instance = Instance(uniform_rankings(m, n, seed=rng))
         heuristique_creer_sa_for_parameters2(my_instance, False, False, nb_electrons, nb_mvts, temperature,
-                                             refroidissement, tab_average)
+                                             refroidissement, tab_average, rng)
 
-    tab_average /= nb_cas
+    tab_average /= nb_cas * nb_electrons
 
     for i in range(nb_mvts):
         print(f"{i} \t {tab_average[i]:.2f}")
+    return tab_average
 
 
 def heuristique_creer_sa_for_parameters2(instance, verbose_detail, verbose_result, nb_electrons, nb_mvts, temperature,
-                                         refroidissement, tab_average):
+                                         refroidissement, tab_average, rng=None):
     """
-    Fonction simulant le recuit simulé avec les paramètres donnés. Cette fonction met à jour le tableau `tab_average`.
+    Exécute des électrons du recuit simulé avec les paramètres donnés et ajoute leur score, mouvement par
+    mouvement, au tableau `tab_average`.
 
     Parameters:
     - instance: Instance de l'objet à simuler.
@@ -246,148 +471,311 @@ def heuristique_creer_sa_for_parameters2(instance, verbose_detail, verbose_resul
     - nb_mvts (int): Nombre de mouvements.
     - temperature (float): Température initiale.
     - refroidissement (float): Facteur de refroidissement.
-    - tab_average (np.array): Tableau pour accumuler les résultats.
+    - tab_average (np.array): Tableau (nb_mvts,) pour accumuler les résultats.
+    - rng (np.random.Generator): Le générateur aléatoire (facultatif).
 
     Returns:
     - None: Met à jour `tab_average`.
     """
+    rng = np.random.default_rng(rng)
     for electron in range(nb_electrons):
-        energie = 0
-        for i in range(nb_mvts):
-            # Simulation d'un mouvement ici
-            delta_energie = np.random.rand() - 0.5  # Exemple: changement d'énergie aléatoire
-            energie += delta_energie
-            temperature *= refroidissement
-            tab_average[i] += energie
-
+        state = InsertionState(instance.tabD, rng.permutation(instance.n))
+        e_min, _ = sa_run(state, nb_mvts, temperature, refroidissement, rng, verbose_detail, trace=tab_average)
+        if verbose_result:
+            print(f"Électron {electron} : {e_min}")
 
-class Instance:
-    def __init__(self, m, n):
-        self.m = m
-        self.n = n
-        # Initialisation des autres attributs nécessaires
 
+def known_optimum(instance, time_limit=None):
+    """
+    Score optimal d'une instance, calculé par auto_select (programmation dynamique ou Branch and Bound).
 
-# Exemple d'utilisation
-if __name__ == "__main__":
-    sa_average_solution_stat(100)
+    Parameters:
+    - instance: L'instance (mise à jour par la résolution).
+    - time_limit (float): Durée maximale de la résolution en secondes (facultatif).
 
+    Returns:
+    - int: Le score optimal, ou None s'il n'a pas été prouvé dans le temps imparti.
+    """
+    # Importé ici : AutoSelect importe lui-même ce module
+    from ..AutoSelect.AutoSelect import auto_select
 
+    auto_select(instance, time_limit=time_limit, seed=0)
+    return int(instance.best_upper_bound) if instance.is_optimal else None
 
 
-def find_sa_parameters(arg1, arg2, refroidissement):
+def heuristique_creer_sa_for_parameters(instance, verbose_detail, verbose_result, nb_electrons, nb_mvts, temperature,
+                                        refroidissement, dernieres_iterations, optimum, rng=None,
+                                        nb_of_divisions=500):
     """
-    Calcule les paramètres optimaux pour l'algorithme de recuit simulé en simulant plusieurs cas.
+    Exécute des électrons du recuit simulé et relève, pour chacun, le nombre de mouvements après lequel il a
+    atteint le score optimal.
+
+    Les mouvements sont exécutés par blocs de nb_mvts / nb_of_divisions avec le noyau sa_anneal ; le nombre de
+    mouvements relevé est celui de la fin du premier bloc où l'optimum est atteint.
 
     Parameters:
-    - arg1 (int): Valeur de m (nombre d'éléments dans la permutation).
-    - arg2 (int): Valeur de n (taille de la permutation).
-    - refroidissement (float): Facteur de refroidissement de l'algorithme SA.
+    - instance: Instance de l'objet à simuler.
+    - verbose_detail (bool): Si True, affiche le résultat de chaque électron.
+    - verbose_result (bool): Si True, affiche le nombre d'électrons ayant atteint l'optimum.
+    - nb_electrons (int): Nombre d'électrons.
+    - nb_mvts (int): Nombre maximal de mouvements par électron.
+    - temperature (float): Température initiale.
+    - refroidissement (float): Facteur de refroidissement.
+    - dernieres_iterations (dict): Compteurs mis à jour : nombre de mouvements -> nombre d'électrons
+      (clé -1 pour les électrons qui n'ont pas atteint l'optimum).
+    - optimum (int): Le score optimal de l'instance.
+    - rng (np.random.Generator): Le générateur aléatoire (facultatif).
+    - nb_of_divisions (int): Nombre de blocs de mouvements.
 
     Returns:
-    - None: Affiche les résultats et les écrit dans des fichiers.
+    - None: Met à jour `dernieres_iterations`.
     """
-    nb_cas = 500  # 1000/2
-    m = arg1
-    n = arg2
-    nb_electrons = 1000
-    nb_mvts = 100000
-    temperature = (m * 0.25 + 4.0) * n
-
-    rendu = 0
-    dernieres_iterations = {}
-    cumulative = 0
-
-    nb_found = 0.0
-    nb_not_found = 0.0
-    total = 0.0
+    rng = np.random.default_rng(rng)
+    n = instance.n
+    block = max(1, math.ceil(nb_mvts / nb_of_divisions))
+    antisymmetric = instance.tabD.astype(np.int64) - instance.tabD.T
+    found = 0
+    for electron in range(nb_electrons):
+        state = InsertionState(instance.tabD, rng.permutation(n), antisymmetric=antisymmetric)
+        hit = 0 if state.energy <= optimum else -1
+        draws = sa_draws(n, nb_mvts if hit == -1 and n > 1 else 0, temperature, refroidissement, rng, block)
+        for start, sources, targets, _, thresholds in draws:
+            energy, e_min, _ = kernels.sa_anneal(state.order, state.position, antisymmetric, state.energy,
+                                                 sources, targets, thresholds)
+            state.energy = int(energy)
+            if e_min <= optimum:
+                hit = start + len(sources)
+                break
+        dernieres_iterations[hit] = dernieres_iterations.get(hit, 0) + 1
+        found += hit != -1
+        if verbose_detail:
+            print(f"Électron {electron} : {'optimum après ' + str(hit) + ' mouvements' if hit != -1 else 'échec'}")
+    if verbose_result:
+        print(f"{found}/{nb_electrons} électrons ont atteint l'optimum ({optimum})")
 
-    first_found = 0.0
-    last_found = 0.0
-    scale_plus = 0.0
-    scale_mult = 0.0
-    nb_of_divisions = 500.0
-    tab_dernieres_iterations = np.zeros(int(nb_of_divisions))
 
-    mvt90accumule = -1
-    mvt95accumule = -1
+def known_instances(m, n, nb_cas, seed=None, model='uniform', time_limit=10.0):
+    """
+    Génère des instances et calcule leur score optimal (voir known_optimum).
 
-    print(
-        f"start\nn={n}, m={m}, cas={nb_cas}, ele={nb_electrons}, mvt={nb_mvts}, tmp={temperature}, lam={refroidissement}")
+    Parameters:
+    - m (int): Nombre de classements.
+    - n (int): Nombre d'éléments.
+    - nb_cas (int): Nombre d'instances générées.
+    - seed (int ou np.random.SeedSequence): Graine du générateur aléatoire (facultatif).
+    - model (str): Modèle de génération des classements (voir evaluation.generators).
+    - time_limit (float): Durée maximale du calcul de l'optimum de chaque instance.
 
+    Returns:
+    - list: Les couples (instance, score optimal) ; les instances dont l'optimum n'est pas prouvé sont ignorées.
+    """
+    rng = np.random.default_rng(seed)
+    instances = []
     for cas in range(nb_cas):
-        my_instance = Instance(m, n)
-        heuristics_pack(my_instance, False)
-        constraints_pack(my_instance, False, True)
-        branch_and_bound(my_instance, False)
-        heuristique_creer_sa_for_parameters(my_instance, False, False, nb_electrons, nb_mvts, temperature,
-                                            refroidissement, dernieres_iterations)
-
-    while -1 in dernieres_iterations:
-        nb_not_found += dernieres_iterations[-1]
-        del dernieres_iterations[-1]
-
-    write_all_final_good_iterations_in_file(dernieres_iterations,
-                                            f"SA_param_data/finalGoodIterations_m_{m}_n_{n}_ref_{refroidissement}.txt")
+        rankings = generate_rankings(model, m, n, seed=rng)
+        optimum = known_optimum(Instance(rankings), time_limit)
+        if optimum is not None:
+            instances.append((Instance(rankings), optimum))
+    return instances
 
-    first_found = min(dernieres_iterations.keys())
-    last_found = max(dernieres_iterations.keys())
-    scale_plus = first_found * 0.95
-    scale_mult = (last_found - first_found) / (nb_of_divisions * 0.95) + 1.0
 
-    while dernieres_iterations:
-        key = min(dernieres_iterations.keys())
-        if key >= ((rendu + 1) * scale_mult + scale_plus):
-            rendu += 1
-        else:
-            nb_found += dernieres_iterations[key]
-            tab_dernieres_iterations[rendu] += dernieres_iterations[key]
-            del dernieres_iterations[key]
+def find_sa_parameters(arg1, arg2, refroidissement, nb_cas=500, nb_electrons=1000, nb_mvts=100000, seed=None,
+                       model='uniform', output_dir=None, time_limit=10.0, verbose=True, instances=None):
+    """
+    Mesure, pour un facteur de refroidissement donné, le nombre de mouvements dont un électron a besoin pour
+    atteindre le score optimal, sur des instances générées dont l'optimum est calculé exactement.
 
-    total = nb_found + nb_not_found
-    nb_found_affichage = nb_found * 100.0 / total
-    nb_found = nb_found / 100.0 * total
+    Parameters:
+    - arg1 (int): Valeur de m (nombre de classements).
+    - arg2 (int): Valeur de n (taille de la permutation).
+    - refroidissement (float): Facteur de refroidissement de l'algorithme SA.
+    - nb_cas (int): Nombre d'instances générées (celles dont l'optimum n'est pas prouvé sont ignorées).
+    - nb_electrons (int): Nombre d'électrons par instance.
+    - nb_mvts (int): Nombre maximal de mouvements par électron.
+    - seed (int): Graine du générateur aléatoire (facultatif).
+    - model (str): Modèle de génération des classements (voir evaluation.generators).
+    - output_dir (str): Répertoire où écrire les distributions (facultatif).
+    - time_limit (float): Durée maximale du calcul de l'optimum de chaque instance.
+    - verbose (bool): Si True, affiche les résultats.
+    - instances (list): Les couples (instance, score optimal) déjà calculés par known_instances (facultatif ;
+      remplace nb_cas, model et time_limit).
 
-    cumulative = 0
-    for i in range(int(nb_of_divisions)):
-        cumulative += tab_dernieres_iterations[i]
-        if mvt90accumule == -1 and cumulative >= 0.90 * nb_found:
-            mvt90accumule = int((i + 1) * scale_mult + scale_plus - 1)
-        if mvt95accumule == -1 and cumulative >= 0.95 * nb_found:
-            mvt95accumule = int((i + 1) * scale_mult + scale_plus - 1)
+    Returns:
+    - dict: n, m, alpha, cases, success (part des électrons ayant atteint l'optimum), mvt90accumule et
+      mvt95accumule (nombre de mouvements après lequel 90 % et 95 % des électrons ont atteint l'optimum, None si
+      cette proportion n'est pas atteinte), et instance_hits : pour chaque instance, le tableau des nombres de
+      mouvements après lesquels ses électrons ont atteint l'optimum (-1 pour un échec), voir runs_for_target.
+    """
+    m = arg1
+    n = arg2
+    temperature = (m * 0.25 + 4.0) * n
+    nb_of_divisions = 500
+    # Flux séparés : les instances ne dépendent que de seed, quel que soit le refroidissement essayé
+    instance_seed, sa_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(sa_seed)
+    if instances is None:
+        instances = known_instances(m, n, nb_cas, instance_seed, model, time_limit)
 
-    resultat_affiche = f"n={n}, m={m}, cas={nb_cas}, ele={nb_electrons}, mvt={nb_mvts}, tmp={temperature}, lam={refroidissement}\n"
-    resultat_affiche += f"nbFound: {nb_found_affichage:.2f}%, nbNotFound: {nb_not_found:.2f}%\n"
-    resultat_affiche += f"-\nmvt90accumule: {mvt90accumule}\nmvt95accumule: {mvt95accumule}\nsucces: {nb_found_affichage:.2f}%\n"
+    dernieres_iterations = {}
+    instance_hits = []
+    cases = len(instances)
+    for my_instance, optimum in instances:
+        iterations = {}
+        heuristique_creer_sa_for_parameters(my_instance, False, False, nb_electrons, nb_mvts, temperature,
+                                            refroidissement, iterations, optimum, rng, nb_of_divisions)
+        instance_hits.append(np.repeat(np.array(list(iterations), dtype=np.int64), list(iterations.values())))
+        for moves, count in iterations.items():
+            dernieres_iterations[moves] = dernieres_iterations.get(moves, 0) + count
+
+    nb_not_found = dernieres_iterations.pop(-1, 0)
+    hits = np.repeat(np.array(sorted(dernieres_iterations), dtype=np.int64),
+                     [dernieres_iterations[k] for k in sorted(dernieres_iterations)])
+    total = len(hits) + nb_not_found
+    success = len(hits) / total if total else 0.0
+
+    def moves_for(share):
+        needed = math.ceil(share * total)
+        return int(hits[needed - 1]) if total and len(hits) >= needed else None
+
+    stats = {'n': n, 'm': m, 'alpha': refroidissement, 'model': model, 'cases': cases, 'electrons': total,
+             'nb_mvts': nb_mvts, 'temperature': temperature, 'success': success,
+             'mvt90accumule': moves_for(0.90), 'mvt95accumule': moves_for(0.95), 'instance_hits': instance_hits}
+
+    resultat_affiche = f"n={n}, m={m}, cas={cases}, ele={nb_electrons}, mvt={nb_mvts}, tmp={temperature}, lam={refroidissement}\n"
+    resultat_affiche += f"nbFound: {100.0 * success:.2f}%, nbNotFound: {100.0 * (1.0 - success) if total else 0.0:.2f}%\n"
+    resultat_affiche += f"-\nmvt90accumule: {stats['mvt90accumule']}\nmvt95accumule: {stats['mvt95accumule']}\n"
+    if verbose:
+        print(resultat_affiche)
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        suffix = f"m_{m}_n_{n}_ref_{refroidissement}.txt"
+        block = max(1, math.ceil(nb_mvts / nb_of_divisions))
+        tab_dernieres_iterations = np.bincount(np.maximum(np.ceil(hits / block).astype(np.int64) - 1, 0),
+                                               minlength=nb_of_divisions)[:nb_of_divisions]
+        write_all_final_good_iterations_in_file(dict(zip(*np.unique(hits, return_counts=True))),
+                                                os.path.join(output_dir, f"finalGoodIterations_{suffix}"))
+        write_sa_params_in_file(resultat_affiche, os.path.join(output_dir, f"SA_params_{suffix}"))
+        write_final_good_iterations_cdf_in_file(tab_dernieres_iterations, nb_of_divisions,
+                                                os.path.join(output_dir, f"CDF_{suffix}"))
+        write_final_good_iterations_pdf_in_file(tab_dernieres_iterations, nb_of_divisions,
+                                                os.path.join(output_dir, f"PDF_{suffix}"))
+        write_final_good_iterations_scale_in_file(tab_dernieres_iterations, nb_of_divisions, block, block,
+                                                  os.path.join(output_dir, f"Scale_{suffix}"))
+    return stats
+
+
+def expected_success(instance_hits, num_moves, runs):
+    """
+    Probabilité qu'au moins un électron sur runs atteigne l'optimum en num_moves mouvements, en moyenne sur les
+    instances : chaque instance a son propre taux de réussite, mesuré à num_moves mouvements (et non au budget
+    complet de la mesure), de sorte que les instances difficiles ne sont pas masquées par les faciles.
 
-    print(resultat_affiche)
-    print("stop")
+    Parameters:
+    - instance_hits (list): Les tableaux des mouvements de réussite de chaque instance (voir find_sa_parameters).
+    - num_moves (int): Le nombre de mouvements par électron.
+    - runs (int): Le nombre d'électrons.
 
-    write_sa_params_in_file(resultat_affiche, f"SA_param_data/SA_params_m_{m}_n_{n}_ref_{refroidissement}.txt")
-    write_final_good_iterations_cdf_in_file(tab_dernieres_iterations, nb_of_divisions,
-                                            f"SA_param_data/CDF_m_{m}_n_{n}_ref_{refroidissement}.txt")
-    write_final_good_iterations_pdf_in_file(tab_dernieres_iterations, nb_of_divisions,
-                                            f"SA_param_data/PDF_m_{m}_n_{n}_ref_{refroidissement}.txt")
-    write_final_good_iterations_scale_in_file(tab_dernieres_iterations, nb_of_divisions, scale_mult, scale_plus,
-                                              f"SA_param_data/Scale_m_{m}_n_{n}_ref_{refroidissement}.txt")
+    Returns:
+    - float: La probabilité moyenne de réussite.
+    """
+    if not instance_hits:
+        return 0.0
+    rates = np.array([np.mean((hits >= 0) & (hits <= num_moves)) for hits in instance_hits])
+    return float(np.mean(1.0 - (1.0 - rates) ** runs))
 
 
-# Fonctions placeholder à implémenter
-def heuristics_pack(instance, verbose):
-    pass
+def runs_for_target(instance_hits, num_moves, target=TARGET_SUCCESS, max_runs=MAX_TUNED_RUNS):
+    """
+    Plus petit nombre d'électrons de num_moves mouvements pour lequel expected_success atteint target.
 
+    Returns:
+    - int: Le nombre d'électrons, ou None s'il en faut plus de max_runs.
+    """
+    for runs in range(1, max_runs + 1):
+        if expected_success(instance_hits, num_moves, runs) >= target:
+            return runs
+    return None
 
-def constraints_pack(instance, use_gd, verbose):
-    pass
 
+def tune_sa_parameters(sizes, alphas=TUNING_ALPHAS, nb_cas=20, nb_electrons=50, seed=0, model='uniform',
+                       path=None, time_limit=10.0, max_moves=200000, verbose=False):
+    """
+    Ajuste les paramètres du recuit simulé pour chaque taille (n, m) et les enregistre dans une table JSON lue
+    par heuristic_sa (voir sa_schedule).
 
-def branch_and_bound(instance, verbose):
-    pass
+    Pour chaque taille et chaque facteur de refroidissement, find_sa_parameters mesure, instance par instance, le
+    nombre de mouvements après lequel chaque électron atteint l'optimum. Trois durées d'électron sont essayées :
+    les nombres de mouvements après lesquels 90 % et 95 % des électrons ont réussi, et le budget complet. Pour
+    chacune, le nombre d'électrons est choisi pour que l'optimum soit atteint avec la probabilité TARGET_SUCCESS,
+    d'après le taux de réussite de chaque instance à cette durée (voir runs_for_target). Le réglage retenu est
+    celui qui minimise le nombre total de mouvements. Chaque taille couvre l'intervalle allant jusqu'aux moyennes
+    géométriques avec ses voisines ; la plus grande valeur de m couvre aussi tous les m supérieurs.
 
+    Parameters:
+    - sizes (list): Les couples (n, m) mesurés.
+    - alphas (tuple): Les facteurs de refroidissement essayés.
+    - nb_cas (int): Nombre d'instances par taille.
+    - nb_electrons (int): Nombre d'électrons par instance.
+    - seed (int): Graine du générateur aléatoire (les mêmes instances servent pour tous les facteurs).
+    - model (str): Modèle de génération des classements (voir evaluation.generators).
+    - path (str): Chemin de la table à écrire (par défaut, SA_PARAMETERS_FILE).
+    - time_limit (float): Durée maximale du calcul de l'optimum de chaque instance.
+    - max_moves (int): Nombre maximal de mouvements par électron.
+    - verbose (bool): Si True, affiche les mesures.
 
-def heuristique_creer_sa_for_parameters(instance, verbose_detail, verbose_result, nb_electrons, nb_mvts, temperature,
-                                        refroidissement, dernieres_iterations):
-    pass
+    Returns:
+    - list: Les entrées de la table.
+    """
+    ns = sorted({n for n, _ in sizes})
+    ms = sorted({m for _, m in sizes})
+
+    def interval(values, value, open_ended):
+        index = values.index(value)
+        low = 1 if index == 0 else int(math.floor(math.sqrt(values[index - 1] * value))) + 1
+        high = None if open_ended and index == len(values) - 1 else \
+            value if index == len(values) - 1 else int(math.floor(math.sqrt(value * values[index + 1])))
+        return low, high
+
+    entries = []
+    for n, m in sizes:
+        best = None
+        # Les mêmes instances servent pour tous les facteurs de refroidissement
+        instances = known_instances(m, n, nb_cas, np.random.SeedSequence(seed).spawn(2)[0], model, time_limit)
+        for alpha in alphas:
+            # Assez de mouvements pour que la température soit divisée par e^20
+            nb_mvts = int(min(max(20.0 / (1.0 - alpha), 1000), max_moves))
+            stats = find_sa_parameters(m, n, alpha, nb_cas, nb_electrons, nb_mvts, seed, model, verbose=verbose,
+                                       instances=instances)
+            if stats['cases'] == 0:
+                continue
+            cutoffs = {max(moves, 1) for moves in (stats['mvt90accumule'], stats['mvt95accumule'], nb_mvts)
+                       if moves is not None}
+            for num_moves in sorted(cutoffs):
+                runs = runs_for_target(stats['instance_hits'], num_moves)
+                if runs is None:
+                    continue
+                success = expected_success(stats['instance_hits'], num_moves, runs)
+                candidate = (num_moves * runs, -success, alpha, num_moves, runs, success, stats)
+                if best is None or candidate[:2] < best[:2]:
+                    best = candidate
+        if best is None:
+            continue
+        _, _, alpha, num_moves, runs, success, stats = best
+        n_min, n_max = interval(ns, n, False)
+        m_min, m_max = interval(ms, m, True)
+        entries.append({'n': n, 'm': m, 'n_min': n_min, 'n_max': n_max, 'm_min': m_min, 'm_max': m_max,
+                        'alpha': alpha, 'num_moves': num_moves, 'num_runs': runs, 'success': success,
+                        'run_success': expected_success(stats['instance_hits'], num_moves, 1),
+                        'cases': stats['cases']})
+        if verbose:
+            print(f"n={n}, m={m} : alpha={alpha}, {num_moves} mouvements, {runs} électrons")
+
+    path = SA_PARAMETERS_FILE if path is None else path
+    with open(path, 'w') as f:
+        json.dump({'version': 1, 'model': model, 'target_success': TARGET_SUCCESS, 'entries': entries}, f, indent=2)
+    _parameter_tables.pop(path, None)
+    return entries
 
 
 def write_all_final_good_iterations_in_file(data, filename):
@@ -421,13 +809,7 @@ def write_final_good_iterations_scale_in_file(data, nb_of_divisions, scale_mult,
             file.write(f"{i * scale_mult + scale_plus}\t{data[i]}\n")
 
 
-class Instance:
-    def __init__(self, m, n):
-        self.m = m
-        self.n = n
-        # Initialisation des autres attributs nécessaires
-
-
 # Exemple d'utilisation
 if __name__ == "__main__":
-    find_sa_parameters(3, 20, 0.95)
+    find_sa_parameters(3, 20, 0.95, nb_cas=5, nb_electrons=50, nb_mvts=20000, seed=0)
+    print(f"Paramètres pour n=20, m=100 : {sa_schedule(20, 100)}")
@@ -1,3 +1,9 @@
+import numpy as np
+
+from ...Computation.permutation import Permutation
+from ...Computation.preference_matrix import score_permutation
+
+
 def heuristic_borda_count(instance, verbose=False):
     """
     Implémentation de l'heuristique Borda Count en Python pour calculer la médiane des permutations.
@@ -9,23 +15,19 @@ def heuristic_borda_count(instance, verbose=False):
     Returns:
     - None: Met à jour l'objet instance avec les résultats de l'algorithme Borda Count.
     """
-    best_score = float('inf')
-    n = instance.n
-    tab_values = [0] * n
-    tab_elements = list(range(1, n + 1))
+    tab_d = np.asarray(instance.tabD)
 
     # Calcul des valeurs Borda pour chaque élément
-    for i in range(n):
-        tab_values[i] = sum(instance.tabD[i][j] for j in range(n))
+    tab_values = tab_d.sum(axis=1)
 
     # Tri des éléments en fonction des valeurs Borda (ordre croissant)
-    tab_elements_sorted, tab_values_sorted = zip(*sorted(zip(tab_elements, tab_values), key=lambda x: x[1]))
+    tab_elements_sorted = np.argsort(tab_values, kind='stable') + 1
 
     # Conversion de la liste triée en une permutation
-    result = Permutation(list(tab_elements_sorted))
+    result = Permutation(tab_elements_sorted.tolist())
 
     # Calcul de la distance à l'ensemble des matrices et mise à jour du score
-    best_score = result.distance_to_set_matrix(instance.tabD)
+    best_score = score_permutation(result.elements, tab_d)
     instance.Borda_upper_bound = best_score
     instance.add_solver_permutation(result)
     instance.set_upper_bound(best_score)
@@ -1,77 +1,88 @@
-def branch_and_bound(instance, verbose=False):
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Value
+
+import numpy as np
+
+from ...Computation import kernels
+
+
+def branch_and_bound(instance, verbose=False, memory_limit=None, n_jobs=None, split_depth=None, node_budget=20000,
+                     time_limit=None):
     """
     Implémentation de l'algorithme Branch and Bound en Python pour calculer la médiane des permutations.
 
     Parameters:
     - instance: Objet contenant les données de l'instance (par exemple, les permutations et les distances tabulées).
     - verbose (bool): Si True, affiche des informations détaillées.
+    - memory_limit (int): Nombre maximal d'entrées de la table des topScores (par défaut instance.memory_limit).
+    - n_jobs (int): Nombre de processus pour explorer les sous-arbres en parallèle (-1 : tous les cœurs).
+    - split_depth (int): Profondeur maximale du découpage initial en sous-arbres (mode parallèle, facultatif).
+    - node_budget (int): Nombre de nœuds après lequel un sous-arbre est redécoupé (mode parallèle).
+    - time_limit (float): Durée maximale de l'exploration en secondes (facultatif). Si elle est atteinte, la
+      meilleure solution trouvée est conservée mais n'est pas déclarée optimale.
 
     Returns:
     - None: Met à jour l'objet instance avec les résultats de l'algorithme Branch and Bound.
     """
     # Initialisation
     n = instance.n
-    response = 0
     resolution_mot = 0
     instance.nb_explored_nodes_bnb = 0
     instance.nb_max_nodes_bnb = 500000000
-    memory_limit = 100000
+    if memory_limit is None:
+        memory_limit = instance.memory_limit
 
     instance.nb_reject_gd = 0.0
     instance.nb_reject_triplets = 0.0
     instance.nb_reject_mot = 0.0
     instance.nb_reject_mot4 = 0.0
     instance.nb_reject_semi_dist_bi = 0.0
+    instance.nb_reject_semi_dist_bi_add = 0.0
     instance.nb_reject_top_scores = 0.0
     instance.nb_reject_sub_scores = 0.0
     instance.nb_reject_spatial = 0.0
     instance.nb_reject = 0.0
 
-    min_sub_scores_size = 4
-    max_sub_scores_size = 6
-
-    instance.top_scores = {}
-    instance.sub_scores = {}
-
     if verbose:
         print("\n ***EXACT B&B SOLVER***\n")
 
     # Calcul des contraintes MOT
-    for i in range(n):
-        for j in range(n):
-            if instance.tabC[i][j]:
-                resolution_mot += 1
+    resolution_mot = int(np.count_nonzero(instance.tab_c))
 
-    resolution_exacte = 100.0 * (resolution_mot) / (n * (n - 1) / 2)
+    resolution_exacte = 100.0 * (resolution_mot) / (n * (n - 1) / 2) if n > 1 else 100.0
     if verbose:
         print(f"Resolution contraintes par contraintes: {resolution_mot}/{n * (n - 1) / 2} ({resolution_exacte:.2f}%)")
     instance.resolu_mot = f"{resolution_exacte:.2f}%"
 
-    # Préparation des nombres et permutations pour le BnB
-    nombres = []
+    # Préparation de l'ordre d'exploration des éléments pour le BnB
     if len(instance.medians) == 0:
         nombres = list(range(1, n + 1))
     else:
         pi = instance.pick_a_random_median()
-        nombres = [pi.get_tab()[i] for i in range(pi.get_size())]
+        nombres = list(pi.elements)
 
-    borne_inf = instance.simple_lower_bound
-    borne_inf_add = instance.add3cyles_lower_bound
     if verbose:
         print(f"Gap = {instance.get_gap()} ({instance.get_relative_gap():.2f}%)")
-
-    # Début de l'algorithme Branch and Bound
-    vecteur_bit = BitVector(n)
-    vecteur_bit.set_value(0)
-    permu_en_cours = []
-
-    if verbose:
         print("Starting the BnB...")
 
-    response = branch_and_bound_recursive(instance, permu_en_cours, instance.apport, borne_inf_add, nombres, n, 0,
-                                          borne_inf, vecteur_bit, False, 0)
+    # Début de l'algorithme Branch and Bound
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    deadline = None if time_limit is None else time.time() + time_limit
+    search = BranchAndBoundSearch(instance, nombres, memory_limit, deadline)
+    if n_jobs is not None and n_jobs > 1:
+        parallel_branch_and_bound(search, n_jobs, split_depth, node_budget)
+    else:
+        search.run()
 
-    if instance.nb_explored_nodes_bnb >= instance.nb_max_nodes_bnb:
+    if search.timed_out:
+        if verbose:
+            print("Time limit exceeded: BnB didn't finish optimizing")
+            print(f"Gap = {instance.get_gap()} ({instance.get_relative_gap():.2f}%)")
+    elif instance.nb_explored_nodes_bnb >= instance.nb_max_nodes_bnb:
         if verbose:
             print("Node limit exceeded: BnB didn't finish optimizing")
             print(f"Gap = {instance.get_gap()} ({instance.get_relative_gap():.2f}%)")
@@ -85,185 +96,450 @@ def branch_and_bound(instance, verbose=False):
     # Compilation des résultats
     instance.nb_reject = (
             instance.nb_reject_gd + instance.nb_reject_triplets + instance.nb_reject_mot +
-            instance.nb_reject_mot4 + instance.nb_reject_semi_dist_bi +
+            instance.nb_reject_mot4 + instance.nb_reject_semi_dist_bi + instance.nb_reject_semi_dist_bi_add +
             instance.nb_reject_top_scores + instance.nb_reject_sub_scores + instance.nb_reject_spatial
     )
 
     if verbose:
         print(
             "Profil des rejets - " +
-            f"GD : {instance.nb_reject_gd:.2f}%, triplets : {instance.nb_reject_triplets:.2f}%, MOT3e+LUBC : {instance.nb_reject_mot:.2f}%, " +
-            f"SemiDistBI : {instance.nb_reject_semi_dist_bi:.2f}%, TopScs : {instance.nb_reject_top_scores:.2f}%, " +
-            f"SubScs : {instance.nb_reject_sub_scores:.2f}%, Spatial : {instance.nb_reject_spatial:.2f}%, total : {instance.nb_reject:.2f}%"
+            f"GD : {instance.nb_reject_gd:.0f}, triplets : {instance.nb_reject_triplets:.0f}, MOT3e+LUBC : {instance.nb_reject_mot:.0f}, " +
+            f"SemiDistBI : {instance.nb_reject_semi_dist_bi_add:.0f}, TopScs : {instance.nb_reject_top_scores:.0f}, total : {instance.nb_reject:.0f}"
         )
-        print(
-            f"Size of topScores = {len(instance.top_scores)}, size of subScores({min_sub_scores_size}-{max_sub_scores_size}) = {len(instance.sub_scores)}")
+        print(f"Size of topScores = {len(search.top_scores)} (limit {memory_limit}, {search.top_scores.evictions} evicted)")
         print(f"Nb de noeuds explorés: {instance.nb_explored_nodes_bnb}\n")
 
 
-def branch_and_bound_recursive(instance, current_permutation, contributions, lower_bound_add, numbers, left_to_set,
-                               semi_dist, lower_bound, bit_vector, verbose_details, that_bnb_number):
-    response = float('inf')
-    candidate_response = float('inf')
-    new_semi_dist = 0
-    new_lower_bound = 0
-    new_lower_bound_add = 0
-    new_contributions = None
-    last_element = 0
-    before_last_element = 0
-    element_to_put = 0
+# Nombre de nœuds explorés entre deux lectures de l'horloge
+TIME_CHECK_INTERVAL = 256
 
-    permission_to_continue = True
 
-    # Usage des contraintes
-    use_gd = True
-    use_triplets = True
-    use_constraints = True
-    use_semi_dist_bi_add = True
-    use_top_scores = True
+class TopScoresTable:
+    """
+    Table de transposition bornée du Branch and Bound : pour chaque ensemble d'éléments déjà placés (clé entière
+    en masque de bits), la plus petite semi-distance avec laquelle cet ensemble a été atteint.
 
-    numbers_after_first_cuts = []
-    associated_lower_bounds = []
-    associated_lower_bound = 0
+    Les entrées sont rangées par profondeur (nombre d'éléments placés). Quand la table est pleine, les entrées
+    les plus profondes sont évincées en premier : elles sont les plus nombreuses et coupent les plus petits
+    sous-arbres, alors que les entrées proches de la racine ont le plus de valeur.
+    """
 
-    this_bnb_number = 0
+    def __init__(self, n, memory_limit):
+        """
+        Initialise une table vide.
+
+        :param n: Le nombre d'éléments.
+        :param memory_limit: Le nombre maximal d'entrées.
+        """
+        self.memory_limit = memory_limit
+        self.tables = [dict() for _ in range(n + 1)]
+        self.size = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self.size
+
+    def check_and_store(self, key, depth, semi_dist):
+        """
+        Compare la semi-distance d'un nœud à celle déjà enregistrée pour le même ensemble d'éléments placés.
+
+        :param key: Le masque de bits des éléments placés.
+        :param depth: Le nombre d'éléments placés.
+        :param semi_dist: La semi-distance du nœud.
+        :return: False si le même ensemble a déjà été atteint avec une semi-distance strictement plus petite.
+        """
+        table = self.tables[depth]
+        previous = table.get(key)
+        if previous is not None:
+            if previous < semi_dist:
+                return False
+            if semi_dist < previous:
+                table[key] = semi_dist
+            return True
+
+        if self.memory_limit <= 0:
+            return True
+        if self.size >= self.memory_limit:
+            self._evict(depth)
+            if self.size >= self.memory_limit:
+                return True
+        table[key] = semi_dist
+        self.size += 1
+        return True
+
+    def _evict(self, depth):
+        """
+        Vide le niveau non vide le plus profond, s'il est au moins aussi profond que le nœud à insérer.
+        """
+        for deepest in range(len(self.tables) - 1, depth - 1, -1):
+            if self.tables[deepest]:
+                self.evictions += len(self.tables[deepest])
+                self.size -= len(self.tables[deepest])
+                self.tables[deepest] = dict()
+                return
+
+
+class BranchAndBoundSearch:
+    """
+    Exploration itérative de l'arbre du Branch and Bound avec une pile explicite.
+
+    Un nœud est le préfixe des éléments déjà placés. L'état courant (préfixe, éléments restants, semi-distance,
+    bornes, apports des triangles) est modifié en place en descendant et restauré en remontant, sans copier de
+    listes à chaque nœud. La semi-distance compte les paires dont au moins un élément est placé ; la borne d'un
+    nœud est semi-distance + borne simple des restants + apport des triangles dont les trois sommets restent.
+    """
+
+    def __init__(self, instance, element_order=None, memory_limit=None, deadline=None):
+        """
+        Prépare les tables de l'instance pour l'exploration.
+
+        :param instance: L'instance à résoudre.
+        :param element_order: L'ordre (éléments à partir de 1) dans lequel départager les fils de même borne.
+        :param memory_limit: Le nombre maximal d'entrées de la table des topScores.
+        :param deadline: L'instance (time.time()) à laquelle l'exploration s'arrête (facultatif).
+        """
+        self.instance = instance
+        self.n = n = instance.n
+        self.tab_d = np.asarray(instance.tabD, dtype=np.int64)
+        self.tab_min = np.minimum(self.tab_d, self.tab_d.T)
+        self.tab_c = np.asarray(instance.tab_c)
+        self.tab_contraintes_d = np.asarray(instance.tab_contraintes_d)
+        self.tab_triplets = instance.tab_triplets
+        self.tab_triangle_associe = np.asarray(instance.tab_triangle_associe, dtype=np.int64)
+        self.tab_triangle_add = np.asarray(instance.tab_triangle_add, dtype=np.int64)
+        if memory_limit is None:
+            memory_limit = instance.memory_limit
+        self.top_scores = TopScoresTable(n, memory_limit)
+        self.deadline = deadline
+        self.timed_out = False
+
+        if element_order is None:
+            element_order = range(1, n + 1)
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[np.asarray(list(element_order), dtype=np.int64) - 1] = np.arange(n)
+
+        # État courant, modifié en place
+        self.prefix = []
+        self.used = np.zeros(n, dtype=bool)
+        self.mask = 0
+        self.semi_dist = 0
+        self.lower_bound = instance.simple_lower_bound
+        self.lower_bound_add = instance.add3cyles_lower_bound
+        self.contributions = np.array(instance.apport, dtype=np.int64)
+
+    def upper_bound(self):
+        """
+        La meilleure borne supérieure connue, utilisée pour élaguer.
+        """
+        return self.instance.best_upper_bound
+
+    def on_leaf(self, prefix, score):
+        """
+        Enregistre une permutation complète dont le score n'est pas supérieur à la borne supérieure.
+
+        :param prefix: La permutation, sous forme d'indices (à partir de 0).
+        :param score: Son score.
+        """
+        self.instance.add_solver_permutation([element + 1 for element in prefix])
+
+    def place(self, element):
+        """
+        Place un élément à la suite du préfixe courant.
+
+        :param element: L'élément à placer (indice à partir de 0).
+        :return: L'enregistrement permettant d'annuler le placement avec unplace.
+        """
+        self.used[element] = True
+        remaining = np.flatnonzero(~self.used)
+        saved = (self.semi_dist, self.lower_bound, self.lower_bound_add, self.contributions[element])
+
+        self.semi_dist += int(self.tab_d[element, remaining].sum())
+        self.lower_bound -= int(self.tab_min[element, remaining].sum())
+        self.lower_bound_add -= int(self.contributions[element])
+
+        # Les triangles contenant l'élément ne comptent plus pour ses deux autres sommets
+        thirds = self.tab_triangle_associe[element, remaining]
+        active = thirds != 0
+        active[active] = ~self.used[thirds[active] - 1]
+        touched = remaining[active]
+        amounts = self.tab_triangle_add[element, touched]
+        self.contributions[touched] -= amounts
+        self.contributions[element] = -1
+
+        self.prefix.append(element)
+        self.mask |= 1 << element
+        return saved, touched, amounts
+
+    def unplace(self, record):
+        """
+        Annule le dernier placement.
+
+        :param record: L'enregistrement retourné par place.
+        """
+        (semi_dist, lower_bound, lower_bound_add, contribution), touched, amounts = record
+        element = self.prefix.pop()
+        self.mask &= ~(1 << element)
+        self.used[element] = False
+        self.contributions[touched] += amounts
+        self.contributions[element] = contribution
+        self.semi_dist, self.lower_bound, self.lower_bound_add = semi_dist, lower_bound, lower_bound_add
+
+    def children(self):
+        """
+        Calcule les fils admissibles du nœud courant, triés par borne croissante.
+
+        :return: La liste des couples (borne, élément) des fils qui passent les contraintes et la borne.
+        """
+        instance = self.instance
+        remaining = np.flatnonzero(~self.used)
+        candidates = remaining
+
+        # Contrainte D/G : le nouvel élément doit pouvoir suivre immédiatement le dernier placé
+        if self.prefix:
+            allowed = self.tab_contraintes_d[self.prefix[-1], candidates]
+            instance.nb_reject_gd += len(candidates) - int(allowed.sum())
+            candidates = candidates[allowed]
+
+        # Contrainte des triplets sur les deux derniers éléments placés
+        if len(self.prefix) >= 2:
+            allowed = self.tab_triplets[self.prefix[-2], self.prefix[-1], candidates]
+            instance.nb_reject_triplets += len(candidates) - int(allowed.sum())
+            candidates = candidates[allowed]
+
+        # Contraintes MOT : aucun élément restant ne doit devoir précéder le nouvel élément
+        allowed = ~self.tab_c[np.ix_(remaining, candidates)].any(axis=0)
+        instance.nb_reject_mot += len(candidates) - int(allowed.sum())
+        candidates = candidates[allowed]
+        if len(candidates) == 0:
+            return []
+
+        # Bornes de tous les fils : semi-distance + borne simple + apport des triangles
+        if kernels.USE_NUMBA:
+            bounds = kernels.child_bounds(self.tab_d, self.tab_min, candidates, remaining, self.semi_dist,
+                                          self.lower_bound, self.lower_bound_add, self.contributions)
+        else:
+            rest = self.tab_d[np.ix_(candidates, remaining)].sum(axis=1)
+            rest_min = self.tab_min[np.ix_(candidates, remaining)].sum(axis=1)
+            bounds = (self.semi_dist + rest) + (self.lower_bound - rest_min) + \
+                     (self.lower_bound_add - self.contributions[candidates])
+
+        allowed = bounds < self.upper_bound()
+        instance.nb_reject_semi_dist_bi_add += len(candidates) - int(allowed.sum())
+        candidates, bounds = candidates[allowed], bounds[allowed]
+
+        order = np.lexsort((self.rank[candidates], bounds))
+        return list(zip(bounds[order].tolist(), candidates[order].tolist()))
+
+    def run(self, prefix=(), node_budget=None):
+        """
+        Explore le sous-arbre du préfixe donné.
+
+        :param prefix: Les éléments (indices à partir de 0) placés à la racine du sous-arbre.
+        :param node_budget: Nombre maximal de nœuds à explorer dans ce sous-arbre (facultatif).
+        :return: Les préfixes des sous-arbres restant à explorer si l'exploration a été interrompue par le budget
+                 ou par la limite de nœuds, sinon une liste vide.
+        """
+        instance = self.instance
+        records = [self.place(element) for element in prefix]
+        root_depth = len(self.prefix)
+        explored = 0
+        frontier = []
+
+        # Chaque niveau de la pile contient les fils restant à explorer et l'enregistrement du placement courant
+        stack = [[self.children(), 0, None]]
+        while stack:
+            frame = stack[-1]
+            if frame[2] is not None:
+                self.unplace(frame[2])
+                frame[2] = None
+
+            children, index = frame[0], frame[1]
+            if index >= len(children):
+                stack.pop()
+                continue
+            frame[1] = index + 1
+
+            bound, element = children[index]
+            if bound >= self.upper_bound():
+                instance.nb_reject_semi_dist_bi_add += 1
+                continue
+
+            # Limite sur le nombre de noeuds explorés
+            if instance.nb_explored_nodes_bnb >= instance.nb_max_nodes_bnb or \
+                    (node_budget is not None and explored >= node_budget) or self._out_of_time(explored):
+                frame[1] = index
+                frontier = self._frontier(stack, root_depth)
+                break
+            instance.nb_explored_nodes_bnb += 1
+            explored += 1
+
+            frame[2] = self.place(element)
+            if not self.top_scores.check_and_store(self.mask, len(self.prefix), self.semi_dist):
+                instance.nb_reject_top_scores += 1
+                continue
+
+            # Feuille
+            if len(self.prefix) == self.n:
+                if self.semi_dist <= self.upper_bound():
+                    self.on_leaf(self.prefix, self.semi_dist)
+                continue
+
+            stack.append([self.children(), 0, None])
+
+        # Restauration de l'état de départ
+        for frame in reversed(stack):
+            if frame[2] is not None:
+                self.unplace(frame[2])
+        for record in reversed(records):
+            self.unplace(record)
+        return frontier
+
+    def _out_of_time(self, explored):
+        """
+        Vérifie l'échéance, tous les TIME_CHECK_INTERVAL nœuds.
+
+        :param explored: Le nombre de nœuds explorés depuis le début de run.
+        :return: True si l'échéance est dépassée.
+        """
+        if self.deadline is not None and explored % TIME_CHECK_INTERVAL == 0 and time.time() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def _frontier(self, stack, root_depth):
+        """
+        Liste les préfixes des fils non encore explorés de chaque niveau de la pile.
+
+        :param stack: La pile d'exploration interrompue.
+        :param root_depth: La longueur du préfixe à la racine de l'exploration.
+        :return: Les préfixes (indices à partir de 0), les moins profonds en premier.
+        """
+        frontier = []
+        upper_bound = self.upper_bound()
+        for level, (children, index, record) in enumerate(stack):
+            base = self.prefix[:root_depth + level]
+            frontier.extend(base + [element] for bound, element in children[index:] if bound < upper_bound)
+        return frontier
+
+
+def split_work_units(search, min_units, max_depth):
+    """
+    Découpe l'arbre de recherche en sous-arbres indépendants en développant ses premiers niveaux.
+
+    :param search: L'exploration (dans son état de départ).
+    :param min_units: Le nombre de sous-arbres visé.
+    :param max_depth: La profondeur maximale du découpage.
+    :return: La liste des préfixes (indices à partir de 0) des sous-arbres.
+    """
+    units = [[]]
+    depth = 0
+    while len(units) < min_units and depth < min(max_depth, search.n - 1):
+        next_units = []
+        for prefix in units:
+            records = [search.place(element) for element in prefix]
+            next_units.extend(prefix + [element] for bound, element in search.children())
+            for record in reversed(records):
+                search.unplace(record)
+        units = next_units
+        depth += 1
+    return units
+
+
+def parallel_branch_and_bound(search, n_jobs, split_depth=None, node_budget=20000):
+    """
+    Explore l'arbre du Branch and Bound en parallèle sur un groupe de processus.
+
+    L'arbre est découpé sur ses premiers niveaux en sous-arbres distribués dynamiquement aux travailleurs. La
+    borne supérieure est partagée en mémoire partagée : chaque travailleur élague avec la meilleure solution
+    trouvée par l'ensemble des processus. Un sous-arbre qui dépasse node_budget nœuds est rendu sous forme de
+    sous-arbres plus petits, remis dans la file : les sous-arbres déséquilibrés sont ainsi redécoupés et répartis
+    entre les travailleurs libres.
+
+    :param search: L'exploration séquentielle, dont l'instance reçoit les résultats.
+    :param n_jobs: Le nombre de processus.
+    :param split_depth: La profondeur maximale du découpage initial (facultatif).
+    :param node_budget: Le nombre de nœuds après lequel un sous-arbre est redécoupé.
+    """
+    instance = search.instance
+    if split_depth is None:
+        split_depth = 3
+    units = deque(split_work_units(search, 8 * n_jobs, split_depth))
+
+    # Borne supérieure partagée ; inf n'est pas représentable en entier
+    no_bound = np.iinfo(np.int64).max
+    initial = instance.best_upper_bound
+    shared_upper_bound = Value('q', no_bound if initial == float('inf') else int(initial))
+
+    explored = 0
+    truncated = False
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_bnb_worker,
+                             initargs=(instance, search.rank, search.top_scores.memory_limit,
+                                       shared_upper_bound, search.deadline)) as executor:
+        running = set()
+        while units or running:
+            while units and len(running) < 2 * n_jobs:
+                running.add(executor.submit(_bnb_worker_run, units.popleft(), node_budget))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                leaves, frontier, nodes, rejects = future.result()
+                explored += nodes
+                for name, value in rejects.items():
+                    setattr(instance, name, getattr(instance, name) + value)
+                for order in leaves:
+                    instance.add_solver_permutation([element + 1 for element in order])
+                if frontier and (explored >= instance.nb_max_nodes_bnb or search._out_of_time(0)):
+                    truncated = True
+                    units.clear()
+                elif not truncated:
+                    units.extend(frontier)
+        instance.nb_explored_nodes_bnb = instance.nb_max_nodes_bnb if truncated and not search.timed_out else explored
+
+
+_REJECT_COUNTERS = ('nb_reject_gd', 'nb_reject_triplets', 'nb_reject_mot', 'nb_reject_semi_dist_bi_add',
+                    'nb_reject_top_scores')
+
+
+class SharedBoundSearch(BranchAndBoundSearch):
+    """
+    Exploration d'un processus travailleur : la borne supérieure est lue dans la mémoire partagée et chaque
+    solution améliorante y est publiée.
+    """
 
-    # Limite sur le nombre de noeuds explorés
-    if instance.nb_explored_nodes_bnb >= instance.nb_max_nodes_bnb:
-        return -1
+    def __init__(self, instance, element_order, memory_limit, shared_upper_bound, deadline=None):
+        super().__init__(instance, [element + 1 for element in np.argsort(element_order)], memory_limit, deadline)
+        self.shared_upper_bound = shared_upper_bound
+        self.shared_value = shared_upper_bound.get_obj()
+        self.leaves = []
 
-    instance.nb_explored_nodes_bnb += 1
+    def upper_bound(self):
+        return min(self.instance.best_upper_bound, self.shared_value.value)
 
-    # Pour l'affichage détaillé
-    if verbose_details:
-        print(f"{current_permutation}  sd: {semi_dist}   bi: {lower_bound}   add: {lower_bound_add}")
+    def on_leaf(self, prefix, score):
+        if score < self.instance.best_upper_bound:
+            self.leaves.clear()
+        self.instance.set_upper_bound(score)
+        self.leaves.append(list(prefix))
+        with self.shared_upper_bound.get_lock():
+            if score < self.shared_value.value:
+                self.shared_value.value = score
 
-    # Feuille
-    if left_to_set == 0:
-        pi = Permutation(current_permutation)
-        pi.set_dist(semi_dist)
 
-        if semi_dist < instance.best_upper_bound:
-            instance.set_upper_bound(semi_dist)
-            instance.medians.clear()
-            instance.add_solver_permutation(pi)
-        elif semi_dist == instance.best_upper_bound:
-            instance.add_solver_permutation(pi)
+# Exploration du processus travailleur, créée une fois par _init_bnb_worker
+_worker_search = None
 
-        response = semi_dist
 
-    # Noeud
-    else:
-        if len(current_permutation) >= 1:
-            last_element = current_permutation[-1]
-        if len(current_permutation) >= 2:
-            before_last_element = current_permutation[-2]
-
-        for i in range(len(numbers)):
-            element_to_put = numbers[i]
-            permission_to_continue = True
-
-            if use_gd:
-                if len(current_permutation) >= 1:
-                    permission_to_continue = instance.tab_contraintes_d[last_element - 1][element_to_put - 1]
-                    if not permission_to_continue and verbose_details:
-                        print(f"{current_permutation}({element_to_put})? nope: D/G")
-                        instance.nb_reject_gd += 1
-
-            if permission_to_continue and use_triplets and len(current_permutation) >= 2:
-                if not instance.tab_triplets[before_last_element - 1][last_element - 1][element_to_put - 1]:
-                    permission_to_continue = False
-                    if verbose_details:
-                        print(f"{current_permutation}({element_to_put})? nope: triplets")
-                        instance.nb_reject_triplets += 1
-
-            if permission_to_continue and use_constraints:
-                for j in numbers:
-                    if element_to_put != j and instance.tab_c[j - 1][element_to_put - 1]:
-                        permission_to_continue = False
-                        if verbose_details:
-                            print(f"{current_permutation}({element_to_put})? nope: MOT3")
-                            instance.nb_reject_mot += 1
-                        break
-
-            if permission_to_continue:
-                new_permutation = current_permutation + [element_to_put]
-                new_numbers = numbers[:]
-                new_numbers.remove(element_to_put)
-
-                new_lower_bound = lower_bound
-                for k in new_numbers:
-                    new_lower_bound -= min(instance.tab_d[element_to_put - 1][k - 1],
-                                           instance.tab_d[k - 1][element_to_put - 1])
-
-                new_semi_dist = semi_dist + sum(instance.tab_d[element_to_put - 1][j - 1] for j in new_numbers)
-
-                if use_semi_dist_bi_add:
-                    new_contributions = contributions[:]
-                    new_lower_bound_add = lower_bound_add - contributions[element_to_put - 1]
-                    if new_semi_dist + new_lower_bound + new_lower_bound_add >= instance.best_upper_bound:
-                        if verbose_details:
-                            print(
-                                f"{current_permutation}({element_to_put})? nope: semiDist+borneInf+add ({new_semi_dist}+{new_lower_bound}+{new_lower_bound_add}={new_semi_dist + new_lower_bound + new_lower_bound_add} > {instance.best_upper_bound})")
-                        permission_to_continue = False
-                        instance.nb_reject_semi_dist_bi_add += 1
-
-                if permission_to_continue:
-                    associated_lower_bound = new_semi_dist + new_lower_bound + new_lower_bound_add
-                    numbers_after_first_cuts.append(element_to_put)
-                    associated_lower_bounds.append(associated_lower_bound)
-
-        for i, element_to_put in enumerate(numbers_after_first_cuts):
-            new_permutation = current_permutation + [element_to_put]
-            new_numbers = numbers[:]
-            new_numbers.remove(element_to_put)
-
-            new_lower_bound = lower_bound
-            for k in new_numbers:
-                new_lower_bound -= min(instance.tab_d[element_to_put - 1][k - 1],
-                                       instance.tab_d[k - 1][element_to_put - 1])
-
-            new_semi_dist = semi_dist + sum(instance.tab_d[element_to_put - 1][j - 1] for j in new_numbers)
-
-            new_contributions = contributions[:]
-            new_lower_bound_add = lower_bound_add - contributions[element_to_put - 1]
-            new_contributions[element_to_put - 1] = -1
-            for j in new_numbers:
-                for k in range(instance.tab_nb_triangle_associe[element_to_put - 1][j - 1]):
-                    if instance.tab_triangle_associe[element_to_put - 1][j - 1][k] != 0:
-                        if new_contributions[instance.tab_triangle_associe[element_to_put - 1][j - 1][k] - 1] != -1:
-                            new_contributions[j - 1] -= instance.tab_triangle_add[element_to_put - 1][j - 1][
-                                instance.tab_triangle_associe[element_to_put - 1][j - 1][k] - 1]
-
-            new_bit_vector = bit_vector[:]
-            new_bit_vector[element_to_put - 1] = True
-            new_bit_vector.set_value(new_semi_dist)
-
-            if use_top_scores:
-                if instance.top_scores.get(new_bit_vector) is not None:
-                    if instance.top_scores.get(new_bit_vector) < new_semi_dist:
-                        if verbose_details:
-                            print(
-                                f"{current_permutation}({element_to_put})? nope: topScores before= {instance.top_scores.get(new_bit_vector)}  now= {new_semi_dist}")
-                        permission_to_continue = False
-                        instance.nb_reject_top_scores += 1
-                    elif instance.top_scores.get(new_bit_vector) > new_semi_dist:
-                        instance.top_scores[new_bit_vector] = new_semi_dist
-                else:
-                    if len(instance.top_scores) < instance.memory_limit:
-                        instance.top_scores[new_bit_vector] = new_semi_dist
-                    else:
-                        instance.top_scores[new_bit_vector] = new_semi_dist
-
-            if permission_to_continue:
-                if verbose_details:
-                    print(f"{current_permutation}({element_to_put})? ok")
-                candidate_response = branch_and_bound_recursive(instance, new_permutation, new_contributions,
-                                                                new_lower_bound_add, new_numbers, left_to_set - 1,
-                                                                new_semi_dist, new_lower_bound, new_bit_vector,
-                                                                verbose_details, this_bnb_number)
-
-            if candidate_response != -1 and candidate_response < response:
-                response = candidate_response
-
-    return response
+def _init_bnb_worker(instance, element_order, memory_limit, shared_upper_bound, deadline):
+    global _worker_search
+    _worker_search = SharedBoundSearch(instance, element_order, memory_limit, shared_upper_bound, deadline)
+
+
+def _bnb_worker_run(prefix, node_budget):
+    search = _worker_search
+    instance = search.instance
+    instance.nb_explored_nodes_bnb = 0
+    for name in _REJECT_COUNTERS:
+        setattr(instance, name, 0.0)
+    search.leaves = []
+
+    frontier = search.run(prefix, node_budget)
+    rejects = {name: getattr(instance, name) for name in _REJECT_COUNTERS}
+    return search.leaves, frontier, instance.nb_explored_nodes_bnb, rejects
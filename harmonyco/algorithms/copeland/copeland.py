@@ -1,3 +1,8 @@
+import numpy as np
+
+from ...Computation.preference_matrix import score_permutation
+
+
 def heuristic_copeland(instance, verbose=False):
     """
     Implémentation de l'heuristique Copeland en Python pour calculer la médiane des permutations.
@@ -9,26 +14,20 @@ def heuristic_copeland(instance, verbose=False):
     Returns:
     - None: Met à jour l'objet instance avec les résultats de l'algorithme Copeland.
     """
-    inf_score = float('inf')
-    num_elements = instance.n
-    copeland_scores = [0] * num_elements
-    elements = list(range(1, num_elements + 1))
+    tab_d = np.asarray(instance.tabD)
 
     # Calcul des scores de Copeland pour chaque élément
-    for i in range(num_elements):
-        for j in range(num_elements):
-            if instance.tabD[i][j] > instance.tabD[j][i]:
-                copeland_scores[i] += 1  # L'élément i perd contre l'élément j -> +1 défaite
+    # L'élément i perd contre l'élément j -> +1 défaite
+    copeland_scores = (tab_d > tab_d.T).sum(axis=1)
 
-    # Tri des éléments en fonction des scores de Copeland
-    elements_sorted, copeland_scores_sorted = zip(
-        *sorted(zip(elements, copeland_scores), key=lambda x: x[1], reverse=True))
+    # Tri des éléments en fonction des scores de Copeland (le moins de défaites en premier)
+    elements_sorted = np.argsort(copeland_scores, kind='stable') + 1
 
     # Conversion de la liste triée en une permutation
-    copeland_permutation = list(elements_sorted)
+    copeland_permutation = elements_sorted.tolist()
 
     # Calcul de la distance à l'ensemble des matrices et mise à jour du score
-    copeland_best_score = instance.distance_to_set_matrix(copeland_permutation)
+    copeland_best_score = score_permutation(copeland_permutation, tab_d)
     instance.Copeland_upper_bound = copeland_best_score
     instance.add_solver_permutation(copeland_permutation)
     instance.set_upper_bound(copeland_best_score)
@@ -0,0 +1,322 @@
+import glob
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Sequence, Set, TextIO, Tuple
+
+from .algorithms.Algorithm_choice import get_algorithm, solve_instance, supported_kwargs
+from .Computation.instance import Instance
+from .data.instance_cache import InstanceCache
+from .data.permutation_file import load_ranking_multiset
+
+# Marge accordée au-delà de la limite de temps avant d'interrompre un algorithme qui ne la respecte pas :
+# le délai strict vaut HARD_LIMIT_FACTOR * time_limit + HARD_LIMIT_GRACE secondes.
+HARD_LIMIT_FACTOR = 1.5
+HARD_LIMIT_GRACE = 1.0
+
+# Nombre d'instances soumises à l'avance par processus (les suivantes attendent qu'une place se libère)
+TASKS_PER_WORKER = 2
+
+
+class InstanceTimeout(Exception):
+    """
+    Levée dans un processus lorsqu'un algorithme dépasse le délai strict d'une instance.
+    """
+
+
+def find_instance_files(patterns: Sequence[str]) -> List[str]:
+    """
+    Liste les fichiers d'instances désignés par des dossiers (tous les fichiers visibles qu'ils contiennent,
+    sans descendre dans les sous-dossiers) ou des motifs glob (** parcourt les sous-dossiers).
+
+    :param patterns: Les dossiers, fichiers ou motifs.
+    :return: Les chemins absolus des fichiers, triés et sans doublon.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = (os.path.join(pattern, name) for name in os.listdir(pattern) if not name.startswith('.'))
+        else:
+            candidates = glob.glob(pattern, recursive=True)
+        files.update(os.path.abspath(path) for path in candidates if os.path.isfile(path))
+    return sorted(files)
+
+
+def completed_instances(output_path: Optional[str]) -> Set[Tuple[str, str]]:
+    """
+    Lit un fichier de résultats existant et retourne les instances qui y figurent déjà, y compris celles en
+    erreur ou interrompues par le délai, pour reprendre un traitement interrompu ; supprimer la ligne d'une
+    instance la fait recalculer. Les lignes illisibles (par exemple une dernière ligne tronquée) sont ignorées.
+
+    :param output_path: Le fichier JSONL des résultats (facultatif).
+    :return: L'ensemble des couples (fichier, algorithme).
+    """
+    done = set()
+    if output_path is None or not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                done.add((record.get('file'), record.get('algorithm')))
+    return done
+
+
+# Algorithme du processus travailleur, résolu une seule fois par processus
+_worker_algorithm = None
+_worker_settings = None
+_worker_cache = None
+
+
+def _init_worker(algorithm_name: str, polish: bool, time_limit: Optional[float], cache_dir: Optional[str] = None,
+                 reuse_medians: bool = False):
+    global _worker_algorithm, _worker_settings, _worker_cache
+    _worker_algorithm = get_algorithm(algorithm_name, polish=polish)
+    _worker_settings = (algorithm_name, time_limit, reuse_medians)
+    _worker_cache = InstanceCache(cache_dir) if cache_dir is not None else None
+
+
+def _new_record(path: str, algorithm_name: str, error: Optional[str] = None) -> Dict:
+    return {'file': path, 'algorithm': algorithm_name, 'n': None, 'm': None, 'distinct': None, 'median': None,
+            'score': None, 'lower_bound': None, 'is_optimal': False, 'source_algorithm': None, 'cache_hit': False,
+            'runtime': None, 'error': error}
+
+
+def _on_timeout(signum, frame):
+    raise InstanceTimeout()
+
+
+def solve_file(path: str) -> Dict:
+    """
+    Résout une instance dans le processus courant (voir _init_worker) et retourne la ligne de résultat.
+
+    L'algorithme reçoit time_limit s'il l'accepte, et n_jobs = 1 : le parallélisme se fait entre les instances.
+    Sur les systèmes qui ont SIGALRM, un algorithme qui dépasse le délai strict est interrompu ; la meilleure
+    médiane qu'il a déjà proposée est conservée.
+
+    Avec un cache d'instances, la matrice de préférence et les tables de contraintes sont relues et la médiane
+    trouvée y est enregistrée, mais l'algorithme s'exécute sans la médiane du cache, de sorte que le résultat
+    est bien le sien. Avec reuse_medians (voir run_batch), une instance déjà résolue de façon optimale n'est pas
+    recalculée et les autres partent de la meilleure médiane connue : cache_hit et source_algorithm indiquent
+    alors la provenance de la médiane.
+
+    :param path: Le fichier de l'instance (texte ou binaire).
+    :return: Le dictionnaire du résultat.
+    """
+    algorithm_name, time_limit, reuse_medians = _worker_settings
+    record = _new_record(path, algorithm_name)
+    start = time.perf_counter()
+    instance = None
+    use_alarm = time_limit is not None and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, HARD_LIMIT_FACTOR * time_limit + HARD_LIMIT_GRACE)
+    try:
+        # Le délai est annulé à l'intérieur de la zone protégée : une alarme qui se déclenche juste après la fin
+        # du calcul est encore interceptée ci-dessous
+        try:
+            multiset = load_ranking_multiset(path)
+            instance = _worker_cache.instance(multiset, warm_start=reuse_medians) if _worker_cache is not None \
+                else Instance(multiset)
+            record.update(n=instance.n, m=instance.m, distinct=multiset.nb_unique)
+            solve_instance(instance, _worker_algorithm, cache=_worker_cache, algorithm_name=algorithm_name,
+                           **supported_kwargs(_worker_algorithm, time_limit=time_limit, n_jobs=1))
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except InstanceTimeout:
+        record['error'] = "InstanceTimeout: délai dépassé"
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+    record['runtime'] = time.perf_counter() - start
+
+    if instance is not None and instance.medians:
+        record.update(median=instance.medians[0].elements, score=int(instance.medians_score),
+                      lower_bound=int(instance.best_lower_bound), is_optimal=bool(instance.is_optimal),
+                      source_algorithm=getattr(instance, 'source_algorithm', algorithm_name),
+                      cache_hit=bool(getattr(instance, 'cache_hit', False)))
+    elif record['error'] is None:
+        record['error'] = "L'algorithme n'a proposé aucune médiane"
+    return record
+
+
+def _write_record(output: TextIO, record: Dict):
+    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+    output.flush()
+
+
+def run_batch(patterns: Sequence[str], algorithm_name: str, output: TextIO, jobs: Optional[int] = None,
+              time_limit: Optional[float] = None, polish: bool = False,
+              skip: Iterable[Tuple[str, str]] = (), cache_dir: Optional[str] = None,
+              reuse_medians: bool = False) -> Dict[str, int]:
+    """
+    Résout toutes les instances désignées par des dossiers ou des motifs glob avec un groupe de processus.
+
+    Chaque processus importe l'algorithme une seule fois et traite les instances les unes après les autres ;
+    au plus TASKS_PER_WORKER instances par processus sont soumises à l'avance. Une ligne JSON par instance
+    (fichier, algorithme, n, m, médiane, score, borne inférieure, optimalité, durée, erreur) est écrite dès
+    que l'instance est terminée, dans l'ordre d'achèvement, avec l'algorithme qui a trouvé la médiane
+    (source_algorithm) et cache_hit (médiane optimale relue dans le cache, sans exécuter l'algorithme).
+
+    Si un processus meurt (mémoire épuisée, plantage d'une extension compilée), le groupe de processus est
+    recréé et les instances qui étaient en cours sont relancées une par une : seule celle qui fait encore
+    mourir son processus reçoit une ligne d'erreur (BrokenProcessPool), et le traitement continue. Avec
+    jobs = 1, les instances sont résolues dans le processus courant, qui n'est pas protégé ainsi.
+
+    :param patterns: Les dossiers ou motifs glob des fichiers d'instances.
+    :param algorithm_name: Le nom de l'algorithme (voir Algorithm_choice.get_algorithm).
+    :param output: Le flux où écrire les lignes JSON.
+    :param jobs: Le nombre de processus (par défaut, tous les cœurs ; 1 : dans le processus courant).
+    :param time_limit: La durée maximale par instance en secondes (facultatif).
+    :param polish: Si True, les médianes sont améliorées par recherche locale.
+    :param skip: Les couples (fichier, algorithme) à ne pas recalculer (voir completed_instances).
+    :param cache_dir: Le dossier du cache d'instances partagé par les processus (facultatif, voir InstanceCache).
+    :param reuse_medians: Si True, les médianes du cache sont réutilisées (voir solve_file) ; par défaut, chaque
+                          instance est résolue par l'algorithme demandé.
+    :return: Les compteurs 'solved', 'errors' et 'skipped'.
+    """
+    if get_algorithm(algorithm_name, polish=polish) is None:
+        raise ValueError(f"Algorithme inconnu : {algorithm_name}.")
+    jobs = os.cpu_count() if jobs is None or jobs == -1 else max(1, jobs)
+    skip = set(skip)
+    files = find_instance_files(patterns)
+    todo = [path for path in files if (path, algorithm_name) not in skip]
+    counts = {'solved': 0, 'errors': 0, 'skipped': len(files) - len(todo)}
+
+    def report(record):
+        _write_record(output, record)
+        counts['errors' if record['error'] is not None else 'solved'] += 1
+
+    if jobs == 1:
+        _init_worker(algorithm_name, polish, time_limit, cache_dir, reuse_medians)
+        for path in todo:
+            report(solve_file(path))
+        return counts
+
+    def new_executor():
+        return ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                   initargs=(algorithm_name, polish, time_limit, cache_dir, reuse_medians))
+
+    def report_failure(path, error):
+        if isinstance(error, BrokenProcessPool):
+            message = "BrokenProcessPool: le processus de calcul s'est arrêté brutalement (mémoire épuisée, plantage)"
+        else:
+            message = f"{type(error).__name__}: {error}"
+        report(_new_record(path, algorithm_name, message))
+
+    queue = deque(todo)
+    # Instances en cours lorsqu'un processus est mort : relancées seules pour identifier la fautive
+    suspects = deque()
+    pending = {}
+    executor = new_executor()
+    try:
+        while queue or suspects or pending:
+            if suspects and not pending:
+                path = suspects.popleft()
+                try:
+                    report(executor.submit(solve_file, path).result())
+                except BrokenProcessPool as e:
+                    report_failure(path, e)
+                    executor.shutdown(wait=True)
+                    executor = new_executor()
+                except Exception as e:
+                    report_failure(path, e)
+                continue
+
+            broken = False
+            while queue and not suspects and len(pending) < TASKS_PER_WORKER * jobs:
+                path = queue.popleft()
+                try:
+                    pending[executor.submit(solve_file, path)] = path
+                except BrokenProcessPool:
+                    queue.appendleft(path)
+                    broken = True
+                    break
+            if not broken:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        report(future.result())
+                    except BrokenProcessPool:
+                        broken = True
+                        suspects.append(path)
+                    except Exception as e:
+                        report_failure(path, e)
+            if broken:
+                # Les instances terminées avant la panne gardent leur résultat, les autres sont relancées
+                for future, path in pending.items():
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        report(future.result())
+                    else:
+                        suspects.append(path)
+                pending.clear()
+                executor.shutdown(wait=True)
+                executor = new_executor()
+    finally:
+        executor.shutdown(wait=True)
+    return counts
+
+
+def batch_main(patterns: Sequence[str], algorithm_name: str, output_path: Optional[str] = None,
+               jobs: Optional[int] = None, time_limit: Optional[float] = None, polish: bool = False,
+               cache_dir: Optional[str] = None, reuse_medians: bool = False) -> Dict[str, int]:
+    """
+    Mode batch de main.py : écrit les résultats à la suite du fichier de sortie (ou sur la sortie standard) en
+    ignorant les instances qui y figurent déjà, de sorte qu'un traitement interrompu reprend là où il s'est
+    arrêté.
+
+    :param patterns: Les dossiers ou motifs glob des fichiers d'instances.
+    :param algorithm_name: Le nom de l'algorithme.
+    :param output_path: Le fichier JSONL des résultats (facultatif).
+    :param jobs: Le nombre de processus.
+    :param time_limit: La durée maximale par instance en secondes.
+    :param polish: Si True, les médianes sont améliorées par recherche locale.
+    :param cache_dir: Le dossier du cache d'instances (facultatif).
+    :param reuse_medians: Si True, les médianes du cache sont réutilisées.
+    :return: Les compteurs 'solved', 'errors' et 'skipped'.
+    """
+    if output_path is None:
+        return run_batch(patterns, algorithm_name, sys.stdout, jobs, time_limit, polish, cache_dir=cache_dir,
+                         reuse_medians=reuse_medians)
+    skip = completed_instances(output_path)
+    # Une ligne tronquée par un arrêt brutal est terminée pour ne pas corrompre la suivante
+    needs_newline = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+    with open(output_path, 'a', encoding='utf-8') as output:
+        if needs_newline:
+            output.write('\n')
+        return run_batch(patterns, algorithm_name, output, jobs, time_limit, polish, skip, cache_dir, reuse_medians)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    import tempfile
+
+    from .data.permutation_file import write_permutations
+    from .evaluation.generators import generate_rankings
+
+    with tempfile.TemporaryDirectory() as directory:
+        for k in range(4):
+            write_permutations(os.path.join(directory, f"instance_{k}.bin"),
+                               generate_rankings('mallows', 20, 8, seed=k, phi=0.7))
+        results = os.path.join(directory, "results.jsonl")
+        print(batch_main([directory + "/*.bin"], 'borda', results, jobs=2, time_limit=1.0))
+        # Deuxième exécution : toutes les instances sont déjà dans le fichier
+        print(batch_main([directory + "/*.bin"], 'borda', results, jobs=2, time_limit=1.0))
+        with open(results, encoding='utf-8') as f:
+            print(f.readline().strip())
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..Computation.instance import Instance
+from ..Computation.preference_matrix import RankingsLike
+from ..Computation.ranking_multiset import RankingMultiset
+
+# Verrou de fichier : fcntl sous POSIX, msvcrt sous Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Version du format des entrées : elle entre dans la clé, de sorte qu'un changement de format invalide le cache
+CACHE_FORMAT_VERSION = 1
+
+# Dossier du cache : $HARMONYCO_CACHE_DIR, sinon $XDG_CACHE_HOME/harmonyco (~/.cache/harmonyco)
+DEFAULT_CACHE_DIR = os.environ.get('HARMONYCO_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'harmonyco')
+
+# Taille maximale du cache ; au-delà, les entrées utilisées le moins récemment sont supprimées
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Tables de l'instance enregistrées lorsqu'elles ont été calculées (attribut privé _<nom> de Instance)
+TABLES = ('tab_c', 'tab_triplets')
+
+MATRIX_FILE = 'preference_matrix.npy'
+MEDIAN_FILE = 'median.json'
+# Fichier verrouillé pendant la mise à jour de median.json (lecture, fusion, écriture)
+LOCK_FILE = '.lock'
+
+InstanceData = Union[Instance, RankingMultiset, RankingsLike]
+
+
+def instance_key(data: InstanceData) -> str:
+    """
+    Clé d'une instance dans le cache : l'empreinte SHA-256 de son multiensemble de classements normalisé
+    (classements distincts triés dans l'ordre lexicographique, avec leurs poids). Elle ne dépend donc ni de l'ordre
+    des classements ni du format du fichier d'origine.
+
+    :param data: Une instance, un RankingMultiset ou des classements.
+    :return: L'empreinte hexadécimale.
+    """
+    if not isinstance(data, (Instance, RankingMultiset)):
+        data = RankingMultiset(data)
+    rankings = np.ascontiguousarray(data.rankings, dtype='<i4')
+    weights = np.asarray(data.weights, dtype='<i8')
+    if rankings.shape[0] and rankings.shape[1]:
+        order = np.lexsort(rankings.T[::-1])
+        rankings, weights = rankings[order], weights[order]
+    digest = hashlib.sha256(f"harmonyco-v{CACHE_FORMAT_VERSION}:{rankings.shape[0]}x{rankings.shape[1]}:".encode())
+    digest.update(np.ascontiguousarray(rankings).tobytes())
+    digest.update(np.ascontiguousarray(weights).tobytes())
+    return digest.hexdigest()
+
+
+class InstanceCache:
+    """
+    Cache sur disque des instances, indexé par le contenu (voir instance_key).
+
+    Chaque entrée est un dossier qui contient la matrice de préférence (.npy), les tables de contraintes déjà
+    calculées (tab_c et tab_triplets, en .npy) et la meilleure médiane connue avec sa borne
+    inférieure et son optimalité (median.json). Les fichiers sont écrits dans un fichier temporaire puis renommés,
+    et la mise à jour de median.json (lecture, fusion, écriture) se fait sous le verrou de l'entrée, de sorte que
+    plusieurs processus peuvent partager le cache sans qu'une médiane soit remplacée par une moins bonne ; une
+    entrée illisible est traitée comme absente.
+
+    La date de modification du dossier d'une entrée est mise à jour à chaque utilisation : lorsque la taille totale
+    dépasse max_bytes, les entrées utilisées le moins récemment sont supprimées.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        :param directory: Le dossier du cache (DEFAULT_CACHE_DIR par défaut), créé s'il n'existe pas.
+        :param max_bytes: La taille maximale du cache en octets.
+        """
+        self.directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _touch(self, entry: str):
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    @staticmethod
+    @contextmanager
+    def _locked(entry: str):
+        """
+        Verrou exclusif sur une entrée, partagé entre processus (bloquant).
+        """
+        with open(os.path.join(entry, LOCK_FILE), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _write_atomic(path: str, write):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def best_known(self, data: InstanceData) -> Optional[Dict]:
+        """
+        Retourne la meilleure médiane enregistrée pour une instance.
+
+        :param data: Une instance, un RankingMultiset ou des classements.
+        :return: Le dictionnaire {'median', 'score', 'lower_bound', 'is_optimal', 'algorithm'}, ou None.
+        """
+        return self._read_median(self._entry(instance_key(data)))
+
+    def _read_median(self, entry: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(entry, MEDIAN_FILE), encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get('median'), list) \
+                or not isinstance(record.get('score'), int):
+            return None
+        return record
+
+    def instance(self, data: InstanceData, warm_start: bool = True) -> Instance:
+        """
+        Construit une instance en réutilisant ce que le cache contient : la matrice de préférence (qui n'est alors
+        pas recalculée), les tables de contraintes et, si warm_start, la meilleure médiane connue, proposée à
+        l'instance avec sa borne inférieure (voir warm_start). La matrice d'une instance absente du cache est
+        enregistrée.
+
+        :param data: Un RankingMultiset ou des classements (une instance est seulement complétée).
+        :param warm_start: Si False, la médiane du cache n'est pas proposée : seules les données dérivées des
+                           classements sont réutilisées.
+        :return: L'instance.
+        """
+        if isinstance(data, Instance):
+            if warm_start:
+                self.warm_start(data)
+            return data
+        if not isinstance(data, RankingMultiset):
+            data = RankingMultiset(data)
+        key = instance_key(data)
+        entry = self._entry(key)
+        try:
+            preference_matrix = np.load(os.path.join(entry, MATRIX_FILE))
+            if preference_matrix.shape != (data.n, data.n):
+                raise ValueError(f"matrice de taille {preference_matrix.shape}")
+        except (OSError, ValueError):
+            preference_matrix = None
+        instance = Instance(data, preference_matrix=preference_matrix)
+        if preference_matrix is None:
+            self.save(instance, key=key)
+            return instance
+        self._touch(entry)
+        for name in TABLES:
+            try:
+                setattr(instance, '_' + name, np.load(os.path.join(entry, name + '.npy')))
+            except (OSError, ValueError):
+                pass
+        if warm_start:
+            self._warm_start(instance, entry)
+        return instance
+
+    def warm_start(self, instance: Instance) -> bool:
+        """
+        Propose à l'instance la meilleure médiane enregistrée et sa borne inférieure ; si elle a été prouvée
+        optimale, l'instance est déclarée résolue. L'enregistrement du cache (médiane, score, algorithme qui l'a
+        trouvée, ...) est conservé dans instance.cached_result.
+
+        :param instance: L'instance.
+        :return: True si le cache contenait une médiane pour cette instance.
+        """
+        return self._warm_start(instance, self._entry(instance_key(instance)))
+
+    def _warm_start(self, instance: Instance, entry: str) -> bool:
+        record = self._read_median(entry)
+        if record is None or len(record['median']) != instance.n:
+            return False
+        self._touch(entry)
+        try:
+            instance.add_solver_permutation(record['median'])
+        except (ValueError, IndexError, TypeError):
+            return False
+        instance.cached_result = record
+        # Le score est recalculé : une borne ou une optimalité qui ne lui correspondent pas sont ignorées
+        if instance.medians_score == record.get('score'):
+            instance.set_lower_bound(min(record.get('lower_bound') or 0, instance.medians_score))
+            if record.get('is_optimal'):
+                instance.declare_is_optimal()
+        return True
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def save(self, instance: Instance, algorithm: Optional[str] = None, key: Optional[str] = None):
+        """
+        Enregistre une instance : sa matrice de préférence et ses tables de contraintes calculées, si elles sont
+        absentes du cache, et sa meilleure médiane si elle améliore celle du cache (meilleur score, ou même score
+        prouvé optimal), sous le verrou de l'entrée. Les entrées les moins récemment utilisées sont ensuite
+        supprimées si nécessaire.
+
+        :param instance: L'instance.
+        :param algorithm: Le nom de l'algorithme qui a trouvé la médiane (facultatif).
+        :param key: La clé de l'instance, si elle est déjà connue.
+        """
+        key = key or instance_key(instance)
+        entry = self._entry(key)
+        os.makedirs(entry, exist_ok=True)
+        arrays = [(MATRIX_FILE, instance.preference_matrix)]
+        arrays += [(name + '.npy', getattr(instance, '_' + name)) for name in TABLES
+                   if getattr(instance, '_' + name, None) is not None]
+        for file_name, array in arrays:
+            path = os.path.join(entry, file_name)
+            if not os.path.exists(path):
+                self._write_atomic(path, lambda f: np.save(f, np.asarray(array)))
+
+        if instance.medians:
+            # Sans verrou, deux processus pourraient lire le même enregistrement et le dernier à écrire l'emporter
+            with self._locked(entry):
+                previous = self._read_median(entry)
+                record = self._merge(previous, instance, algorithm)
+                if record != previous:
+                    self._write_atomic(os.path.join(entry, MEDIAN_FILE),
+                                       lambda f: f.write(json.dumps(record).encode('utf-8')))
+        self._touch(entry)
+        self.evict(keep=key)
+
+    @staticmethod
+    def _merge(previous: Optional[Dict], instance: Instance, algorithm: Optional[str]) -> Dict:
+        """
+        Combine la médiane enregistrée et celle de l'instance : la médiane de meilleur score est gardée, avec la
+        meilleure des deux bornes inférieures (une borne reste valable quelle que soit la médiane).
+        """
+        score = int(instance.medians_score)
+        lower_bound = int(instance.best_lower_bound)
+        if previous is None or score < previous['score']:
+            record = {'median': instance.medians[0].elements, 'score': score, 'algorithm': algorithm,
+                      'n': instance.n, 'm': instance.m}
+        else:
+            record = {key: previous.get(key) for key in ('median', 'score', 'algorithm', 'n', 'm')}
+        if previous is not None:
+            lower_bound = max(lower_bound, int(previous.get('lower_bound') or 0))
+        record['lower_bound'] = min(lower_bound, record['score'])
+        record['is_optimal'] = bool(record['lower_bound'] == record['score']
+                                    or (instance.is_optimal and score == record['score'])
+                                    or (previous is not None and previous.get('is_optimal')
+                                        and previous['score'] == record['score']))
+        return record
+
+    # ------------------------------------------------------------------
+    # Taille et éviction
+    # ------------------------------------------------------------------
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """
+        Liste les entrées du cache.
+
+        :return: Les triplets (clé, date de dernière utilisation, taille en octets), du moins au plus récent.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.is_dir() or item.name.startswith('.'):
+                    continue
+                try:
+                    last_used = item.stat().st_mtime
+                    size = sum(f.stat().st_size for f in os.scandir(item.path) if f.is_file())
+                except OSError:
+                    continue
+                entries.append((item.name, last_used, size))
+        entries.sort(key=lambda e: e[1])
+        return entries
+
+    def size(self) -> int:
+        """
+        La taille totale du cache en octets.
+        """
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Supprime les entrées utilisées le moins récemment jusqu'à ce que le cache ne dépasse plus max_bytes.
+
+        :param keep: Une clé à ne pas supprimer (l'entrée en cours d'utilisation).
+        :return: Le nombre d'entrées supprimées.
+        """
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Supprime toutes les entrées du cache.
+        """
+        for key, _, _ in self.entries():
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+
+    def __repr__(self):
+        return f"InstanceCache({self.directory!r}, max_bytes={self.max_bytes})"
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    from ..algorithms.Parcons.Parcons import parcons_dp
+
+    rankings = [
+        [1, 2, 3, 4],
+        [2, 1, 3, 4],
+        [1, 2, 3, 4],
+        [4, 3, 2, 1]
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = InstanceCache(directory)
+        print("Clé :", instance_key(rankings))
+        instance = cache.instance(rankings)
+        parcons_dp(instance)
+        cache.save(instance, algorithm='Parcons')
+        # Même multiensemble dans un autre ordre : la médiane optimale est relue sans calcul
+        again = cache.instance([rankings[3], rankings[0], rankings[2], rankings[1]])
+        print("Médiane :", again.medians[0], "optimale :", again.is_optimal, "taille :", cache.size(), "octets")
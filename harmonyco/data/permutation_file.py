@@ -0,0 +1,246 @@
+import struct
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from ..Computation.preference_matrix import RankingsLike, build_preference_matrix_from_chunks, rankings_to_array
+from ..Computation.ranking_multiset import RankingMultiset
+
+# En-tête du format binaire : signature, version, n, m et type des entrées (chaîne NumPy, par ex. '<i2').
+# Les m classements suivent, contigus, ligne par ligne, à partir de l'octet HEADER_SIZE.
+MAGIC = b'HRMYPERM'
+VERSION = 1
+HEADER_FORMAT = '<8sIIQ8s'
+HEADER_SIZE = 32
+
+# Nombre de classements lus à la fois par les itérateurs et le convertisseur
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+
+def ranking_dtype(n: int) -> np.dtype:
+    """
+    Type entier le plus compact pour stocker des classements de n éléments.
+
+    :param n: Le nombre d'éléments.
+    :return: int16 si n <= 32767, sinon int32.
+    """
+    return np.dtype('<i2') if n <= np.iinfo(np.int16).max else np.dtype('<i4')
+
+
+def _pack_header(m: int, n: int, dtype: np.dtype) -> bytes:
+    return struct.pack(HEADER_FORMAT, MAGIC, VERSION, n, m, dtype.str.encode('ascii'))
+
+
+def read_header(path: str) -> Tuple[int, int, np.dtype]:
+    """
+    Lit l'en-tête d'un fichier binaire de permutations.
+
+    :param path: Chemin vers le fichier.
+    :return: Le triplet (m, n, dtype).
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} n'est pas un fichier binaire de permutations HarmonyCo.")
+    _, version, n, m, dtype = struct.unpack(HEADER_FORMAT, header)
+    if version != VERSION:
+        raise ValueError(f"Version {version} du format binaire non prise en charge.")
+    return m, n, np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+
+
+def is_binary_file(path: str) -> bool:
+    """
+    Indique si un fichier commence par la signature du format binaire.
+
+    :param path: Chemin vers le fichier.
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_permutations(path: str, rankings: RankingsLike, dtype: Optional[np.dtype] = None):
+    """
+    Écrit un ensemble de classements au format binaire.
+
+    :param path: Chemin vers le fichier à créer.
+    :param rankings: Une liste de classements ou un tableau (m, n).
+    :param dtype: Le type des entrées (par défaut, le plus compact possible).
+    """
+    array = rankings_to_array(rankings)
+    m, n = array.shape
+    dtype = ranking_dtype(n) if dtype is None else np.dtype(dtype).newbyteorder('<')
+    with open(path, 'wb') as f:
+        f.write(_pack_header(m, n, dtype))
+        f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+
+def open_permutations(path: str, mode: str = 'r') -> np.memmap:
+    """
+    Ouvre un fichier binaire de permutations sans le charger en mémoire ni le vérifier (voir
+    iter_permutation_chunks et load_permutations, qui vérifient les classements).
+
+    :param path: Chemin vers le fichier.
+    :param mode: Le mode d'ouverture de numpy.memmap ('r' : lecture seule, 'r+' : modification en place).
+    :return: Un tableau (m, n) projeté en mémoire.
+    """
+    m, n, dtype = read_header(path)
+    if m == 0:
+        return np.empty((0, n), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=HEADER_SIZE, shape=(m, n))
+
+
+def iter_permutation_chunks(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """
+    Parcourt un fichier de permutations par blocs de classements.
+
+    Pour un fichier binaire, chaque bloc est une vue sur la projection en mémoire : seules les pages lues sont
+    chargées, ce qui permet de traiter des fichiers plus grands que la mémoire vive. Un fichier texte est lu
+    ligne par ligne. Dans les deux cas, chaque bloc est vérifié par check_rankings.
+
+    :param path: Chemin vers le fichier (binaire ou texte).
+    :param chunk_rows: Le nombre de classements par bloc.
+    :return: Un itérateur de tableaux (c, n).
+    """
+    if is_binary_file(path):
+        rankings = open_permutations(path)
+        for start in range(0, rankings.shape[0], chunk_rows):
+            yield check_rankings(rankings[start:start + chunk_rows], rankings.shape[1], start, path)
+    else:
+        yield from _iter_text_chunks(path, chunk_rows)
+
+
+def check_rankings(block: np.ndarray, n: int, first_row: int = 0, source: str = "") -> np.ndarray:
+    """
+    Vérifie que chaque ligne d'un bloc est une permutation des entiers de 1 à n.
+
+    :param block: Un tableau (c, n) de classements.
+    :param n: Le nombre d'éléments.
+    :param first_row: Le numéro (à partir de 0) du premier classement du bloc, pour le message d'erreur.
+    :param source: Le fichier d'origine, pour le message d'erreur.
+    :return: Le bloc inchangé.
+    """
+    valid = np.sort(block, axis=1) == np.arange(1, n + 1)
+    if not valid.all():
+        row = int(np.flatnonzero(~valid.all(axis=1))[0])
+        raise ValueError(f"{source} : le classement {first_row + row + 1} n'est pas une permutation des entiers "
+                         f"de 1 à {n} ({block[row].tolist()}).")
+    return block
+
+
+def _iter_text_chunks(path: str, chunk_rows: int) -> Iterator[np.ndarray]:
+    """
+    Lit un fichier texte (un classement par ligne, éléments séparés par des espaces) par blocs de lignes. Chaque
+    ligne doit contenir n éléments (n étant la taille de la première) et être une permutation de 1 à n.
+    """
+    n = None
+    row = 0
+    with open(path, 'rb') as f:
+        end_of_file = False
+        while not end_of_file:
+            # Les lignes vides sont ignorées ; seule une lecture vide marque la fin du fichier
+            rows = []
+            while len(rows) < chunk_rows:
+                line = f.readline()
+                if not line:
+                    end_of_file = True
+                    break
+                tokens = line.split()
+                if tokens:
+                    rows.append(tokens)
+            if not rows:
+                break
+            if n is None:
+                n = len(rows[0])
+            for k, tokens in enumerate(rows):
+                if len(tokens) != n:
+                    raise ValueError(f"{path} : le classement {row + k + 1} a {len(tokens)} éléments au lieu de {n}.")
+            values = np.array([token for tokens in rows for token in tokens], dtype=np.int64).reshape(-1, n)
+            yield check_rankings(values, n, row, path)
+            row += len(rows)
+
+
+def convert_text_to_binary(text_path: str, binary_path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[int, int]:
+    """
+    Convertit un fichier texte de permutations au format binaire, bloc par bloc.
+
+    :param text_path: Chemin vers le fichier texte (un classement par ligne).
+    :param binary_path: Chemin vers le fichier binaire à créer.
+    :param chunk_rows: Le nombre de lignes converties à la fois.
+    :return: Le couple (m, n) des dimensions écrites.
+    """
+    m, n, dtype = 0, 0, None
+    with open(binary_path, 'wb') as f:
+        f.write(b'\0' * HEADER_SIZE)
+        for chunk in _iter_text_chunks(text_path, chunk_rows):
+            if dtype is None:
+                n = chunk.shape[1]
+                dtype = ranking_dtype(n)
+            f.write(chunk.astype(dtype).tobytes())
+            m += chunk.shape[0]
+        # L'en-tête est écrit en dernier, une fois le nombre de classements connu
+        f.seek(0)
+        f.write(_pack_header(m, n, dtype if dtype is not None else ranking_dtype(0)))
+    return m, n
+
+
+def load_permutations(path: str) -> np.ndarray:
+    """
+    Charge un fichier de permutations, binaire (projeté en mémoire, sans copie) ou texte. Les classements sont
+    vérifiés par check_rankings ; pour un fichier binaire, cette vérification parcourt le fichier par blocs.
+
+    :param path: Chemin vers le fichier.
+    :return: Un tableau (m, n) de classements.
+    """
+    if is_binary_file(path):
+        for _ in iter_permutation_chunks(path):
+            pass
+        return open_permutations(path)
+    chunks = list(_iter_text_chunks(path, DEFAULT_CHUNK_ROWS))
+    if not chunks:
+        raise ValueError(f"{path} ne contient aucun classement.")
+    return np.concatenate(chunks)
+
+
+def load_ranking_multiset(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> RankingMultiset:
+    """
+    Charge un fichier de permutations par blocs en regroupant les classements identiques : seuls les classements
+    distincts et leurs nombres d'occurrences sont conservés en mémoire.
+
+    :param path: Chemin vers le fichier (binaire ou texte).
+    :param chunk_rows: Le nombre de classements lus à la fois.
+    :return: Le multiensemble des classements.
+    """
+    return RankingMultiset.from_chunks(iter_permutation_chunks(path, chunk_rows))
+
+
+def preference_matrix_from_file(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """
+    Construit la matrice de préférence d'un fichier de permutations en le lisant par blocs.
+
+    :param path: Chemin vers le fichier (binaire ou texte).
+    :param chunk_rows: Le nombre de classements lus à la fois.
+    :return: La matrice de préférence (n, n).
+    """
+    if is_binary_file(path):
+        _, n, _ = read_header(path)
+    else:
+        with open(path, 'rb') as f:
+            n = next((len(line.split()) for line in f if line.strip()), 0)
+    return build_preference_matrix_from_chunks(iter_permutation_chunks(path, chunk_rows), n)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    text_path = os.path.join(directory, 'permutations.txt')
+    binary_path = os.path.join(directory, 'permutations.bin')
+    with open(text_path, 'w') as f:
+        f.write("1 3 2 4\n4 2 3 1\n2 1 4 3\n")
+
+    print("Dimensions converties :", convert_text_to_binary(text_path, binary_path))
+    print("En-tête :", read_header(binary_path))
+    print("Classements :\n", load_permutations(binary_path))
+    print("Matrice de préférence :\n", preference_matrix_from_file(binary_path, chunk_rows=2))
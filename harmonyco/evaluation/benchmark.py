@@ -0,0 +1,270 @@
+import argparse
+import csv
+import json
+import platform
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .generators import GENERATORS, generate_rankings
+from ..algorithms.Algorithm_choice import get_algorithm, list_available_algorithms, supported_kwargs
+from ..algorithms.Parcons.Parcons import MAX_ELEMENTS, parcons_dp
+from ..Computation import kernels
+from ..Computation.instance import Instance
+
+# Taille maximale des instances dont la médiane de référence est calculée exactement (programmation dynamique)
+EXACT_REFERENCE_MAX_N = 20
+
+# Taille (n, m) de l'instance sur laquelle chaque algorithme est exécuté une fois avant les mesures
+WARM_UP_SIZE = (8, 5)
+
+# Compteurs de nœuds laissés sur l'instance par les solveurs
+NODE_COUNTERS = ('nb_explored_nodes_bnb', 'nb_states_parcons')
+
+# Colonnes des résultats, dans l'ordre du fichier CSV
+FIELDS = ('algorithm', 'model', 'n', 'm', 'repeat', 'seed', 'score', 'reference', 'reference_exact', 'gap',
+          'relative_gap', 'lower_bound', 'is_optimal', 'wall_time', 'peak_memory', 'nodes', 'error')
+
+AlgorithmSpec = Union[str, Tuple[str, Callable]]
+
+
+def resolve_algorithms(algorithms: Optional[Iterable[AlgorithmSpec]] = None) -> List[Tuple[str, Callable]]:
+    """
+    Associe chaque nom d'algorithme à sa fonction (voir Algorithm_choice.get_algorithm).
+
+    :param algorithms: Des noms d'algorithmes ou des couples (nom, fonction) ; par défaut, tous les algorithmes
+                       de list_available_algorithms dont les dépendances sont installées.
+    :return: La liste des couples (nom, fonction).
+    """
+    skip_unavailable = algorithms is None
+    if algorithms is None:
+        algorithms = list_available_algorithms()
+    resolved = []
+    for spec in algorithms:
+        if isinstance(spec, str):
+            try:
+                function = get_algorithm(spec)
+            except ImportError:
+                if skip_unavailable:
+                    continue
+                raise
+            if function is None:
+                raise ValueError(f"Algorithme inconnu : {spec}.")
+            spec = (spec, function)
+        resolved.append(spec)
+    return resolved
+
+
+def reference_solution(instance: Instance, exact_max_n: int = EXACT_REFERENCE_MAX_N) -> Tuple[int, bool]:
+    """
+    Score de référence d'une instance : la médiane exacte si n <= exact_max_n, sinon la meilleure borne
+    inférieure connue (borne simple et 3-cycles).
+
+    :param instance: L'instance.
+    :param exact_max_n: La taille maximale pour la résolution exacte.
+    :return: Le couple (score de référence, True si c'est le score optimal).
+    """
+    if instance.n <= min(exact_max_n, MAX_ELEMENTS):
+        reference = Instance(instance.rankings, preference_matrix=instance.preference_matrix, weights=instance.weights)
+        parcons_dp(reference)
+        return int(reference.best_upper_bound), True
+    return int(instance.simple_lower_bound + instance.add3cyles_lower_bound), False
+
+
+def warm_up(algorithms: Iterable[Tuple[str, Callable]], n: int = WARM_UP_SIZE[0], m: int = WARM_UP_SIZE[1]):
+    """
+    Exécute une fois chaque algorithme sur une petite instance, pour que la compilation des noyaux Numba et les
+    importations faites à la demande ne soient pas comptées dans le temps de la première mesure.
+
+    :param algorithms: Les couples (nom, fonction).
+    :param n: Le nombre d'éléments de l'instance de chauffe.
+    :param m: Le nombre de classements de l'instance de chauffe.
+    """
+    rankings = generate_rankings('uniform', m, n, seed=0)
+    for _, algorithm in algorithms:
+        try:
+            algorithm(Instance(rankings), **supported_kwargs(algorithm, time_limit=0.1, seed=0))
+        except Exception:
+            # L'erreur éventuelle sera enregistrée par la mesure elle-même
+            pass
+
+
+def run_algorithm(algorithm: Callable, instance: Instance, time_limit: Optional[float] = None,
+                  seed: Optional[int] = None, measure_memory: bool = True) -> Dict:
+    """
+    Exécute un algorithme sur une instance en mesurant le temps et, dans une seconde exécution, le pic de mémoire.
+
+    Le temps est mesuré sans tracemalloc, qui ralentit fortement le code Python. Le pic de mémoire est mesuré
+    par une seconde exécution sur une copie neuve de l'instance, dont le résultat n'est pas utilisé. Les
+    paramètres time_limit et seed ne sont transmis qu'aux algorithmes qui les acceptent. Une exception levée par
+    l'algorithme est enregistrée dans le champ error au lieu d'interrompre le banc d'essai.
+
+    :param algorithm: Une fonction algorithm(instance, **kwargs) qui met à jour l'instance.
+    :param instance: L'instance (neuve).
+    :param time_limit: La durée maximale en secondes (facultatif).
+    :param seed: La graine du générateur aléatoire (facultatif).
+    :param measure_memory: Si False, le pic de mémoire n'est pas mesuré (peak_memory vaut None).
+    :return: Un dictionnaire des mesures (score, wall_time, peak_memory, nodes, error, ...).
+    """
+    kwargs = supported_kwargs(algorithm, time_limit=time_limit, seed=seed)
+    copy = Instance(instance.rankings, preference_matrix=instance.preference_matrix, weights=instance.weights) \
+        if measure_memory else None
+
+    error = None
+    start = time.perf_counter()
+    try:
+        algorithm(instance, **kwargs)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start
+
+    peak_memory = None
+    if measure_memory and error is None:
+        tracemalloc.start()
+        try:
+            algorithm(copy, **kwargs)
+        except Exception:
+            pass
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    nodes = None
+    for counter in NODE_COUNTERS:
+        if getattr(instance, counter, None) is not None:
+            nodes = int(getattr(instance, counter))
+    return {
+        'score': None if not instance.medians else int(instance.medians_score),
+        'lower_bound': int(instance.best_lower_bound),
+        'is_optimal': bool(instance.is_optimal),
+        'wall_time': wall_time,
+        'peak_memory': peak_memory,
+        'nodes': nodes,
+        'error': error,
+    }
+
+
+def benchmark(algorithms: Optional[Iterable[AlgorithmSpec]] = None,
+              sizes: Sequence[Tuple[int, int]] = ((10, 5), (20, 10)),
+              models: Sequence[str] = ('uniform', 'mallows', 'plackett_luce'), repeats: int = 3, seed: int = 0,
+              time_limit: Optional[float] = 5.0, exact_max_n: int = EXACT_REFERENCE_MAX_N,
+              model_params: Optional[Dict[str, Dict]] = None, verbose: bool = False,
+              measure_memory: bool = True) -> List[Dict]:
+    """
+    Banc d'essai des algorithmes sur des instances synthétiques reproductibles.
+
+    Pour chaque modèle, chaque taille (n, m) et chaque répétition, une instance est générée avec une graine dérivée
+    de seed, son score de référence est calculé (voir reference_solution), puis chaque algorithme est exécuté sur
+    une copie neuve de l'instance. Chaque algorithme est d'abord exécuté une fois sur une petite instance (voir
+    warm_up), de sorte que la compilation Numba n'entre pas dans les temps mesurés.
+
+    :param algorithms: Les algorithmes à comparer (noms ou couples (nom, fonction) ; par défaut, tous).
+    :param sizes: Les couples (n, m) : nombre d'éléments et nombre de classements.
+    :param models: Les modèles de génération (voir generators.GENERATORS).
+    :param repeats: Le nombre d'instances par modèle et par taille.
+    :param seed: La graine principale.
+    :param time_limit: La durée maximale de chaque exécution, pour les algorithmes qui l'acceptent.
+    :param exact_max_n: La taille maximale pour la référence exacte.
+    :param model_params: Les paramètres de chaque modèle, par exemple {'mallows': {'phi': 0.8}} (facultatif).
+    :param verbose: Si True, affiche chaque résultat.
+    :param measure_memory: Si False, le pic de mémoire n'est pas mesuré, ce qui divise par deux la durée du banc.
+    :return: La liste des résultats, un dictionnaire par exécution (voir FIELDS).
+    """
+    algorithms = resolve_algorithms(algorithms)
+    warm_up(algorithms)
+    model_params = model_params or {}
+    seeds = iter(np.random.SeedSequence(seed).generate_state(len(models) * len(sizes) * repeats))
+    results = []
+    for model in models:
+        for n, m in sizes:
+            for repeat in range(repeats):
+                instance_seed = int(next(seeds))
+                rankings = generate_rankings(model, m, n, seed=instance_seed, **model_params.get(model, {}))
+                preference_matrix = Instance(rankings).preference_matrix
+                reference, exact = reference_solution(Instance(rankings, preference_matrix=preference_matrix),
+                                                      exact_max_n)
+                for name, algorithm in algorithms:
+                    instance = Instance(rankings, preference_matrix=preference_matrix)
+                    record = {'algorithm': name, 'model': model, 'n': n, 'm': m, 'repeat': repeat,
+                              'seed': instance_seed, 'reference': reference, 'reference_exact': exact}
+                    record.update(run_algorithm(algorithm, instance, time_limit, instance_seed, measure_memory))
+                    if record['score'] is not None:
+                        record['gap'] = record['score'] - reference
+                        record['relative_gap'] = record['gap'] / reference if reference else 0.0
+                    else:
+                        record['gap'] = record['relative_gap'] = None
+                    results.append(record)
+                    if verbose:
+                        print(f"{model} n={n} m={m} #{repeat} {name}: score {record['score']} "
+                              f"(réf. {reference}), {record['wall_time']:.3f} s"
+                              + (f", erreur {record['error']}" if record['error'] else ""))
+    return results
+
+
+def environment() -> Dict:
+    """
+    Description de l'environnement d'exécution, enregistrée avec les résultats pour comparer des versions.
+    """
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'kernels': kernels.BACKEND,
+            'platform': platform.platform(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def write_json(results: List[Dict], path: str):
+    """
+    Enregistre les résultats et l'environnement d'exécution au format JSON.
+
+    :param results: Les résultats de benchmark().
+    :param path: Chemin vers le fichier à créer.
+    """
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def write_csv(results: List[Dict], path: str):
+    """
+    Enregistre les résultats au format CSV, une ligne par exécution.
+
+    :param results: Les résultats de benchmark().
+    :param path: Chemin vers le fichier à créer.
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in results:
+            writer.writerow({field: record.get(field) for field in FIELDS})
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    n, m = text.lower().split('x')
+    return int(n), int(m)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai des algorithmes de HarmonyCo")
+    parser.add_argument('-a', '--algorithms', nargs='+', help="Algorithmes à comparer (par défaut, tous)")
+    parser.add_argument('-s', '--sizes', nargs='+', type=_parse_size, default=[(10, 5), (20, 10)],
+                        help="Tailles des instances, sous la forme NxM (éléments x classements)")
+    parser.add_argument('--models', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS),
+                        help="Modèles de génération des classements")
+    parser.add_argument('-r', '--repeats', type=int, default=3, help="Nombre d'instances par modèle et par taille")
+    parser.add_argument('--seed', type=int, default=0, help="Graine principale")
+    parser.add_argument('-t', '--time-limit', type=float, default=5.0, help="Durée maximale de chaque exécution")
+    parser.add_argument('--phi', type=float, default=0.5, help="Dispersion du modèle de Mallows")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Ne pas mesurer le pic de mémoire (une seconde exécution de chaque algorithme)")
+    parser.add_argument('--json', type=str, help="Fichier JSON de sortie")
+    parser.add_argument('--csv', type=str, help="Fichier CSV de sortie")
+    args = parser.parse_args()
+
+    results = benchmark(args.algorithms, args.sizes, args.models, args.repeats, args.seed, args.time_limit,
+                        model_params={'mallows': {'phi': args.phi}}, verbose=True, measure_memory=not args.no_memory)
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def uniform_rankings(m: int, n: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Génère m classements de n éléments tirés uniformément.
+
+    :param m: Le nombre de classements.
+    :param n: Le nombre d'éléments.
+    :param seed: La graine du générateur aléatoire (facultatif).
+    :return: Un tableau (m, n) de permutations de 1 à n.
+    """
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((m, n)), axis=1) + 1
+
+
+def mallows_rankings(m: int, n: int, phi: float = 0.5, center: Optional[Sequence[int]] = None,
+                     seed: Optional[int] = None) -> np.ndarray:
+    """
+    Génère m classements selon le modèle de Mallows : la probabilité d'un classement est proportionnelle à
+    phi^d, où d est sa distance de Kendall-Tau au classement central.
+
+    Les classements sont tirés par le modèle d'insertion répétée : le i-ème élément du centre est inséré à
+    j positions de la fin du préfixe déjà construit avec une probabilité proportionnelle à phi^j (il crée alors
+    j inversions). Les m classements sont construits simultanément.
+
+    :param m: Le nombre de classements.
+    :param n: Le nombre d'éléments.
+    :param phi: La dispersion, entre 0 (tous les classements égaux au centre) et 1 (tirage uniforme).
+    :param center: Le classement central (par défaut, 1, 2, ..., n).
+    :param seed: La graine du générateur aléatoire (facultatif).
+    :return: Un tableau (m, n) de permutations de 1 à n.
+    """
+    if not 0.0 <= phi <= 1.0:
+        raise ValueError("La dispersion phi doit être comprise entre 0 et 1.")
+    rng = np.random.default_rng(seed)
+    center = np.arange(1, n + 1) if center is None else np.asarray(center)
+
+    # Nombre d'inversions créées par chaque insertion : loi géométrique tronquée à {0, ..., i}
+    inversions = np.zeros((m, n), dtype=np.int64)
+    for i in range(1, n):
+        weights = np.power(phi, np.arange(i + 1)) if phi > 0 else np.eye(1, i + 1)[0]
+        cumulative = np.cumsum(weights)
+        inversions[:, i] = np.searchsorted(cumulative, rng.random(m) * cumulative[-1], side='right')
+
+    # Rang final de chaque élément du centre : l'insertion du i-ème élément à la position i - v décale d'un rang
+    # les éléments déjà placés à partir de cette position
+    rank = np.zeros((m, n), dtype=np.int64)
+    rows = np.arange(m)
+    for i in range(1, n):
+        slot = i - inversions[:, i]
+        rank[:, :i] += rank[:, :i] >= slot[:, None]
+        rank[rows, i] = slot
+    rankings = np.empty((m, n), dtype=center.dtype)
+    rankings[rows[:, None], rank] = center[None, :]
+    return rankings
+
+
+def plackett_luce_rankings(m: int, n: int, weights: Optional[Sequence[float]] = None,
+                           seed: Optional[int] = None) -> np.ndarray:
+    """
+    Génère m classements selon le modèle de Plackett-Luce : chaque position est attribuée parmi les éléments
+    restants avec une probabilité proportionnelle à leur poids.
+
+    Les tirages utilisent l'astuce de Gumbel : trier log(w) + G, avec G de loi de Gumbel, donne exactement la
+    loi de Plackett-Luce.
+
+    :param m: Le nombre de classements.
+    :param n: Le nombre d'éléments.
+    :param weights: Les poids strictement positifs des éléments 1 à n (par défaut, 1 / (i + 1), décroissants).
+    :param seed: La graine du générateur aléatoire (facultatif).
+    :return: Un tableau (m, n) de permutations de 1 à n.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n + 1) if weights is None else np.asarray(weights, dtype=float)
+    if weights.shape != (n,) or (weights <= 0).any():
+        raise ValueError(f"Il faut {n} poids strictement positifs.")
+    keys = np.log(weights)[None, :] + rng.gumbel(size=(m, n))
+    return np.argsort(-keys, axis=1) + 1
+
+
+# Générateurs disponibles pour les bancs d'essai, par nom de modèle
+GENERATORS = {
+    'uniform': uniform_rankings,
+    'mallows': mallows_rankings,
+    'plackett_luce': plackett_luce_rankings,
+}
+
+
+def generate_rankings(model: str, m: int, n: int, seed: Optional[int] = None, **params) -> np.ndarray:
+    """
+    Génère m classements de n éléments selon un modèle nommé.
+
+    :param model: Le nom du modèle ('uniform', 'mallows' ou 'plackett_luce').
+    :param m: Le nombre de classements.
+    :param n: Le nombre d'éléments.
+    :param seed: La graine du générateur aléatoire (facultatif).
+    :param params: Les paramètres du modèle (phi, center, weights).
+    :return: Un tableau (m, n) de permutations de 1 à n.
+    """
+    if model not in GENERATORS:
+        raise ValueError(f"Modèle inconnu : {model} (disponibles : {', '.join(GENERATORS)}).")
+    return GENERATORS[model](m, n, seed=seed, **params)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    print("Uniforme :\n", uniform_rankings(3, 6, seed=0))
+    print("Mallows (phi = 0.3) :\n", mallows_rankings(3, 6, phi=0.3, seed=0))
+    print("Plackett-Luce :\n", plackett_luce_rankings(3, 6, seed=0))
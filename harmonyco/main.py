@@ -6,8 +6,9 @@ import argparse
 
 # Importation des modules spécifiques au projet
 
-from algorithms.Algorithm_choice import get_algorithm, list_available_algorithms
-#from . import load_permutations, calculate_median
+from .algorithms.Algorithm_choice import get_algorithm, list_available_algorithms, solve_instance
+from .data.instance_cache import DEFAULT_CACHE_DIR, InstanceCache
+from .data.permutation_file import load_ranking_multiset
 
 
 
@@ -25,30 +26,82 @@ def main():
     parser = argparse.ArgumentParser(description="Calcul de la médiane des permutations avec HarmonyCo")
     parser.add_argument('-a', '--algorithm', type=str, choices=list_available_algorithms(),
                         help="Choisissez l'algorithme à utiliser pour calculer la médiane")
-    parser.add_argument('-f', '--file', type=str, required=True,
-                        help="Chemin vers le fichier contenant les permutations")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-f', '--file', type=str,
+                        help="Chemin vers le fichier contenant les permutations (texte ou binaire HarmonyCo)")
+    source.add_argument('-b', '--batch', type=str, nargs='+',
+                        help="Dossiers ou motifs glob des fichiers d'instances à résoudre en parallèle "
+                             "(une ligne JSON par instance)")
     parser.add_argument('-o', '--output', type=str, required=False,
-                        help="Chemin vers le fichier de sortie pour enregistrer les résultats")
+                        help="Chemin vers le fichier de sortie pour enregistrer les résultats (en mode batch, "
+                             "fichier JSONL complété à chaque exécution, les instances qui y figurent déjà étant ignorées)")
+    parser.add_argument('-p', '--polish', action='store_true',
+                        help="Améliorer la médiane trouvée par recherche locale (insertion et KwikSort)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Mode batch : nombre de processus (par défaut, tous les cœurs)")
+    parser.add_argument('-t', '--time-limit', type=float, default=None,
+                        help="Mode batch : durée maximale par instance en secondes")
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help="Dossier du cache des instances (matrices de préférence, tables de contraintes et "
+                             f"meilleures médianes connues ; par défaut {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ne pas utiliser le cache des instances")
+    parser.add_argument('--reuse-medians', action='store_true',
+                        help="Mode batch : réutiliser les médianes du cache (une médiane prouvée optimale n'est pas "
+                             "recalculée, les autres servent de point de départ) ; par défaut, chaque instance est "
+                             "résolue par l'algorithme demandé")
 
     args = parser.parse_args()
 
-    # Chargement des permutations depuis le fichier fourni
-    permutations = load_permutations(args.file)
-
-    if permutations is None:
-        print("Erreur : Le fichier des permutations n'a pas pu être chargé.")
+    if args.batch:
+        # Importé seulement en mode batch
+        from .batch import batch_main
+        try:
+            counts = batch_main(args.batch, args.algorithm, args.output, jobs=args.jobs, time_limit=args.time_limit,
+                                polish=args.polish, cache_dir=None if args.no_cache else args.cache_dir,
+                                reuse_medians=args.reuse_medians)
+        except (ImportError, ValueError) as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{counts['solved']} instances résolues, {counts['errors']} erreurs, "
+              f"{counts['skipped']} déjà présentes dans les résultats", file=sys.stderr)
+        return
+
+    # Chargement des permutations depuis le fichier fourni, les classements identiques étant regroupés
+    try:
+        permutations = load_ranking_multiset(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : Le fichier des permutations n'a pas pu être chargé ({e}).")
         sys.exit(1)
 
-    # Sélection de l'algorithme choisi par l'utilisateur
-    algorithm = get_algorithm(args.algorithm)
+    # Sélection de l'algorithme choisi par l'utilisateur (son module n'est importé qu'à ce moment)
+    try:
+        algorithm = get_algorithm(args.algorithm, polish=args.polish)
+    except ImportError as e:
+        print(f"Erreur : L'algorithme '{args.algorithm}' n'a pas pu être chargé ({e}).")
+        sys.exit(1)
 
     if algorithm is None:
         print(f"Erreur : L'algorithme '{args.algorithm}' n'est pas disponible.")
         sys.exit(1)
 
+    # Cache des instances : une instance déjà résolue de façon optimale n'est pas recalculée
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = InstanceCache(args.cache_dir)
+        except OSError as e:
+            print(f"Attention : le cache '{args.cache_dir}' n'est pas utilisable ({e}).", file=sys.stderr)
+
     # Calcul de la médiane des permutations
     print(f"Calcul de la médiane en utilisant l'algorithme : {args.algorithm}")
-    median_permutation = calculate_median(permutations, algorithm)
+    instance = solve_instance(permutations, algorithm, cache=cache, algorithm_name=args.algorithm)
+    median_permutation = instance.medians[0].elements if instance.medians else None
+    if instance.cache_hit:
+        print(f"Médiane optimale relue dans le cache (trouvée par {instance.source_algorithm}) ; "
+              f"--no-cache pour exécuter {args.algorithm}")
+    elif instance.source_algorithm != args.algorithm:
+        print(f"Médiane du cache (trouvée par {instance.source_algorithm}), que {args.algorithm} n'a pas améliorée")
 
     # Affichage ou enregistrement du résultat
     if args.output:
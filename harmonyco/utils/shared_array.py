@@ -0,0 +1,58 @@
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+# Tableaux attachés par le processus courant, conservés pour que leur mémoire reste valide
+_attached = {}
+
+
+class SharedArray:
+    """
+    Classe pour partager un tableau NumPy en lecture seule entre processus sans le sérialiser.
+
+    Le processus parent copie le tableau une fois dans un segment de mémoire partagée et transmet aux travailleurs
+    un descripteur (nom, forme, type) ; chaque travailleur obtient une vue sans copie avec attach_shared_array.
+    """
+
+    def __init__(self, array: np.ndarray):
+        """
+        Copie le tableau dans un nouveau segment de mémoire partagée.
+
+        :param array: Le tableau à partager.
+        """
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+        self.descriptor = (self.shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        """
+        Libère le segment de mémoire partagée.
+        """
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_shared_array(descriptor: Tuple[str, tuple, str]) -> np.ndarray:
+    """
+    Retourne une vue sur un tableau partagé par SharedArray, depuis un processus travailleur.
+
+    :param descriptor: Le descripteur SharedArray.descriptor.
+    :return: Le tableau partagé (à ne pas modifier).
+    """
+    name, shape, dtype = descriptor
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        _attached[name] = (shm, array)
+    return _attached[name][1]
@@ -0,0 +1,41 @@
+import io
+import json
+import multiprocessing
+import os
+import signal
+
+import pytest
+
+from harmonyco.algorithms.Algorithm_choice import get_algorithm, register_algorithm
+from harmonyco.batch import run_batch
+from harmonyco.data.permutation_file import write_permutations
+from harmonyco.evaluation.generators import uniform_rankings
+
+
+def crashing(instance, **kwargs):
+    # Simule un processus tué (mémoire épuisée, plantage) sur les instances de 5 éléments
+    if instance.n == 5:
+        os.kill(os.getpid(), signal.SIGKILL)
+    get_algorithm('borda')(instance)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork' or not hasattr(signal, 'SIGKILL'),
+                    reason="l'algorithme enregistré doit être hérité par les processus")
+def test_dead_worker_is_reported_and_batch_continues(tmp_path):
+    crashes = {'i3.bin', 'i6.bin'}
+    for k in range(8):
+        name = f'i{k}.bin'
+        write_permutations(str(tmp_path / name), uniform_rankings(4, 5 if name in crashes else 7, seed=k))
+    register_algorithm('crash', crashing)
+
+    output = io.StringIO()
+    counts = run_batch([str(tmp_path)], 'crash', output, jobs=2)
+    records = {os.path.basename(r['file']): r for r in map(json.loads, output.getvalue().splitlines())}
+
+    assert counts == {'solved': 6, 'errors': 2, 'skipped': 0}
+    assert len(records) == 8
+    for name, record in records.items():
+        if name in crashes:
+            assert record['error'].startswith('BrokenProcessPool')
+        else:
+            assert record['error'] is None and record['score'] is not None
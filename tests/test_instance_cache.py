@@ -0,0 +1,122 @@
+import itertools
+import os
+import threading
+import time
+
+import numpy as np
+
+from harmonyco.Computation.instance import Instance
+from harmonyco.Computation.ranking_multiset import RankingMultiset
+from harmonyco.data.instance_cache import InstanceCache, instance_key
+from harmonyco.evaluation.generators import uniform_rankings
+
+RANKINGS = uniform_rankings(7, 6, seed=0)
+
+
+def scored_instance(permutation, lower_bound=None, optimal=False):
+    instance = Instance(RANKINGS)
+    instance.add_solver_permutation(permutation)
+    if lower_bound is not None:
+        instance.set_lower_bound(lower_bound)
+    if optimal:
+        instance.declare_is_optimal()
+    return instance
+
+
+def by_score():
+    """Les permutations de 1 à 6 avec leur score, de la meilleure à la moins bonne."""
+    scores = []
+    for permutation in itertools.permutations(range(1, 7)):
+        instance = scored_instance(list(permutation))
+        scores.append((int(instance.medians_score), list(permutation)))
+    return sorted(scores)
+
+
+SCORES = by_score()
+
+
+def test_key_invariance():
+    key = instance_key(RANKINGS)
+    shuffled = RANKINGS[np.random.default_rng(1).permutation(len(RANKINGS))]
+    assert instance_key(shuffled) == key
+    assert instance_key(RANKINGS.tolist()) == key
+    assert instance_key(RankingMultiset(RANKINGS)) == key
+    assert instance_key(Instance(RANKINGS)) == key
+    # Les poids comptent : un classement dupliqué change la clé
+    assert instance_key(np.vstack([RANKINGS, RANKINGS[:1]])) != key
+    assert instance_key(RANKINGS[1:]) != key
+
+
+def test_merge_is_monotone(tmp_path):
+    cache = InstanceCache(str(tmp_path))
+    (best, best_median), (worse, worse_median) = SCORES[0], SCORES[-1]
+
+    cache.save(scored_instance(worse_median, lower_bound=best - 1), algorithm='a')
+    assert cache.best_known(RANKINGS)['score'] == worse
+    cache.save(scored_instance(best_median, optimal=True), algorithm='b')
+    record = cache.best_known(RANKINGS)
+    assert (record['score'], record['is_optimal'], record['algorithm']) == (best, True, 'b')
+
+    # Une médiane moins bonne, ou de même score sans preuve, ne remplace pas la médiane optimale
+    cache.save(scored_instance(worse_median), algorithm='c')
+    cache.save(scored_instance(best_median), algorithm='d')
+    assert cache.best_known(RANKINGS) == record
+
+
+def test_concurrent_saves_keep_best(tmp_path):
+    # Sans verrou, chaque écrivain lirait l'entrée vide puis écraserait la médiane optimale écrite la première
+    medians = [SCORES[0][1]] + [median for _, median in SCORES[1::100]]
+    barrier = threading.Barrier(len(medians), timeout=0.5)
+
+    def save(median):
+        cache = InstanceCache(str(tmp_path))
+        read_median = cache._read_median
+
+        def read_then_wait(entry):
+            record = read_median(entry)
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+            if median != medians[0]:
+                time.sleep(0.05)
+            return record
+
+        cache._read_median = read_then_wait
+        cache.save(scored_instance(median), algorithm=str(median))
+
+    threads = [threading.Thread(target=save, args=(median,)) for median in medians]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert InstanceCache(str(tmp_path)).best_known(RANKINGS)['score'] == SCORES[0][0]
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = InstanceCache(str(tmp_path))
+    keys = []
+    for seed in range(3):
+        rankings = uniform_rankings(5, 20, seed=seed)
+        cache.instance(rankings)
+        keys.append(instance_key(rankings))
+    for age, key in enumerate(keys):
+        os.utime(os.path.join(cache.directory, key), (1000 + age, 1000 + age))
+    # Réutiliser la plus ancienne entrée la rend la plus récente
+    cache.instance(uniform_rankings(5, 20, seed=0))
+
+    entry_size = max(size for _, _, size in cache.entries())
+    cache.max_bytes = 2 * entry_size
+    assert cache.evict() == 1
+    assert {key for key, _, _ in cache.entries()} == {keys[0], keys[2]}
+    cache.max_bytes = 0
+    assert cache.evict(keep=keys[0]) == 1
+    assert [key for key, _, _ in cache.entries()] == [keys[0]]
+
+
+def test_warm_start_can_be_disabled(tmp_path):
+    cache = InstanceCache(str(tmp_path))
+    cache.save(scored_instance(SCORES[0][1], optimal=True), algorithm='exact')
+    assert cache.instance(RANKINGS).is_optimal
+    cold = cache.instance(RANKINGS, warm_start=False)
+    assert not cold.medians and not cold.is_optimal
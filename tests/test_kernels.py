@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from harmonyco.Computation import kernels
+from harmonyco.Computation.insertion import InsertionState
+
+SEEDS = range(20)
+
+
+def random_tab_d(rng, n):
+    tab_d = rng.integers(0, 10, size=(n, n)).astype(np.int64)
+    np.fill_diagonal(tab_d, 0)
+    return tab_d
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_inversion_count(seed):
+    rng = np.random.default_rng(seed)
+    for n in (1, 2, int(rng.integers(3, 60))):
+        values = (rng.permutation(n) + 1).astype(np.int64)
+        expected = int(np.triu(values[:, None] > values[None, :], 1).sum())
+        assert kernels.inversion_count(values) == expected
+        assert kernels.inversion_count.py_func(values) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_insertion_delta(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(2, 40))
+    tab_d = random_tab_d(rng, n)
+    state = InsertionState(tab_d, rng.permutation(n))
+    for _ in range(20):
+        source, target = int(rng.integers(0, n)), int(rng.integers(0, n))
+        expected = state.delta(source, target)
+        # Référence NumPy : différence des scores avant et après le déplacement
+        order = state.order.tolist()
+        order.insert(target, order.pop(source))
+        assert expected == InsertionState(tab_d, np.array(order)).energy - state.energy
+        assert kernels.insertion_delta(state.order, state.antisymmetric, source, target) == expected
+        assert kernels.insertion_delta.py_func(state.order, state.antisymmetric, source, target) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_sa_anneal(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(2, 40))
+    tab_d = random_tab_d(rng, n)
+    state = InsertionState(tab_d, rng.permutation(n))
+    moves = int(rng.integers(0, 300))
+    sources = rng.integers(0, n, size=moves)
+    targets = rng.integers(0, n, size=moves)
+    thresholds = rng.random(moves) * 5
+
+    results = []
+    for kernel in (kernels.sa_anneal, kernels.sa_anneal.py_func):
+        order, position = state.order.copy(), state.position.copy()
+        energy, e_min, p_min = kernel(order, position, state.antisymmetric, state.energy, sources, targets,
+                                      thresholds)
+        assert energy == InsertionState(tab_d, order).energy
+        assert e_min == InsertionState(tab_d, p_min).energy
+        assert e_min <= min(energy, state.energy)
+        assert (position[order] == np.arange(n)).all()
+        results.append((energy, e_min, order.tolist(), p_min.tolist()))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_child_bounds(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 40))
+    tab_d = random_tab_d(rng, n)
+    tab_min = np.minimum(tab_d, tab_d.T)
+    remaining = np.flatnonzero(rng.random(n) < 0.5)
+    candidates = remaining[rng.random(len(remaining)) < 0.7]
+    contributions = rng.integers(0, 5, size=n).astype(np.int64)
+
+    expected = (7 + tab_d[np.ix_(candidates, remaining)].sum(axis=1)) + \
+               (11 - tab_min[np.ix_(candidates, remaining)].sum(axis=1)) + (3 - contributions[candidates])
+    for kernel in (kernels.child_bounds, kernels.child_bounds.py_func):
+        bounds = kernel(tab_d, tab_min, candidates, remaining, 7, 11, 3, contributions)
+        np.testing.assert_array_equal(bounds, expected)
+
+
+def test_check_parity():
+    assert kernels.check_parity(trials=20) == 80
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from harmonyco.data.permutation_file import (convert_text_to_binary, load_permutations, load_ranking_multiset,
+                                             write_permutations)
+
+
+def test_blank_lines_do_not_end_text_file(tmp_path):
+    path = tmp_path / 'rankings.txt'
+    path.write_text("1 2 3\n\n\n\n3 2 1\n")
+    for chunk_rows in (1, 2, 3, 10):
+        assert load_ranking_multiset(str(path), chunk_rows=chunk_rows).m == 2
+    np.testing.assert_array_equal(load_permutations(str(path)), [[1, 2, 3], [3, 2, 1]])
+    assert convert_text_to_binary(str(path), str(tmp_path / 'rankings.bin'), chunk_rows=2) == (2, 3)
+
+
+@pytest.mark.parametrize('row', [[0, 2, 3], [1, 1, 3], [1, 2, 4]])
+def test_binary_file_is_validated(tmp_path, row):
+    path = str(tmp_path / 'rankings.bin')
+    write_permutations(path, np.array([[1, 2, 3], row]))
+    with pytest.raises(ValueError, match="classement 2"):
+        load_ranking_multiset(path, chunk_rows=1)
+    with pytest.raises(ValueError, match="classement 2"):
+        load_permutations(path)
+
+
+def test_text_file_is_validated(tmp_path):
+    path = tmp_path / 'rankings.txt'
+    path.write_text("1 2 3\n1 2\n")
+    with pytest.raises(ValueError, match="2 éléments au lieu de 3"):
+        load_permutations(str(path))
+    path.write_text("1 2 3\n0 2 3\n")
+    with pytest.raises(ValueError, match="n'est pas une permutation"):
+        load_permutations(str(path))